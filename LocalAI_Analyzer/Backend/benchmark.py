@@ -0,0 +1,759 @@
+# ======================================================
+# 🔹 LocalAI_analyse Benchmarks
+# ======================================================
+# Micro-benchmarks for the backend hot paths. Synthetic data only, the
+# model is not needed unless a benchmark says so.
+#
+#   python benchmark.py scoring --items 50000 --labels 700
+#
+import argparse, os, time, json, shutil, socket, tempfile, threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+import requests
+from bs4 import BeautifulSoup
+import torch
+import uvicorn
+from sentence_transformers import util
+
+import server
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def random_unit_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+# ======================================================
+# scoring: per-item cos_sim loop vs chunked matrix product
+# ======================================================
+def legacy_score_loop(text_embeddings, taxonomy_matrix, top_n, threshold):
+    text_embeddings = torch.tensor(text_embeddings)
+    taxonomy_tensors = torch.tensor(taxonomy_matrix)
+    scored = []
+    for i in range(len(text_embeddings)):
+        sims = util.cos_sim(text_embeddings[i], taxonomy_tensors)[0].cpu().numpy()
+        top_idx = np.argsort(sims)[::-1][:top_n]
+        keep = [j for j in top_idx if sims[j] >= threshold] or [int(np.argmax(sims))]
+        scored.append((np.array(keep), sims[keep]))
+    return scored
+
+
+def bench_scoring(args):
+    texts = random_unit_vectors(args.items, args.dim, seed=1)
+    taxonomy = random_unit_vectors(args.labels, args.dim, seed=2)
+    print(f"scoring: {args.items} items x {args.labels} labels (dim {args.dim}), top {args.top_n}")
+
+    vectorized, t_vec = timed(server.score_taxonomy, texts, taxonomy, args.top_n, args.threshold, args.chunk_size)
+    print(f"   vectorized (chunk {args.chunk_size}): {t_vec:.3f}s")
+
+    legacy_items = min(args.items, args.legacy_items)
+    legacy, t_loop = timed(legacy_score_loop, texts[:legacy_items], taxonomy, args.top_n, args.threshold)
+    t_loop_full = t_loop * args.items / legacy_items
+    print(f"   legacy loop: {t_loop:.3f}s for {legacy_items} items (~{t_loop_full:.2f}s extrapolated)")
+    print(f"   speed-up: ~{t_loop_full / max(t_vec, 1e-9):.1f}x")
+
+    mismatched = sum(
+        1 for (a, _), (b, _) in zip(vectorized[:legacy_items], legacy)
+        if list(a) != list(b)
+    )
+    print(f"   label mismatches vs legacy: {mismatched}")
+
+
+# ======================================================
+# fetch: deep-parsing fetcher against a local stub server
+# ======================================================
+def make_stub_page(idx: int, body_kb: int) -> bytes:
+    head = (f"<html><head><title>Page {idx}</title>"
+            f"<meta name=\"description\" content=\"Stub description {idx}\"></head>")
+    body = "<body>" + "<p>lorem ipsum dolor sit amet</p>" * (body_kb * 32) + "</body></html>"
+    return (head + body).encode("utf-8")
+
+
+def start_stub_server(body_kb: int, delay: float, make_page=None, content_type: str = "text/html; charset=utf-8"):
+    make_page = make_page or (lambda idx: make_stub_page(idx, body_kb))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(delay)
+            page = make_page(int(self.path.strip("/") or 0))
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            try:
+                self.wfile.write(page)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass  # clients closing after </head> reset the connection
+
+    httpd = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def legacy_fetch(url):
+    response = requests.get(url, headers={"User-Agent": server.FETCH_USER_AGENT}, timeout=5)
+    soup = BeautifulSoup(response.text, "html.parser")
+    meta = soup.find("meta", attrs={"name": "description"})
+    return meta["content"].strip() if meta else ""
+
+
+def bench_fetch(args):
+    httpd = start_stub_server(args.body_kb, args.delay)
+    port = httpd.server_address[1]
+    # two hostnames for the same server so the per-host limit is exercised
+    urls = [f"http://{'127.0.0.1' if i % 2 else 'localhost'}:{port}/{i}" for i in range(args.pages)]
+    print(f"fetch: {args.pages} pages, {args.body_kb} KB body, {args.delay * 1000:.0f} ms server delay")
+
+    def run_legacy():
+        with ThreadPoolExecutor(max_workers=12) as executor:
+            return list(executor.map(legacy_fetch, urls))
+
+    legacy, t_legacy = timed(run_legacy)
+    print(f"   legacy requests.get + full parse: {t_legacy:.2f}s ({args.pages / t_legacy:.1f} pages/s)")
+
+    with server.MetaFetcher(max_workers=args.workers, per_host=args.per_host) as fetcher:
+        pooled, t_pooled = timed(fetcher.fetch_many, urls)
+        print(f"   pooled head-only fetcher: {t_pooled:.2f}s ({fetcher.last_run['pages_per_sec']} pages/s, "
+              f"{fetcher.last_run['kb_per_page']} KB/page read)")
+
+    wrong = sum(1 for url, desc in zip(urls, legacy) if pooled.get(url, {}).get("description") != desc)
+    print(f"   description mismatches: {wrong}")
+    httpd.shutdown()
+
+
+# ======================================================
+# meta: incremental head parser vs full BeautifulSoup parse
+# ======================================================
+HTML_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "html"
+
+
+def load_html_corpus(fixtures, synthetic: int) -> list:
+    """(name, html, content_type, expected description or None) for each saved page, plus `synthetic` stub pages.
+
+    A pages.json next to the pages gives the Content-Type a server would have
+    sent and the description a correct parse finds.
+    """
+    root = Path(fixtures).expanduser()
+    manifest = {}
+    if (root / "pages.json").exists():
+        manifest = json.loads((root / "pages.json").read_text(encoding="utf-8"))
+    corpus = []
+    for path in sorted(root.glob("**/*.htm*")):
+        info = manifest.get(path.name, {})
+        corpus.append((path.name, path.read_bytes(), info.get("content_type", ""), info.get("description")))
+    corpus += [(f"synthetic_{i}.html", make_stub_page(i, 50), "text/html; charset=utf-8", f"Stub description {i}")
+               for i in range(synthetic)]
+    return corpus
+
+
+def head_parse(html: bytes, content_type: str = "", chunk_size: int = server.FETCH_CHUNK_SIZE) -> dict:
+    """What MetaFetcher.fetch_meta extracts when `html` arrives in `chunk_size` chunks."""
+    parser = server.HeadMetaParser()
+    read = len(html)
+    for start in range(0, len(html), chunk_size):
+        parser.feed_bytes(html[start:start + chunk_size], content_type)
+        if parser.done:
+            read = start + chunk_size
+            break
+    return server.head_meta(parser, html[:read])
+
+
+def bench_meta(args):
+    corpus = load_html_corpus(args.fixtures, args.synthetic)
+    if not corpus:
+        print(f"meta: no .html files found in {args.fixtures}")
+        return
+    total_kb = sum(len(html) for _, html, _, _ in corpus) / 1024
+    print(f"meta: {len(corpus)} documents, {total_kb:.0f} KB")
+
+    full, t_full = timed(lambda: [server.parse_head_meta(html) for _, html, _, _ in corpus])
+    print(f"   BeautifulSoup full document: {t_full:.3f}s ({t_full / len(corpus) * 1000:.2f} ms/doc)")
+
+    incremental, t_inc = timed(lambda: [head_parse(html, content_type) for _, html, content_type, _ in corpus])
+    print(f"   incremental head parser:     {t_inc:.3f}s ({t_inc / len(corpus) * 1000:.2f} ms/doc)")
+    print(f"   speed-up: ~{t_full / max(t_inc, 1e-9):.1f}x")
+
+    for label, parsed in (("BeautifulSoup", full), ("incremental", incremental)):
+        wrong = [name for (name, _, _, expected), meta in zip(corpus, parsed)
+                 if expected is not None and meta["description"] != expected]
+        print(f"   {label} wrong descriptions: {len(wrong)} {wrong[:5] if wrong else ''}")
+
+
+# ======================================================
+# blacklist: per-rule substring scan vs compiled matcher
+# ======================================================
+def bench_blacklist(args):
+    rng = np.random.default_rng(3)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+
+    def word(n):
+        return "".join(rng.choice(letters, n))
+
+    domains = [f"{word(rng.integers(5, 12))}.{rng.choice(['com', 'net', 'org', 'io'])}" for _ in range(args.rules)]
+    rules = domains[: int(args.rules * 0.9)] + [f"/{word(6)}/" for _ in range(args.rules - int(args.rules * 0.9))]
+    hosts = [f"www.{d}" for d in domains[: args.rules // 5]] + [f"{word(8)}.com" for _ in range(2000)]
+    urls = [f"https://{hosts[rng.integers(len(hosts))]}/{word(6)}/{word(10)}?q={i}" for i in range(args.urls)]
+    print(f"blacklist: {args.urls} URLs x {args.rules} rules")
+
+    matcher, t_build = timed(server.BlacklistMatcher, rules)
+    print(f"   compile: {t_build:.3f}s")
+    compiled, t_compiled = timed(lambda: [matcher.matches(u) for u in urls])
+    print(f"   compiled matcher: {t_compiled:.3f}s ({sum(compiled)} blocked)")
+
+    naive_urls = urls[: args.naive_urls]
+    lowered = [b.lower() for b in rules]
+    naive, t_naive = timed(lambda: [any(b in u.lower() for b in lowered) for u in naive_urls])
+    t_naive_full = t_naive * len(urls) / len(naive_urls)
+    print(f"   naive any(b in url): {t_naive:.3f}s for {len(naive_urls)} URLs (~{t_naive_full:.1f}s extrapolated)")
+    print(f"   speed-up: ~{t_naive_full / max(t_compiled, 1e-9):.0f}x")
+    differing = sum(1 for a, b in zip(compiled, naive) if a != b)
+    print(f"   decisions differing from substring semantics: {differing} / {len(naive_urls)}")
+
+
+# ======================================================
+# ping: /ping latency while /update_rss requests are in flight
+# ======================================================
+def start_app_server():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    httpd = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=httpd.run, daemon=True).start()
+    while not httpd.started:
+        time.sleep(0.05)
+    return httpd, f"http://127.0.0.1:{port}"
+
+
+def measure_ping(base_url: str, path: str, updates: int, duration: float):
+    """Fire `updates` concurrent POSTs at `path` and sample /ping latency until they finish."""
+    latencies = []
+    with ThreadPoolExecutor(max_workers=updates) as executor:
+        futures = [executor.submit(requests.post, base_url + path, json={}, timeout=600) for _ in range(updates)]
+        session = requests.Session()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline or not all(f.done() for f in futures):
+            _, elapsed = timed(session.get, base_url + "/ping", timeout=600)
+            latencies.append(elapsed * 1000)
+            time.sleep(0.01)
+        statuses = [f.result().status_code for f in futures]
+    return np.array(latencies), statuses
+
+
+def bench_ping(args):
+    payload = [{"title": f"article {i}", "summary": "lorem ipsum " * 20} for i in range(args.json_items)]
+
+    def fake_refresh(profile=None):
+        # stands in for feed fetching + encoding: blocking IO, then a large JSON dump
+        time.sleep(args.work)
+        json.dumps(payload)
+        return payload, len(payload)
+
+    # the offloaded endpoint calls refresh_rss through the module, so no files are touched
+    server.refresh_rss = fake_refresh
+
+    @server.app.post("/_bench_inline_update")
+    async def inline_update():
+        fake_refresh()  # the pre-executor behaviour: blocking work on the event loop
+        return {"status": "ok"}
+
+    httpd, base_url = start_app_server()
+    print(f"ping: {args.updates} concurrent updates ({args.work:.1f}s blocking work each), RSS pool of {server.RSS_WORKERS}")
+    for label, path in (("inline (event loop)", "/_bench_inline_update"), ("offloaded /update_rss", "/update_rss")):
+        latencies, statuses = measure_ping(base_url, path, args.updates, args.duration)
+        print(f"   {label:<22} /ping p50 {np.percentile(latencies, 50):7.1f} ms  "
+              f"p99 {np.percentile(latencies, 99):7.1f} ms  max {latencies.max():7.1f} ms  "
+              f"({len(latencies)} pings, updates {sorted(set(statuses))})")
+    httpd.should_exit = True
+
+
+# ======================================================
+# index: exact scan vs HNSW for RSS recommendation
+# ======================================================
+def clustered_unit_vectors(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """Embedding-like data: points scattered around shared topic centres rather than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centres = random_unit_vectors(clusters, dim, seed=1)
+    vectors = centres[rng.integers(clusters, size=n)] + rng.standard_normal((n, dim)).astype(np.float32) * 0.015
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def bench_index(args):
+    tmp = Path(tempfile.mkdtemp(prefix="localai_index_"))
+    vectors = clustered_unit_vectors(args.articles + args.churn, args.dim, args.clusters)
+    ids = [f"a{i}" for i in range(len(vectors))]
+    store = server.VectorStore(tmp / "vectors", "bench")
+    store.put_many(ids, vectors)
+    queries = clustered_unit_vectors(args.queries, args.dim, args.clusters, seed=7)
+    live = ids[:args.articles]
+    print(f"index: {args.articles} articles (dim {args.dim}), {args.queries} label queries, top {args.k}")
+
+    def legacy_search():
+        # what analyze_rss_embeddings did before: dense tensor, cos_sim + topk per label
+        tensor = torch.from_numpy(np.stack([vectors[i] for i in range(args.articles)]))
+        return [torch.topk(util.cos_sim(torch.from_numpy(q), tensor)[0], k=args.k).indices.tolist() for q in queries]
+
+    _, t_legacy = timed(legacy_search)
+    print(f"   legacy tensor + cos_sim loop: {t_legacy * 1000:9.1f} ms per recommendation pass")
+
+    backends = [("exact", server.ExactIndex(store))]
+    if server.hnswlib is not None:
+        backends.append(("hnsw", server.HnswIndex(store, tmp / "index")))
+    else:
+        print("   hnswlib not installed, skipping the HNSW backend")
+
+    exact_hits = None
+    for name, index in backends:
+        _, t_build = timed(index.sync, live)
+        _, t_save = timed(index.save)
+        index.search(queries[:1], args.k)
+        hits, t_search = timed(index.search, queries, args.k)
+        # articles arriving and expiring between two passes
+        moved = live[args.churn:] + ids[args.articles:]
+        delta, t_sync = timed(index.sync, moved)
+        index.sync(live)
+        line = (f"   {name:<6} build {t_build:7.2f}s  save {t_save:6.2f}s  search {t_search * 1000:8.2f} ms  "
+                f"incremental sync (+{delta['added']}/-{delta['removed']}) {t_sync * 1000:8.1f} ms")
+        if exact_hits is None:
+            exact_hits = hits
+        else:
+            recall = np.mean([len({i for i, _ in a} & {i for i, _ in b}) / len(b) for a, b in zip(hits, exact_hits)])
+            line += f"  recall@{args.k} {recall:.3f}"
+        print(line)
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+
+# ======================================================
+# backends: torch vs ONNX vs int8 ONNX embedding throughput
+# ======================================================
+def synthetic_titles(n: int, seed: int = 0) -> list:
+    """History-like page titles of varied length."""
+    rng = np.random.default_rng(seed)
+    words = ("market space rocket recipe election travel guide review laptop game football climate "
+             "startup vaccine museum album movie bitcoin river mountain city policy battery").split()
+    return [" ".join(rng.choice(words, size=int(rng.integers(4, 24)))) for _ in range(n)]
+
+
+def bench_backends(args):
+    taxonomy_matrix, taxonomy_paths = server.load_taxonomy_matrix()
+    texts = synthetic_titles(args.sentences)
+    drift_texts = list(taxonomy_paths) + texts[:args.drift_texts]
+    print(f"backends: {args.sentences} sentences, batch {args.batch_size}, "
+          f"drift on {len(drift_texts)} texts vs {len(taxonomy_paths)} taxonomy labels")
+
+    reference = None
+    for name in args.backends:
+        (model, backend, device), t_load = timed(server.load_sentence_model, backend=name, device="cpu")
+        if backend != name:
+            print(f"   {name:<10} unavailable, skipped")
+            continue
+        model.encode(texts[:args.batch_size], batch_size=args.batch_size)
+        _, t_encode = timed(model.encode, texts, batch_size=args.batch_size, convert_to_numpy=True,
+                            normalize_embeddings=True)
+        line = f"   {name:<10} load {t_load:6.2f}s  {len(texts) / t_encode:9.1f} sentences/s"
+        if reference is None:
+            reference = model
+        else:
+            drift = server.measure_backend_drift(reference, model, drift_texts, taxonomy_matrix, args.batch_size)
+            line += (f"  cosine vs torch mean {drift['cosine_mean']:.4f} min {drift['cosine_min']:.4f}  "
+                     f"top-1 label agreement {drift['top1_agreement']:.3f}")
+        print(line)
+
+
+
+# ======================================================
+# encode: default model.encode batching vs length-bucketed encode_texts
+# ======================================================
+def fixed_batch_padding(lengths: np.ndarray, char_lengths: np.ndarray, batch_size: int) -> float:
+    """Padding ratio of sentence-transformers' own batching (sorted by character length, fixed size)."""
+    order = np.argsort(-char_lengths, kind="stable")
+    padded = sum(int(lengths[order[i:i + batch_size]].max()) * len(order[i:i + batch_size])
+                 for i in range(0, len(order), batch_size))
+    return 1 - lengths.sum() / padded
+
+
+def bench_encode(args):
+    model, backend, device = server.load_sentence_model(device="cpu")
+    rng = np.random.default_rng(3)
+    titles = synthetic_titles(args.texts)
+    # history exports mix bare titles with titles + meta descriptions / RSS summaries up to 2000 chars
+    texts = [t if rng.random() < args.short_share else (t + " ") * int(rng.integers(4, 40)) for t in titles]
+    texts = [t[:2000] for t in texts]
+    lengths = np.asarray(model.tokenizer(texts, truncation=True, max_length=model.max_seq_length,
+                                         return_length=True)["length"])
+    print(f"encode: {len(texts)} texts ({backend} on {device}), {int(lengths.sum())} tokens, "
+          f"max_seq_length {model.max_seq_length}")
+
+    encode_texts = lambda: server.encode_texts(model, texts, device, stats)
+    model.encode(texts[:32])
+    baseline, t_base = timed(model.encode, texts, batch_size=args.batch_size, convert_to_numpy=True,
+                             normalize_embeddings=True)
+    padding = fixed_batch_padding(lengths, np.array([len(t) for t in texts]), args.batch_size)
+    print(f"   model.encode (batch {args.batch_size}): {t_base:7.2f}s  {lengths.sum() / t_base:9.1f} tokens/s  "
+          f"padding {padding:.1%}")
+
+    stats = server.EncodeStats()
+    bucketed, t_bucket = timed(encode_texts)
+    summary = stats.as_dict()
+    print(f"   encode_texts (budget {server.encode_token_budget(device)} tokens): {t_bucket:7.2f}s  "
+          f"{summary['tokens_per_second']:9.1f} tokens/s  padding {summary['padding_ratio']:.1%}  "
+          f"{summary['batches']} batches, {summary['truncated']} truncated")
+    print(f"   speed-up: ~{t_base / max(t_bucket, 1e-9):.2f}x, "
+          f"max |difference| vs model.encode: {np.abs(bucketed - baseline).max():.2e}")
+
+
+
+# ======================================================
+# pool: in-process encode_texts vs the multi-process encode pool
+# ======================================================
+def wait_for_workers(pool):
+    # a worker takes tasks only once it has loaded the model, so wait until every pid has answered
+    pids = set()
+    while len(pids) < pool.workers:
+        pids.update(f.result() for f in [pool._executor.submit(os.getpid) for _ in range(pool.workers * 4)])
+        time.sleep(0.05)
+
+
+def bench_pool(args):
+    model, backend, device = server.load_sentence_model(backend=args.backend, device="cpu")
+    rng = np.random.default_rng(5)
+    titles = synthetic_titles(args.texts)
+    texts = [(t if rng.random() < args.short_share else (t + " ") * int(rng.integers(4, 40)))[:2000] for t in titles]
+    print(f"pool: {len(texts)} texts ({backend} on {device}), {os.cpu_count()} cores")
+
+    server.encode_texts(model, texts[:64], device)
+    stats = server.EncodeStats()
+    baseline, t_base = timed(server.encode_texts, model, texts, device, stats)
+    print(f"   in-process ({torch.get_num_threads()} threads): {t_base:7.2f}s  "
+          f"{stats.as_dict()['tokens_per_second']:9.1f} tokens/s")
+
+    for workers in args.workers:
+        pool = server.EncodePool(server.resource_path(server.MODEL_DIR), backend, workers, args.threads)
+        _, t_start = timed(wait_for_workers, pool)
+        stats = server.EncodeStats()
+        encoded, t_pool = timed(pool.encode, texts, stats)
+        print(f"   {workers} workers x {pool.threads} threads (start {t_start:5.1f}s): {t_pool:7.2f}s  "
+              f"{stats.as_dict()['tokens_per_second']:9.1f} tokens/s  speed-up ~{t_base / max(t_pool, 1e-9):.2f}x  "
+              f"max |difference| {np.abs(encoded - baseline).max():.2e}")
+        pool.close()
+
+
+
+# ======================================================
+# settings: source removal by re-fetching every feed vs the feed registry
+# ======================================================
+def make_stub_feed(idx: int, entries: int) -> bytes:
+    items = "".join(f"<item><guid>http://stub/{idx}/{k}</guid><title>Feed {idx} story {k}</title>"
+                    f"<link>http://stub/{idx}/{k}</link><description>story {k} of feed {idx}</description></item>"
+                    for k in range(entries))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed {idx}</title>{items}</channel></rss>'.encode("utf-8")
+
+
+def bench_settings(args):
+    import feedparser
+    httpd = start_stub_server(0, args.delay, lambda idx: make_stub_feed(idx, args.articles),
+                              "application/rss+xml; charset=utf-8")
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    urls = [f"{base}/{i}" for i in range(args.feeds)]
+    tmp = Path(tempfile.mkdtemp(prefix="localai_settings_"))
+    store = server.ArticleStore(tmp / "rss_articles.db")
+    store.save_feed_state({url: {"source": f"Feed {i}"} for i, url in enumerate(urls)})
+    store.add_articles([{"title": f"Feed {i} story {k}", "link": f"http://stub/{i}/{k}", "summary": f"story {k} of feed {i}",
+                         "source": f"Feed {i}", "feed": url} for i, url in enumerate(urls) for k in range(args.articles)])
+    print(f"settings: {args.feeds} feeds x {args.articles} articles, {args.delay * 1000:.0f} ms per feed request, "
+          f"one feed removed")
+
+    def legacy_active_sources():
+        # what save_rss_settings did before: fetch every remaining feed just to read its title
+        with ThreadPoolExecutor(max_workers=server.FEED_MAX_WORKERS) as executor:
+            return [f.feed.title for f in executor.map(feedparser.parse, urls[1:])]
+
+    sources, t_legacy = timed(legacy_active_sources)
+    print(f"   legacy feedparser re-fetch: {t_legacy * 1000:9.1f} ms ({len(sources)} feeds fetched)")
+    removed, t_registry = timed(store.remove_feeds_except, urls[1:])
+    print(f"   feed registry delete:       {t_registry * 1000:9.1f} ms ({sum(removed.values())} articles removed, "
+          f"{store.count()} left)")
+    httpd.shutdown()
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+
+# ======================================================
+# recommend: full recompute vs incremental candidate lists
+# ======================================================
+def bench_recommend(args):
+    tmp = Path(tempfile.mkdtemp(prefix="localai_recommend_"))
+    vectors = clustered_unit_vectors(args.articles + args.churn, args.dim, args.clusters)
+    ids = [f"a{i}" for i in range(len(vectors))]
+    store = server.VectorStore(tmp / "vectors", "bench")
+    store.put_many(ids, vectors)
+    labels = [f"label {i}" for i in range(args.labels)]
+    label_vecs = clustered_unit_vectors(args.labels, args.dim, args.clusters, seed=7)
+    edited_vecs = label_vecs.copy()
+    edited_vecs[0] = clustered_unit_vectors(1, args.dim, args.clusters, seed=8)[0]
+    edited = ["edited label"] + labels[1:]
+    live = ids[:args.articles]
+    moved = live[args.churn:] + ids[args.articles:]
+    k = args.k
+    print(f"recommend: {args.articles} articles (dim {args.dim}), {args.labels} labels, top {k}")
+
+    index = server.ExactIndex(store)
+
+    def full_pass(article_ids, query_vecs):
+        # what every save / tag edit / auto-update did before: sync the whole set and search every label
+        index.sync(article_ids)
+        return index.search(query_vecs, k)
+
+    full_pass(live, label_vecs)
+    _, t_full = timed(full_pass, live, label_vecs)
+    print(f"   full recompute:                  {t_full * 1000:9.2f} ms")
+
+    engine = server.RecommendationEngine()
+    index.sync(live)
+    engine.sync_articles(live, store, index, "v1")
+    _, t_fill = timed(engine.candidates, labels, label_vecs, k)
+    print(f"   engine first fill:               {t_fill * 1000:9.2f} ms")
+
+    (hits, stats), t_edit = timed(engine.candidates, edited, edited_vecs, k)
+    exact = full_pass(live, edited_vecs)
+    same = all([i for i, _ in a] == [i for i, _ in b] for a, b in zip(hits, exact))
+    print(f"   tag edit (1 label changed):      {t_edit * 1000:9.2f} ms  "
+          f"({stats['searched']} searched, {stats['reused']} reused, matches full: {same})")
+
+    def article_delta():
+        index.sync(moved)
+        engine.sync_articles(moved, store, index, "v2")
+        return engine.candidates(edited, edited_vecs, k)
+
+    (hits, stats), t_delta = timed(article_delta)
+    exact = full_pass(moved, edited_vecs)
+    same = all([i for i, _ in a] == [i for i, _ in b] for a, b in zip(hits, exact))
+    print(f"   {f'articles +{args.churn}/-{args.churn}:':<33}{t_delta * 1000:9.2f} ms  "
+          f"({stats['searched']} searched, {stats['reused']} reused, matches full: {same})")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+
+# ======================================================
+# history: full vs incremental analysis of an overlapping export
+# ======================================================
+def synthetic_history(days: int, per_day: int, start_day: int, revisits: int = 0, seed: int = 0) -> list:
+    """Export entries (newest first) for `days` days from `start_day`; `revisits` older URLs get visited again today."""
+    titles = synthetic_titles((start_day + days) * per_day, seed)
+    base = time.time() - 365 * 86400
+    entries = {}
+    for day in range(start_day, start_day + days):
+        for k in range(per_day):
+            i = day * per_day + k
+            entries[f"https://site{i % 97}.example/p{i}"] = {
+                "url": f"https://site{i % 97}.example/p{i}", "title": titles[i],
+                "lastVisitTime": base + (day * 86400 + k * 60), "visitCount": 1}
+    newest = base + (start_day + days) * 86400
+    for n, url in enumerate(list(entries)[:revisits]):
+        entries[url] = {**entries[url], "lastVisitTime": newest + n}
+    return sorted(entries.values(), key=lambda e: -e["lastVisitTime"])
+
+
+def bench_history(args):
+    tmp = Path(tempfile.mkdtemp(prefix="localai_history_"))
+    server.HISTORY_EMBED_CACHE_BASE = tmp / "history_embeddings"   # keep the real embedding cache untouched
+    settings = {"useDeepParsing": False, "granularityLevel": args.granularity, "samplingCount": 20,
+                "threshold": args.threshold}
+    first = synthetic_history(args.days, args.per_day, 0)
+    second = synthetic_history(args.days, args.per_day, args.shift, revisits=args.revisits)
+    server.model_registry.get()
+    print(f"history: {len(first)} entries over {args.days} days, next export shifted {args.shift} days "
+          f"({args.revisits} revisits)")
+
+    incremental = server.HistoryStore(tmp / "incremental.db")
+    server.analyze_history(iter(first), settings, tmp, incremental)
+    (inc_summary, inc_counts), t_inc = timed(server.analyze_history, iter(second), settings, tmp, incremental)
+    inc_results = json.loads((tmp / "embedding_analysis.json").read_text(encoding="utf-8"))["results"]
+
+    full = server.HistoryStore(tmp / "full.db")
+    (full_summary, full_counts), t_full = timed(server.analyze_history, iter(second), {**settings, "incremental": False},
+                                                tmp, full)
+    full_results = json.loads((tmp / "embedding_analysis.json").read_text(encoding="utf-8"))["results"]
+
+    print(f"   full run:        {t_full:7.2f}s  {full_counts['scored']} entries scored")
+    print(f"   incremental run: {t_inc:7.2f}s  {inc_counts['scored']} scored, {inc_counts['reused']} reused, "
+          f"{inc_counts['expired']} aged out")
+    print(f"   same summary as the full run: {inc_summary == full_summary}, "
+          f"same per-entry results: {inc_results == full_results}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    if inc_summary != full_summary or inc_results != full_results:
+        raise SystemExit("history: the incremental run diverged from the full run")
+
+
+# ======================================================
+# metrics: log file handle and per-stage instrumentation overhead
+# ======================================================
+def bench_metrics(args):
+    import contextlib, io
+    tmp = Path(tempfile.mkdtemp(prefix="localai_metrics_"))
+    log_file = tmp / "log.txt"
+    print(f"metrics: {args.lines} log lines, {args.stages} tracked stages")
+
+    def legacy_log(msg):
+        # what log() did before: open and close the file for every line
+        print(msg)
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(f"[{time.strftime('%H:%M:%S')}] {msg}\n")
+
+    def server_log():
+        server.LOG_FILE, server._log_file = log_file, None
+        for i in range(args.lines):
+            server.log(f"[Bench] line {i}")
+        server._log_file.close()
+        server._log_file = None
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, t_legacy = timed(lambda: [legacy_log(f"[Bench] line {i}") for i in range(args.lines)])
+        _, t_log = timed(server_log)
+    print(f"   reopen per line:       {t_legacy / args.lines * 1e6:7.2f} us/line")
+    print(f"   persistent handle:     {t_log / args.lines * 1e6:7.2f} us/line")
+
+    job = server.Job("bench")
+    def tracked():
+        for _ in range(args.stages):
+            with job.track("stage"):
+                pass
+    _, t_track = timed(tracked)
+    print(f"   job.track + metrics:   {t_track / args.stages * 1e6:7.2f} us/stage "
+          f"({server.metrics.value('localai_stage_seconds_count', pipeline='bench', stage='stage'):.0f} observed)")
+    _, t_render = timed(server.metrics.render)
+    print(f"   /metrics render:       {t_render * 1000:7.2f} ms")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+BENCHMARKS = {
+    "scoring": bench_scoring,
+    "fetch": bench_fetch,
+    "meta": bench_meta,
+    "blacklist": bench_blacklist,
+    "ping": bench_ping,
+    "index": bench_index,
+    "backends": bench_backends,
+    "encode": bench_encode,
+    "pool": bench_pool,
+    "settings": bench_settings,
+    "recommend": bench_recommend,
+    "history": bench_history,
+    "metrics": bench_metrics,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LocalAI_analyse backend benchmarks")
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    p = sub.add_parser("scoring", help="taxonomy scoring: cos_sim loop vs chunked matmul")
+    p.add_argument("--items", type=int, default=50000)
+    p.add_argument("--labels", type=int, default=700)
+    p.add_argument("--dim", type=int, default=768)
+    p.add_argument("--top-n", type=int, default=5)
+    p.add_argument("--threshold", type=float, default=0.1)
+    p.add_argument("--chunk-size", type=int, default=server.SCORE_CHUNK_SIZE)
+    p.add_argument("--legacy-items", type=int, default=5000, help="items timed with the slow loop")
+
+    p = sub.add_parser("fetch", help="deep-parsing fetcher vs requests.get against a local stub server")
+    p.add_argument("--pages", type=int, default=300)
+    p.add_argument("--body-kb", type=int, default=300)
+    p.add_argument("--delay", type=float, default=0.02)
+    p.add_argument("--workers", type=int, default=server.FETCH_MAX_WORKERS)
+    p.add_argument("--per-host", type=int, default=server.FETCH_PER_HOST)
+
+    p = sub.add_parser("meta", help="incremental <head> parser vs BeautifulSoup over saved HTML")
+    p.add_argument("--fixtures", default=str(HTML_FIXTURES), help="directory of saved .html pages (default: fixtures/html)")
+    p.add_argument("--synthetic", type=int, default=0, help="stub pages added to the saved ones")
+
+    p = sub.add_parser("blacklist", help="siteBlacklist filtering: substring scan vs compiled matcher")
+    p.add_argument("--urls", type=int, default=100_000)
+    p.add_argument("--rules", type=int, default=10_000)
+    p.add_argument("--naive-urls", type=int, default=2000, help="URLs timed with the slow scan")
+
+    p = sub.add_parser("ping", help="/ping latency under concurrent RSS updates, inline vs offloaded")
+    p.add_argument("--updates", type=int, default=8)
+    p.add_argument("--work", type=float, default=1.0, help="seconds of blocking work per update")
+    p.add_argument("--json-items", type=int, default=20000)
+    p.add_argument("--duration", type=float, default=2.0)
+
+    p = sub.add_parser("index", help="RSS recommendation search: exact scan vs HNSW, with recall")
+    p.add_argument("--articles", type=int, default=100_000)
+    p.add_argument("--dim", type=int, default=768)
+    p.add_argument("--clusters", type=int, default=300)
+    p.add_argument("--queries", type=int, default=20)
+    p.add_argument("--k", type=int, default=20)
+    p.add_argument("--churn", type=int, default=1000, help="articles added and expired between passes")
+
+    p = sub.add_parser("backends", help="embedding model: torch vs onnx vs onnx-int8 throughput and drift (needs the model)")
+    p.add_argument("--backends", nargs="+", default=list(server.MODEL_BACKENDS), choices=server.MODEL_BACKENDS)
+    p.add_argument("--sentences", type=int, default=2000)
+    p.add_argument("--batch-size", type=int, default=32)
+    p.add_argument("--drift-texts", type=int, default=500, help="titles added to the taxonomy paths for the drift check")
+
+    p = sub.add_parser("encode", help="model.encode fixed batches vs length-bucketed encode_texts (needs the model)")
+    p.add_argument("--texts", type=int, default=5000)
+    p.add_argument("--short-share", type=float, default=0.6, help="share of title-only texts")
+    p.add_argument("--batch-size", type=int, default=32, help="model.encode batch size")
+
+    p = sub.add_parser("pool", help="in-process encode_texts vs the multi-process encode pool (needs the model)")
+    p.add_argument("--texts", type=int, default=5000)
+    p.add_argument("--short-share", type=float, default=0.6, help="share of title-only texts")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    p.add_argument("--threads", type=int, default=0, help="intra-op threads per worker, 0 = cores / workers")
+    p.add_argument("--backend", default="torch", choices=server.MODEL_BACKENDS)
+
+    p = sub.add_parser("settings", help="save_rss_settings source removal: feed re-fetch vs feed registry")
+    p.add_argument("--feeds", type=int, default=60)
+    p.add_argument("--articles", type=int, default=50, help="articles per feed")
+    p.add_argument("--delay", type=float, default=0.3, help="simulated feed server latency (s)")
+
+    p = sub.add_parser("recommend", help="RSS recommendations: full recompute vs incremental per-label candidate lists")
+    p.add_argument("--articles", type=int, default=20_000)
+    p.add_argument("--dim", type=int, default=768)
+    p.add_argument("--clusters", type=int, default=300)
+    p.add_argument("--labels", type=int, default=20)
+    p.add_argument("--k", type=int, default=20)
+    p.add_argument("--churn", type=int, default=200, help="articles added and expired between passes")
+
+    p = sub.add_parser("history", help="history analysis: full run vs incremental run over an overlapping export (needs the model)")
+    p.add_argument("--days", type=int, default=30)
+    p.add_argument("--per-day", type=int, default=100)
+    p.add_argument("--shift", type=int, default=1, help="days between the two exports")
+    p.add_argument("--revisits", type=int, default=50, help="older entries visited again before the second export")
+    p.add_argument("--granularity", type=int, default=2)
+    p.add_argument("--threshold", type=float, default=0.1)
+
+    p = sub.add_parser("metrics", help="log(): reopen per line vs persistent handle; job.track overhead")
+    p.add_argument("--lines", type=int, default=20000)
+    p.add_argument("--stages", type=int, default=100_000)
+
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
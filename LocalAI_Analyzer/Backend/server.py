@@ -2,20 +2,26 @@
 # 🔹 LocalAI_analyse Backend
 # ======================================================
 
-import os, sys, time, json, shutil, threading, traceback
+import os, sys, io, time, json, shutil, threading, traceback, hashlib, uuid, asyncio, sqlite3, platform, atexit, multiprocessing
+import cProfile, pstats
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from collections import Counter
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from email.utils import parsedate_to_datetime
 import numpy as np, torch, requests, feedparser, tldextract
 from bs4 import BeautifulSoup
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
 #  FastAPI Framework
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 import uvicorn
 import re
+from urllib.parse import urlparse
+from html.parser import HTMLParser
+import codecs
 
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
@@ -52,13 +58,156 @@ try:
 except Exception:
     LOG_FILE = Path(__file__).resolve().parent / "localai_app_log.txt"
 
+_log_file = None
+_log_lock = threading.Lock()
+
 def log(msg: str):
+    global _log_file
     print(msg)
-    try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}\n")
-    except Exception:
-        pass
+    with _log_lock:
+        try:
+            if _log_file is None:
+                _log_file = open(LOG_FILE, "a", encoding="utf-8", buffering=1)   # line-buffered, opened once
+            _log_file.write(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}\n")
+        except Exception:
+            # drop the broken handle; the next line reopens the file
+            if _log_file is not None:
+                try:
+                    _log_file.close()
+                except Exception:
+                    pass
+            _log_file = None
+
+
+# ======================================================
+# Metrics
+# ======================================================
+TRACE_DIR = Path(__file__).resolve().parent.parent / "traces"
+TRACE_KEEP = 100          # newest run traces (with their profiles) kept in TRACE_DIR
+TRACE_MAX_SPANS = 5000    # stage spans recorded per run; later ones still count in the stage totals
+PROFILE_TOP = 30          # functions listed in a trace's profile summary
+
+METRIC_TYPES = {
+    "localai_stage_seconds": ("summary", "Time spent in a pipeline stage."),
+    "localai_run_seconds": ("summary", "Wall time of pipeline runs."),
+    "localai_runs_total": ("counter", "Finished pipeline runs by status."),
+    "localai_last_run_timestamp_seconds": ("gauge", "Unix time the last run of a pipeline finished."),
+    "localai_items_total": ("counter", "Items handled by pipeline runs (entries read, reused, articles fetched, ...)."),
+    "localai_encode_texts_total": ("counter", "Texts encoded by the model."),
+    "localai_encode_tokens_total": ("counter", "Tokens encoded by the model, without padding."),
+    "localai_encode_seconds_total": ("counter", "Time spent encoding texts."),
+    "localai_model_loaded": ("gauge", "1 while the model is loaded."),
+    "localai_process_memory_bytes": ("gauge", "Resident memory of the backend process."),
+    "localai_jobs_active": ("gauge", "Queued or running jobs."),
+}
+
+def _prometheus_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels) + "}"
+
+
+class Metrics:
+    """Process-wide counters, gauges and summaries for GET /metrics.
+
+    A series is a metric name plus a label set. Summaries keep only _sum and
+    _count, which is what rate() based dashboards need. render() returns the
+    Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._values[(name, tuple(sorted(labels.items())))] = float(value)
+
+    def observe(self, name: str, value: float, **labels):
+        labels = tuple(sorted(labels.items()))
+        with self._lock:
+            for key, amount in (((f"{name}_sum", labels), value), ((f"{name}_count", labels), 1.0)):
+                self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._values.get((name, tuple(sorted(labels.items()))), 0.0)
+
+    def render(self) -> str:
+        with self._lock:
+            series = sorted(self._values.items())
+        lines = []
+        for metric, (kind, help_text) in METRIC_TYPES.items():
+            names = (f"{metric}_sum", f"{metric}_count") if kind == "summary" else (metric,)
+            rows = sorted(((name, labels, value) for (name, labels), value in series if name in names),
+                          key=lambda row: (row[1], row[0]))
+            if not rows:
+                continue
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(f"{name}{_prometheus_labels(labels)} {float(value)!r}" for name, labels, value in rows)
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def profile_mode(value) -> str | None:
+    """A request's profile flag as None, "cprofile" or "pyinstrument" (when installed)."""
+    if value in (None, False, 0) or str(value).lower() in ("", "0", "false", "off", "none"):
+        return None
+    if str(value).lower() == "pyinstrument":
+        try:
+            import pyinstrument
+            return "pyinstrument"
+        except ImportError:
+            log("[Metrics] pyinstrument not installed (pip install pyinstrument), profiling with cProfile.")
+    return "cprofile"
+
+def start_profiler(mode: str):
+    """Profile the calling thread; pool and fetch threads are not included."""
+    if mode == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        return profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def save_profile(profiler, base: Path) -> dict:
+    """Stop `profiler`, write it next to the trace and return a summary for the trace."""
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        path = base.with_suffix(".prof")   # snakeviz / pstats
+        profiler.dump_stats(str(path))
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        return {"mode": "cprofile", "file": path.name, "top": out.getvalue().strip().splitlines()}
+    profiler.stop()
+    path = base.with_suffix(".html")
+    path.write_text(profiler.output_html(), encoding="utf-8")
+    return {"mode": "pyinstrument", "file": path.name,
+            "top": profiler.output_text(unicode=False, color=False).strip().splitlines()[:PROFILE_TOP * 2]}
+
+def prune_traces(keep: int = TRACE_KEEP):
+    traces = sorted(TRACE_DIR.glob("*.json"))   # names start with the run's start time
+    for trace in traces[:max(0, len(traces) - keep)]:
+        for path in TRACE_DIR.glob(f"{trace.stem}.*"):
+            path.unlink(missing_ok=True)
+
+def find_trace(job_id: str) -> Path | None:
+    if not re.fullmatch(r"[0-9a-f]{12}", job_id):
+        return None
+    matches = sorted(TRACE_DIR.glob(f"*_{job_id}.json"))
+    return matches[-1] if matches else None
 
 # ======================================================
 # FastAPI
@@ -125,8 +274,11 @@ def copy_latest_history():
     #copy
     backend_dir = Path(__file__).resolve().parent
     project_dir = backend_dir.parent
-    dest = project_dir / "history_exports" / "history_latest.json"
+    suffix = ".ndjson" if src.suffix.lower() == ".ndjson" else ".json"
+    dest = project_dir / "history_exports" / f"history_latest{suffix}"
     dest.parent.mkdir(parents=True, exist_ok=True)
+    # only one history_latest.* may exist, otherwise an older export could be picked up
+    dest.with_suffix(".json" if suffix == ".ndjson" else ".ndjson").unlink(missing_ok=True)
 
     try:
         shutil.copy(src, dest)
@@ -137,21 +289,510 @@ def copy_latest_history():
         return None
 
 # ======================================================
-#   Download RSS
+# Streaming history export reader
 # ======================================================
-def fetch_meta_description(url: str) -> str:
-    if not url.startswith(("http://", "https://")):
-        return ""
+HISTORY_READ_CHUNK = 1 << 16
+HISTORY_BATCH_SIZE = 1024
+
+class _JsonStream:
+    """Minimal pull parser over a JSON text file, decoding one value at a time."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(HISTORY_READ_CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed history export: expected {char!r}, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                # a value ending exactly at the buffer end may be truncated (e.g. a number)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def _iter_json_export(stream: _JsonStream, header: dict):
+    """Yield entries of the top-level "items" array; other keys go into `header`."""
+    while True:
+        char = stream.peek()
+        if char == "}" or not char:
+            return
+        if char == ",":
+            stream.pos += 1
+            continue
+        key = stream.value()
+        stream.expect(":")
+        if key != "items":
+            header[key] = stream.value()
+            continue
+        stream.expect("[")
+        while True:
+            char = stream.peek()
+            if char == "]":
+                stream.pos += 1
+                break
+            if char == ",":
+                stream.pos += 1
+                continue
+            if not char:
+                raise ValueError("Malformed history export: unterminated items array")
+            yield stream.value()
+
+
+def open_history_export(path: Path):
+    """Open a history export (.json or .ndjson) without loading it whole.
+
+    Returns (header, items): `header` holds every top-level field seen before
+    the entries (settings, totalCount, ...), `items` lazily yields the entries.
+    Fields that follow the entries in a .json file are added to `header` once
+    `items` is exhausted.
+    """
+    f = open(path, "r", encoding="utf-8")
+    header = {}
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_0)"}
-        response = requests.get(url, headers=headers, timeout=5)
-        if response.status_code != 200:
-            return ""
-        soup = BeautifulSoup(response.text, "html.parser")
-        meta = soup.find("meta", attrs={"name": "description"})
-        return meta["content"].strip() if meta and "content" in meta.attrs else ""
+        if path.suffix.lower() == ".ndjson":
+            first_item = None
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if "url" in row:
+                    first_item = row
+                    break
+                header.update(row)
+
+            def items():
+                with f:
+                    if first_item is not None:
+                        yield first_item
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+            return header, items()
+
+        stream = _JsonStream(f)
+        stream.expect("{")
+        items_iter = _iter_json_export(stream, header)
+        first = next(items_iter, None)
+
+        def items():
+            with f:
+                if first is None:
+                    return
+                yield first
+                yield from items_iter
+        return header, items()
     except Exception:
-        return ""
+        f.close()
+        raise
+
+
+def iter_batches(iterable, size: int = HISTORY_BATCH_SIZE):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ======================================================
+# Blacklist matcher
+# ======================================================
+_DOMAIN_RULE = re.compile(r"^(?:\*\.|\.)?((?:[a-z0-9-]+\.)+[a-z0-9-]{2,})\.?$")
+
+def _trie_regex(words) -> str:
+    """Regex matching any of `words`, laid out as a character trie so it scans in one pass."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node) -> str:
+        if "" in node:
+            return ""  # a shorter rule already matches here
+        singles, branches = [], []
+        for ch in sorted(node):
+            sub = build(node[ch])
+            if sub:
+                branches.append(re.escape(ch) + sub)
+            else:
+                singles.append(re.escape(ch))
+        if singles:
+            branches.append(singles[0] if len(singles) == 1 else "[" + "".join(singles) + "]")
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie)
+
+
+class BlacklistMatcher:
+    """Precompiled siteBlacklist.
+
+    Rules that look like a hostname ("example.com", "*.example.com") match
+    that host and its subdomains through a suffix set lookup; every other rule
+    is a case-insensitive substring of the URL, all of them combined into one
+    trie-shaped regex.
+    """
+
+    def __init__(self, rules):
+        self.domains = set()
+        substrings = set()
+        for rule in rules:
+            rule = (rule or "").strip().lower()
+            if not rule:
+                continue
+            m = _DOMAIN_RULE.match(rule)
+            if m:
+                self.domains.add(m.group(1))
+            else:
+                substrings.add(rule)
+        self.substring_count = len(substrings)
+        self.pattern = re.compile(_trie_regex(substrings)) if substrings else None
+
+    def __bool__(self):
+        return bool(self.domains) or self.pattern is not None
+
+    def host_blocked(self, host: str) -> bool:
+        if not host or not self.domains:
+            return False
+        parts = host.split(".")
+        return any(".".join(parts[i:]) in self.domains for i in range(len(parts) - 1))
+
+    def matches(self, url: str) -> bool:
+        if not url:
+            return False
+        url = url.lower()
+        if self.pattern is not None and self.pattern.search(url):
+            return True
+        if self.domains:
+            return self.host_blocked(self._hostname(url))
+        return False
+
+    @staticmethod
+    def _hostname(url: str) -> str:
+        """Hostname of an already lower-cased URL (cheaper than urlparse for the hot loop)."""
+        rest = url.partition("://")[2]
+        authority = re.split(r"[/?#]", rest, maxsplit=1)[0].rpartition("@")[2]
+        if authority.startswith("["):
+            return authority[1:].partition("]")[0]
+        return authority.partition(":")[0].rstrip(".")
+
+
+@lru_cache(maxsize=8)
+def _compiled_blacklist(rules: tuple) -> BlacklistMatcher:
+    matcher = BlacklistMatcher(rules)
+    log(f"[Setting] Blacklist compiled: {len(matcher.domains)} domain rules, {matcher.substring_count} substring rules.")
+    return matcher
+
+def compile_blacklist(rules) -> BlacklistMatcher:
+    """Matcher for `rules`, built once per distinct blacklist and cached."""
+    return _compiled_blacklist(tuple(rules or ()))
+
+
+# ======================================================
+#   Deep parsing fetcher
+# ======================================================
+FETCH_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_0)"
+FETCH_MAX_WORKERS = 12       # global concurrency cap
+FETCH_PER_HOST = 2           # concurrent requests per hostname
+FETCH_TIMEOUT = 5
+FETCH_MAX_BYTES = 256 * 1024 # stop reading a page after this many bytes
+FETCH_CHUNK_SIZE = 8192
+
+class HeadMetaParser(HTMLParser):
+    """Incremental <head> extractor, fed chunk by chunk as bytes arrive.
+
+    Collects <meta name="description">, og:description, twitter:description
+    and <title>; `done` turns True at </head> (or <body>) so the caller can
+    stop reading. Raw response bytes go through feed_bytes(); `failed` turns
+    True when the page's charset or markup cannot be handled, and the caller
+    then parses the bytes it read with parse_head_meta.
+    """
+
+    META_KEYS = {
+        "description": "description",
+        "og:description": "og_description",
+        "twitter:description": "twitter_description",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.title = ""
+        self.done = False
+        self.failed = False
+        self._in_title = False
+        self._decoder = None
+
+    def feed_bytes(self, chunk: bytes, content_type: str = ""):
+        """Decode and feed one chunk of the response; the first chunk picks the charset."""
+        if self.failed:
+            return
+        try:
+            if self._decoder is None:
+                # <meta charset> has to sit in the first 1024 bytes, i.e. the first chunk
+                self._decoder = codecs.getincrementaldecoder(html_charset(content_type, chunk))(errors="replace")
+            self.feed(self._decoder.decode(chunk))
+        except (LookupError, AssertionError, ValueError):
+            # unknown charset or markup the incremental parser rejects
+            self.failed = True
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "meta":
+            attrs = dict(attrs)
+            name = (attrs.get("name") or attrs.get("property") or "").strip().lower()
+            key = self.META_KEYS.get(name)
+            content = (attrs.get("content") or "").strip()
+            if key and content and key not in self.meta:
+                self.meta[key] = content
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "body":
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "head":
+            self.done = True
+
+    def handle_data(self, data):
+        if self._in_title and not self.done:
+            self.title += data
+
+    def result(self) -> dict:
+        description = (self.meta.get("description") or self.meta.get("og_description")
+                       or self.meta.get("twitter_description") or "")
+        return {"description": description, "title": " ".join(self.title.split()), **self.meta}
+
+
+_CONTENT_TYPE_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+
+def html_charset(content_type: str, head: bytes) -> str:
+    """Charset of an HTML response: the Content-Type's, else <meta charset> (or a BOM), else UTF-8.
+
+    requests assumes ISO-8859-1 for text/html without a charset, which
+    garbles UTF-8 and CJK pages, so its `response.encoding` is not used.
+    """
+    match = _CONTENT_TYPE_CHARSET.search(content_type or "")
+    if match:
+        return match.group(1)
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    match = _META_CHARSET.search(head[:4096])
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def parse_head_meta(html: bytes) -> dict:
+    """BeautifulSoup fallback for pages the incremental parser cannot handle."""
+    soup = BeautifulSoup(html, "html.parser")
+    found = {}
+    for name, key in HeadMetaParser.META_KEYS.items():
+        meta = soup.find("meta", attrs={"name": name}) or soup.find("meta", attrs={"property": name})
+        if meta and meta.get("content", "").strip():
+            found[key] = meta["content"].strip()
+    description = found.get("description") or found.get("og_description") or found.get("twitter_description") or ""
+    title = soup.title.get_text(" ", strip=True) if soup.title else ""
+    return {"description": description, "title": title, **found}
+
+
+def head_meta(parser: HeadMetaParser, head: bytes) -> dict:
+    """Metadata of a fetched <head>: the incremental parser's, else parse_head_meta over the bytes read."""
+    if parser.failed:
+        return parse_head_meta(head)
+    meta = parser.result()
+    if not meta["description"] and not parser.done and head:
+        meta.update(parse_head_meta(head))
+    return meta
+
+
+class MetaFetcher:
+    """Pooled, rate-limited fetcher that downloads only the <head> of each page.
+
+    A single requests.Session keeps connections alive per host. Concurrency is
+    capped globally (`max_workers`) and per hostname (`per_host`), and each
+    response is streamed only until `</head>` is seen or `max_bytes` is reached.
+    """
+
+    def __init__(self, max_workers: int = FETCH_MAX_WORKERS, per_host: int = FETCH_PER_HOST,
+                 timeout: float = FETCH_TIMEOUT, max_bytes: int = FETCH_MAX_BYTES):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max(per_host, 1), max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": FETCH_USER_AGENT})
+        self._host_limits = {}
+        self._host_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.last_run = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _host_semaphore(self, host: str) -> threading.Semaphore:
+        with self._host_lock:
+            sem = self._host_limits.get(host)
+            if sem is None:
+                sem = self._host_limits[host] = threading.Semaphore(self.per_host)
+            return sem
+
+    def fetch_head(self, url: str, headers: dict | None = None, parser: HeadMetaParser | None = None):
+        """Return (status, head_bytes, response_headers).
+
+        With a `parser`, decoded chunks are fed to it as they arrive and reading
+        stops as soon as it has seen the end of <head>. If the parser fails,
+        the rest of the head is read as plain bytes, so the caller can parse
+        them without a second request.
+        """
+        host = urlparse(url).hostname or ""
+        with self._host_semaphore(host):
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code != 200:
+                    return response.status_code, b"", response.headers
+                buf = bytearray()
+                for chunk in response.iter_content(FETCH_CHUNK_SIZE):
+                    tail_start = max(0, len(buf) - 6)
+                    buf.extend(chunk)
+                    if parser is not None and not parser.failed:
+                        parser.feed_bytes(chunk, response.headers.get("Content-Type", ""))
+                        if parser.done:
+                            break
+                    if (parser is None or parser.failed) and b"</head" in bytes(buf[tail_start:]).lower():
+                        break
+                    if len(buf) >= self.max_bytes:
+                        break
+                return response.status_code, bytes(buf[:self.max_bytes]), response.headers
+
+    def fetch_meta(self, url: str, headers: dict | None = None) -> dict:
+        """Head metadata for `url`.
+
+        Always returns "description", "title" and "status" (HTTP status, 0 on
+        network errors) plus the response's "etag"/"last_modified" validators.
+        Pass If-None-Match/If-Modified-Since in `headers` to revalidate; an
+        unchanged page then comes back with status 304 and no description.
+        """
+        meta = {"description": "", "title": "", "status": 0, "etag": None, "last_modified": None}
+        if not url.startswith(("http://", "https://")):
+            return meta
+        parser = HeadMetaParser()
+        head = b""
+        try:
+            status, head, response_headers = self.fetch_head(url, headers=headers, parser=parser)
+            if status == 200:
+                meta.update(head_meta(parser, head))
+            meta.update({
+                "status": status,
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+            })
+            with self._stats_lock:
+                self.last_run["bytes"] = self.last_run.get("bytes", 0) + len(head)
+                if status not in (200, 304):
+                    self.last_run["errors"] = self.last_run.get("errors", 0) + 1
+            return meta
+        except Exception:
+            with self._stats_lock:
+                self.last_run["errors"] = self.last_run.get("errors", 0) + 1
+            return meta
+
+    def fetch_description(self, url: str) -> str:
+        return self.fetch_meta(url)["description"]
+
+    @staticmethod
+    def interleave_by_host(urls):
+        """Round-robin URLs across hosts so one busy host does not hold every worker."""
+        by_host = {}
+        for url in urls:
+            by_host.setdefault(urlparse(url).hostname or "", []).append(url)
+        queues = list(by_host.values())
+        ordered = []
+        for i in range(max((len(q) for q in queues), default=0)):
+            ordered.extend(q[i] for q in queues if i < len(q))
+        return ordered
+
+    def fetch_many(self, urls, on_result=None, request_headers: dict | None = None) -> dict:
+        """Fetch head metadata for `urls`; returns {url: meta} and fills `last_run` stats.
+
+        `request_headers` optionally maps a URL to extra (conditional) headers.
+        """
+        request_headers = request_headers or {}
+        self.last_run = {"pages": len(urls), "bytes": 0, "errors": 0}
+        start = time.perf_counter()
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_meta, url, request_headers.get(url)): url
+                for url in self.interleave_by_host(urls)
+            }
+            for idx, future in enumerate(as_completed(futures)):
+                url = futures[future]
+                results[url] = future.result()
+                if on_result:
+                    on_result(idx, len(futures), url, results[url])
+        elapsed = time.perf_counter() - start
+        self.last_run.update({
+            "seconds": round(elapsed, 3),
+            "pages_per_sec": round(len(urls) / elapsed, 2) if elapsed > 0 else None,
+            "kb_per_page": round(self.last_run["bytes"] / 1024 / len(urls), 1) if urls else 0,
+        })
+        log(f"[BeautifulSoup] Fetched {len(urls)} pages in {elapsed:.2f}s "
+            f"({self.last_run['pages_per_sec']} pages/s, {self.last_run['bytes'] / 1024:.0f} KB, "
+            f"{self.last_run['errors']} errors)")
+        return results
+
+
+def fetch_meta_description(url: str) -> str:
+    with MetaFetcher(max_workers=1) as fetcher:
+        return fetcher.fetch_description(url)
 
 # ======================================================
 # Clean text for embedding 
@@ -166,123 +807,2284 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
+# ======================================================
+# Enriched-history cache
+# ======================================================
+ENRICH_TTL_DAYS = 14            # revalidate successful fetches after this
+ENRICH_RETRY_BASE_HOURS = 1     # first retry delay after a failed fetch, doubled per failure
+ENRICH_RETRY_MAX_DAYS = 30
+ENRICH_CACHE_MAX_ENTRIES = 50_000
+
+class EnrichmentCache:
+    """history_enriched.json with per-URL fetch metadata.
+
+    Each entry keeps description/title plus status, fetched_at, ETag /
+    Last-Modified, failure count and next_check_at. Failures back off
+    exponentially, successes are revalidated with a conditional GET once the
+    TTL has passed, and the least recently seen URLs are evicted above
+    `max_entries`.
+    """
+
+    def __init__(self, path: Path, ttl_days: float = ENRICH_TTL_DAYS, max_entries: int = ENRICH_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not (isinstance(data, dict) and "items" in data):
+                return
+            try:
+                legacy_time = datetime.fromisoformat(data.get("updated_at", "")).timestamp()
+            except ValueError:
+                legacy_time = time.time()
+            for entry in data["items"]:
+                if not entry.get("url"):
+                    continue
+                if "fetched_at" not in entry:
+                    # entries written before fetch metadata existed
+                    ok = bool(entry.get("description"))
+                    entry.update({
+                        "status": "ok" if ok else "failed",
+                        "fetched_at": legacy_time,
+                        "failures": 0 if ok else 1,
+                        "next_check_at": legacy_time + (self.ttl if ok else self._backoff(1)),
+                    })
+                self.entries[entry["url"]] = entry
+            log(f"[BeautifulSoup] Loaded {len(self.entries)} cached records.")
+        except Exception as e:
+            log(f"[BeautifulSoup] Failed to read cache; regenerating. Error: {e}")
+            self.entries = {}
+
+    @staticmethod
+    def _backoff(failures: int) -> float:
+        return min(ENRICH_RETRY_BASE_HOURS * 3600 * 2 ** max(failures - 1, 0), ENRICH_RETRY_MAX_DAYS * 86400)
+
+    def get(self, url: str) -> dict:
+        return self.entries.get(url, {})
+
+    def plan(self, urls, now: float | None = None):
+        """Split `urls` into the ones to fetch and conditional headers for revalidations."""
+        now = now or time.time()
+        to_fetch, headers = [], {}
+        for url in dict.fromkeys(urls):
+            if not url.startswith(("http://", "https://")):
+                continue
+            entry = self.entries.get(url)
+            if entry is not None:
+                entry["last_seen"] = now
+                if now < entry.get("next_check_at", 0):
+                    continue
+                if entry.get("status") == "ok":
+                    validators = {}
+                    if entry.get("etag"):
+                        validators["If-None-Match"] = entry["etag"]
+                    if entry.get("last_modified"):
+                        validators["If-Modified-Since"] = entry["last_modified"]
+                    if validators:
+                        headers[url] = validators
+            to_fetch.append(url)
+        return to_fetch, headers
+
+    def record(self, url: str, meta: dict, now: float | None = None) -> str:
+        """Store a fetch result; returns "ok", "not_modified" or "failed"."""
+        now = now or time.time()
+        entry = self.entries.setdefault(url, {"url": url, "description": "", "title": "", "failures": 0})
+        entry["last_seen"] = now
+        status = meta.get("status", 0)
+        if status == 200:
+            entry.update({
+                "description": meta.get("description", ""),
+                "title": meta.get("title", ""),
+                "status": "ok",
+                "http_status": status,
+                "etag": meta.get("etag"),
+                "last_modified": meta.get("last_modified"),
+                "fetched_at": now,
+                "failures": 0,
+                "next_check_at": now + self.ttl,
+            })
+            return "ok"
+        if status == 304:
+            entry.update({
+                "status": "ok",
+                "http_status": status,
+                "fetched_at": now,
+                "failures": 0,
+                "next_check_at": now + self.ttl,
+            })
+            if meta.get("etag"):
+                entry["etag"] = meta["etag"]
+            if meta.get("last_modified"):
+                entry["last_modified"] = meta["last_modified"]
+            return "not_modified"
+        # keep a previously fetched description, just back off before retrying
+        entry["failures"] = entry.get("failures", 0) + 1
+        entry.update({
+            "status": "ok" if entry.get("description") else "failed",
+            "http_status": status,
+            "next_check_at": now + self._backoff(entry["failures"]),
+        })
+        entry.setdefault("fetched_at", now)
+        return "failed"
+
+    def evict(self) -> int:
+        overflow = len(self.entries) - self.max_entries
+        if overflow <= 0:
+            return 0
+        oldest = sorted(self.entries.values(), key=lambda e: e.get("last_seen", e.get("fetched_at", 0)))[:overflow]
+        for entry in oldest:
+            del self.entries[entry["url"]]
+        return overflow
+
+    def save(self):
+        evicted = self.evict()
+        if evicted:
+            log(f"[BeautifulSoup] Evicted {evicted} least recently seen cache records.")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.parent / f"{self.path.name}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"items": list(self.entries.values()), "updated_at": datetime.now().isoformat()}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
 # ======================================================
 # Beautiful + embeddingTEXT
 # ======================================================
-def enrich_history_items(items, use_deep_parsing=True):
-    enriched_path = Path(__file__).resolve().parent.parent / "history_compare" / "history_enriched.json"
-    enriched_cache = {}
+ENRICHED_CACHE_PATH = Path(__file__).resolve().parent.parent / "history_compare" / "history_enriched.json"
+
+def enrich_history_items(items, use_deep_parsing=True, ttl_days: float = ENRICH_TTL_DAYS, enriched_cache=None,
+                         job: "Job | None" = None):
+    """Attach description + embeddingText to `items`.
+
+    Pass an open EnrichmentCache to enrich several batches against one cache;
+    the caller is then responsible for saving it. With a `job`, the network
+    fetch is timed as stage "fetch" and the cache lookups and text building
+    as "enrich".
+    """
+    track = job.track if job is not None else (lambda name: nullcontext())
     if not use_deep_parsing:
         log("[BeautifulSoup] Deep parsing:false")
+        with track("enrich"):
+            updated_items = []
+            for item in items:
+                url = item.get("url", "")
+                title = item.get("title", "")
+                hostname = ""
+                try:
+                    ext = tldextract.extract(url)
+                    hostname = f"{ext.domain}.{ext.suffix}" if ext.suffix else ext.domain
+                except Exception:
+                    pass
+                embedding_text = f"{title}. Source: {hostname}".strip()
+                updated_items.append({**item, "description": "", "embeddingText": embedding_text})
+        return updated_items
+
+    own_cache = enriched_cache is None
+    with track("enrich"):
+        if own_cache:
+            enriched_cache = EnrichmentCache(ENRICHED_CACHE_PATH, ttl_days)
+        urls_to_fetch, conditional = enriched_cache.plan(i["url"] for i in items if i.get("url"))
+    if urls_to_fetch:
+        outcomes = Counter()
+
+        def on_result(idx, total, url, meta):
+            outcome = enriched_cache.record(url, meta)
+            outcomes[outcome] += 1
+            log(f"[BeautifulSoup] Fetched ({idx + 1} / {total}) [{outcome}]: {url}")
+
+        log(f"[BeautifulSoup] {len(urls_to_fetch)} URLs due ({len(conditional)} conditional revalidations).")
+        with track("fetch"), MetaFetcher() as fetcher:
+            fetcher.fetch_many(urls_to_fetch, on_result, conditional)
+        log(f"[BeautifulSoup] Fetch outcomes: {dict(outcomes)}")
+    else:
+        log("[BeautifulSoup] All URLs served from cache, no network requests.")
+
+    with track("enrich"):
         updated_items = []
         for item in items:
             url = item.get("url", "")
             title = item.get("title", "")
+            cached = enriched_cache.get(url)
+            if title in ("", "(NONE)"):
+                title = cached.get("title", "") or title
+            desc = cached.get("description", "")
             hostname = ""
             try:
                 ext = tldextract.extract(url)
                 hostname = f"{ext.domain}.{ext.suffix}" if ext.suffix else ext.domain
             except Exception:
                 pass
-            embedding_text = f"{title}. Source: {hostname}".strip()
-            updated_items.append({**item, "description": "", "embeddingText": embedding_text})
-        return updated_items
+            raw_text = f"{title} {desc} Source {hostname}"
+            embedding_text = clean_text(raw_text)
+            updated_items.append({**item, "description": desc, "embeddingText": embedding_text})
+
+        if own_cache:
+            enriched_cache.save()
+    return updated_items
+
 
-    if enriched_path.exists():
+
+# ======================================================
+# Vector Store
+# ======================================================
+class VectorStore:
+    """Append-only float32 vector file (`<name>.f32`) with a small JSON key index (`<name>.index.json`).
+
+    New vectors are appended to the end of the file and rows are read back
+    through a memory map. Each index entry is [row, last_used]. The index also
+    records the fingerprint of the model that produced the vectors; opening the
+    store with a different fingerprint discards it.
+    """
+
+    def __init__(self, base_path: Path, fingerprint: str = ""):
+        self.vec_path = base_path.parent / f"{base_path.name}.f32"
+        self.index_path = base_path.parent / f"{base_path.name}.index.json"
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._load()
+
+    def _reset(self):
+        self.dim = 0
+        self.row_count = 0
+        self.keys = {}
+        self._mmap = None
+        self._dirty = False
+
+    def _load(self):
+        self._reset()
+        if not self.index_path.exists():
+            if self.vec_path.exists():
+                self.vec_path.unlink()
+            return
         try:
-            with open(enriched_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict) and "items" in data:
-                    enriched_cache = {i["url"]: i for i in data["items"] if i.get("url")}
-                    log(f"[BeautifulSoup] Loaded {len(enriched_cache)} cached records.")
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("fingerprint") != self.fingerprint:
+                log(f"[Cache] {self.vec_path.name} was built by another model, discarding.")
+                self.clear()
+                return
+            self.dim = int(meta["dim"])
+            self.row_count = int(meta["rows"])
+            self.keys = meta["keys"]
+            expected = self.row_count * self.dim * 4
+            actual = self.vec_path.stat().st_size if self.vec_path.exists() else 0
+            if actual < expected:
+                raise ValueError(f"vector file truncated ({actual} < {expected} bytes)")
+            if actual > expected:
+                # rows appended after the last index write (e.g. a crash): drop them
+                with open(self.vec_path, "r+b") as f:
+                    f.truncate(expected)
         except Exception as e:
-            log(f"[BeautifulSoup] Failed to read cache; regenerating. Error: {e}")
-            enriched_cache = {}
+            log(f"[Cache] Failed to load {self.index_path.name}; starting empty. Error: {e}")
+            self.clear()
+
+    def _matrix(self):
+        if self._mmap is None and self.row_count:
+            self._mmap = np.memmap(self.vec_path, dtype=np.float32, mode="r", shape=(self.row_count, self.dim))
+        return self._mmap
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def get_many(self, keys) -> dict:
+        """Return {key: vector} for the keys that are present and mark them as used."""
+        with self._lock:
+            now = int(time.time())
+            found_keys, rows = [], []
+            for key in keys:
+                entry = self.keys.get(key)
+                if entry is None:
+                    continue
+                entry[1] = now
+                found_keys.append(key)
+                rows.append(entry[0])
+            self.hits += len(found_keys)
+            self.misses += len(keys) - len(found_keys)
+            if not rows:
+                return {}
+            self._dirty = True
+            matrix = np.asarray(self._matrix()[rows])
+            return dict(zip(found_keys, matrix))
+
+    def live_rows(self, keys):
+        """(keys, row numbers) for the given stored keys, as arrays."""
+        with self._lock:
+            keys = [k for k in keys if k in self.keys]
+            return np.array(keys, dtype=object), np.array([self.keys[k][0] for k in keys], dtype=np.int64)
+
+    @contextmanager
+    def matrix(self):
+        """The memory-mapped (rows, dim) matrix, dead rows included; held under the store lock."""
+        with self._lock:
+            matrix = self._matrix()
+            yield matrix if matrix is not None else np.empty((0, self.dim), dtype=np.float32)
+
+    def put_many(self, keys, vectors):
+        """Append vectors for `keys`; a key that already exists points to its new row."""
+        if not len(keys):
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            if not self.dim:
+                self.dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"vector dim {vectors.shape[1]} != store dim {self.dim}")
+            self.vec_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.vec_path, "ab") as f:
+                f.write(vectors.tobytes())
+            now = int(time.time())
+            for i, key in enumerate(keys):
+                self.keys[key] = [self.row_count + i, now]
+            self.row_count += len(keys)
+            self._mmap = None
+            self._dirty = True
+
+    def evict(self, max_entries: int | None = None, max_age_days: float | None = None) -> int:
+        """Drop entries unused for `max_age_days`, then least recently used ones above `max_entries`."""
+        with self._lock:
+            doomed = set()
+            if max_age_days:
+                cutoff = time.time() - max_age_days * 86400
+                doomed = {k for k, (_, used) in self.keys.items() if used < cutoff}
+            if max_entries and len(self.keys) - len(doomed) > max_entries:
+                remaining = sorted((used, k) for k, (_, used) in self.keys.items() if k not in doomed)
+                doomed.update(k for _, k in remaining[:len(remaining) - max_entries])
+            for key in doomed:
+                del self.keys[key]
+            if doomed:
+                self._dirty = True
+                self.compact()
+            return len(doomed)
+
+    def discard(self, keys) -> int:
+        """Tombstone `keys`: the index forgets them, their rows stay until the next compaction."""
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self.keys.pop(key, None) is not None:
+                    removed += 1
+            self._dirty = self._dirty or removed > 0
+            return removed
+
+    def compact_if_needed(self, dead_ratio: float = 0.3, min_rows: int = 256) -> bool:
+        with self._lock:
+            dead = self.row_count - len(self.keys)
+            if dead and self.row_count >= min_rows and dead / self.row_count >= dead_ratio:
+                self.compact()
+                return True
+            if dead and not self.keys:
+                self.compact()
+                return True
+            return False
+
+    def compact(self):
+        """Rewrite the vector file with live rows only."""
+        with self._lock:
+            live = sorted(self.keys.values(), key=lambda e: e[0])
+            rows = [e[0] for e in live]
+            matrix = np.asarray(self._matrix()[rows]) if rows else np.empty((0, self.dim), dtype=np.float32)
+            self._mmap = None
+            tmp = self.vec_path.parent / f"{self.vec_path.name}.tmp"
+            matrix.tofile(tmp)
+            os.replace(tmp, self.vec_path)
+            for new_row, entry in enumerate(live):
+                entry[0] = new_row
+            self.row_count = len(live)
+            self._dirty = True
+            self.flush()
+
+    def flush(self):
+        """Persist the key index (vectors are already on disk)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.parent / f"{self.index_path.name}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({
+                    "fingerprint": self.fingerprint,
+                    "dim": self.dim,
+                    "rows": self.row_count,
+                    "updated": datetime.now().isoformat(),
+                    "keys": self.keys,
+                }, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.index_path)
+            self._dirty = False
+
+    def clear(self):
+        with self._lock:
+            self._mmap = None
+            for path in (self.vec_path, self.index_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._reset()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.keys),
+                "rows": self.row_count,
+                "dead_rows": self.row_count - len(self.keys),
+                "dim": self.dim,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "size_mb": round(self.row_count * self.dim * 4 / (1024 * 1024), 2),
+            }
 
-    urls_to_fetch = [i["url"] for i in items if i.get("url") not in enriched_cache]
-    if urls_to_fetch:
-        with ThreadPoolExecutor(max_workers=12) as executor:
-            futures = {executor.submit(fetch_meta_description, url): url for url in urls_to_fetch}
-            for idx, future in enumerate(as_completed(futures)):
-                url = futures[future]
-                desc = future.result()
-                enriched_cache[url] = {"url": url, "description": desc}
-                log(f"[BeautifulSoup] Successfully fetched ({idx + 1} / {len(futures)}): {url}")
-
-    updated_items = []
-    for item in items:
-        url = item.get("url", "")
-        title = item.get("title", "")
-        desc = enriched_cache.get(url, {}).get("description", "")
-        hostname = ""
+
+
+# ======================================================
+# RSS Embedding Cache
+# ======================================================
+
+EMBED_CACHE_PATH = Path(__file__).resolve().parent.parent / "rss" / "rss_embedding_cache.json"  # legacy JSON cache
+EMBED_STORE_BASE = Path(__file__).resolve().parent.parent / "rss" / "rss_embeddings"
+EMBED_STORE_COMPACT_RATIO = 0.3
+
+_rss_embedding_store = None
+_rss_embedding_lock = threading.Lock()
+
+def migrate_legacy_embedding_cache(store: VectorStore):
+    """Move vectors from the old rss_embedding_cache.json into the binary store, then delete it."""
+    try:
+        with open(EMBED_CACHE_PATH, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+        if legacy:
+            vectors = np.array(list(legacy.values()), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            store.put_many(list(legacy.keys()), vectors)
+            store.flush()
+        log(f"[RSS] Migrated {len(legacy)} embeddings from {EMBED_CACHE_PATH.name}")
+    except Exception as e:
+        log(f"[RSS] Legacy embedding cache unreadable, dropping it: {e}")
+    EMBED_CACHE_PATH.unlink(missing_ok=True)
+
+def get_rss_embedding_store() -> VectorStore:
+    global _rss_embedding_store
+    fingerprint = model_fingerprint()
+    with _rss_embedding_lock:
+        if _rss_embedding_store is None or _rss_embedding_store.fingerprint != fingerprint:
+            _rss_embedding_store = VectorStore(EMBED_STORE_BASE, fingerprint)
+            if EMBED_CACHE_PATH.exists():
+                migrate_legacy_embedding_cache(_rss_embedding_store)
+        return _rss_embedding_store
+
+def reset_rss_embedding_store():
+    global _rss_embedding_store
+    with _rss_embedding_lock:
+        if _rss_embedding_store is not None:
+            _rss_embedding_store.clear()
+        _rss_embedding_store = None
+
+def clean_embedding_cache(valid_ids):
+    store = get_rss_embedding_store()
+    stale = [key for key in store.keys if key not in valid_ids]
+    if stale:
+        store.discard(stale)
+        log(f"[RSS] Cleaned {len(stale)} outdated embeddings")
+    if store.compact_if_needed(EMBED_STORE_COMPACT_RATIO):
+        log(f"[RSS] Embedding store compacted to {store.row_count} rows")
+    store.flush()
+    return store
+
+
+
+# ======================================================
+#  Taxonomy Store (float32 .npy, memory-mapped)
+# ======================================================
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def convert_taxonomy_embeddings(json_path: Path, npy_path: Path, meta_path: Path, checksum: str | None = None):
+    """One-time conversion of taxonomy_embeddings.json into a normalized float32 matrix + paths sidecar."""
+    start = time.perf_counter()
+    with open(json_path, "r", encoding="utf-8") as f:
+        taxonomy_data = json.load(f)["data"]
+    matrix = np.array([np.fromstring(t["embedding"], dtype=np.float32, sep=" ") for t in taxonomy_data], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1, norms)
+    paths = [t["path"] for t in taxonomy_data]
+
+    stat = json_path.stat()
+    meta = {
+        "source": json_path.name,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "checksum": checksum or file_sha256(json_path),
+        "count": len(paths),
+        "dim": int(matrix.shape[1]) if len(paths) else 0,
+        "normalized": True,
+        "paths": paths,
+    }
+    try:
+        tmp_npy = npy_path.with_suffix(".tmp.npy")
+        np.save(tmp_npy, matrix)
+        os.replace(tmp_npy, npy_path)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        log(f"[Model] Taxonomy converted to {npy_path.name} in {time.perf_counter() - start:.2f}s.")
+    except Exception as e:
+        log(f"[Model] Could not write binary taxonomy ({e}); using in-memory matrix.")
+    return matrix, paths
+
+def load_taxonomy_matrix(json_path: Path | None = None):
+    """Memory-map the normalized taxonomy matrix, rebuilding it from JSON when missing or stale."""
+    json_path = json_path or resource_path("data/taxonomy_embeddings.json")
+    npy_path = json_path.with_suffix(".npy")
+    meta_path = json_path.with_suffix(".meta.json")
+
+    if npy_path.exists() and meta_path.exists():
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            fresh = True
+            if json_path.exists():
+                stat = json_path.stat()
+                if (meta.get("source_size"), meta.get("source_mtime_ns")) != (stat.st_size, stat.st_mtime_ns):
+                    checksum = file_sha256(json_path)
+                    fresh = checksum == meta.get("checksum")
+                    if not fresh:
+                        log("[Model] taxonomy_embeddings.json changed, rebuilding binary taxonomy...")
+                        return convert_taxonomy_embeddings(json_path, npy_path, meta_path, checksum)
+                    meta.update({"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns})
+                    with open(meta_path, "w", encoding="utf-8") as f:
+                        json.dump(meta, f, ensure_ascii=False)
+            matrix = np.load(npy_path, mmap_mode="r")
+            if matrix.shape[0] == len(meta["paths"]):
+                return matrix, meta["paths"]
+            log("[Model] Binary taxonomy is inconsistent, rebuilding...")
+        except Exception as e:
+            log(f"[Model] Failed to read binary taxonomy ({e}), rebuilding...")
+
+    return convert_taxonomy_embeddings(json_path, npy_path, meta_path)
+
+
+# ======================================================
+#  Model
+# ======================================================
+MODEL_DIR = "data/sentence-transformers--all-mpnet-base-v2"
+MODEL_BACKENDS = ("torch", "onnx", "onnx-int8")
+MODEL_BACKEND = os.environ.get("LOCALAI_MODEL_BACKEND", "torch").lower()   # torch | onnx | onnx-int8
+ONNX_DIR = "onnx"   # exported graphs live next to the weights, in <model>/onnx/
+MODEL_MAX_SEQ_LENGTH = int(os.environ.get("LOCALAI_MAX_SEQ_LENGTH", 0))   # tokens; 0 = the model's own limit
+ONNX_QUANT_CONFIG = "arm64" if platform.machine().lower() in ("arm64", "aarch64") else "avx2"
+
+def model_fingerprint(model_path: Path | None = None, backend: str | None = None) -> str:
+    """Identify the model directory by its file names, sizes and mtimes.
+
+    The exported ONNX graphs are left out so exporting does not invalidate the
+    caches; the backend itself is mixed in instead, since its embeddings
+    differ slightly from the PyTorch ones. By default that is the backend the
+    registry actually loaded (torch after a fallback), so load the model
+    before fingerprinting vectors it is about to write.
+    """
+    model_path = model_path or resource_path(MODEL_DIR)
+    backend = backend or model_registry.active_backend() or MODEL_BACKEND
+    h = hashlib.sha1(model_path.name.encode("utf-8"))
+    if backend != "torch":
+        h.update(f"backend:{backend}".encode("utf-8"))
+    if MODEL_MAX_SEQ_LENGTH:
+        h.update(f"max_seq_length:{MODEL_MAX_SEQ_LENGTH}".encode("utf-8"))
+    if model_path.exists():
+        for f in sorted(model_path.rglob("*")):
+            rel = f.relative_to(model_path)
+            if f.is_file() and rel.parts[0] != ONNX_DIR:
+                st = f.stat()
+                h.update(f"{rel}:{st.st_size}:{st.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def onnx_model_file(backend: str) -> str:
+    """Path of the ONNX graph for `backend`, relative to the model directory."""
+    if backend == "onnx-int8":
+        return f"{ONNX_DIR}/model_quint8_{ONNX_QUANT_CONFIG}.onnx"
+    return f"{ONNX_DIR}/model.onnx"
+
+def export_onnx_model(model_path: Path, backend: str) -> Path:
+    """Export (and for onnx-int8 quantize) the model once; later loads reuse the file."""
+    target = model_path / onnx_model_file(backend)
+    if target.exists():
+        return target
+    import tempfile
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+    log(f"[Model] Exporting {backend} graph to {target} (one-time)...")
+    start = time.perf_counter()
+    if backend == "onnx-int8":
+        export_onnx_model(model_path, "onnx")
+        source = SentenceTransformer(str(model_path), device="cpu", backend="onnx", local_files_only=True,
+                                     model_kwargs={"file_name": onnx_model_file("onnx")})
+    else:
+        source = SentenceTransformer(str(model_path), device="cpu", backend="onnx", local_files_only=True)
+    # save into a scratch folder: save_pretrained would also rewrite config.json in the model directory
+    with tempfile.TemporaryDirectory() as tmp:
+        if backend == "onnx-int8":
+            export_dynamic_quantized_onnx_model(source, ONNX_QUANT_CONFIG, tmp)
+        else:
+            source[0].auto_model.save_pretrained(tmp)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(Path(tmp) / onnx_model_file(backend)), str(target))
+    log(f"[Model] Exported {target.name} in {time.perf_counter() - start:.1f}s.")
+    return target
+
+def load_sentence_model(model_path: Path | None = None, backend: str | None = None, device: str | None = None,
+                        threads: int | None = None):
+    """Load the SentenceTransformer on `backend`; returns (model, backend, device).
+
+    The ONNX backends run on the CPU through onnxruntime. If they cannot be
+    used (optimum/onnxruntime missing, export failed) the PyTorch model is
+    loaded instead. LOCALAI_MAX_SEQ_LENGTH lowers the truncation length.
+    `threads` caps the onnxruntime intra-op threads (encode pool workers).
+    """
+    model_path = (model_path or resource_path(MODEL_DIR)).resolve()
+    backend = backend or MODEL_BACKEND
+    if backend not in MODEL_BACKENDS:
+        log(f"[Model] Unknown backend '{backend}', using torch. Options: {', '.join(MODEL_BACKENDS)}")
+        backend = "torch"
+    if backend != "torch":
+        try:
+            export_onnx_model(model_path, backend)
+            model_kwargs = {"file_name": onnx_model_file(backend), "provider": "CPUExecutionProvider"}
+            if threads:
+                import onnxruntime
+                options = onnxruntime.SessionOptions()
+                options.intra_op_num_threads = threads
+                model_kwargs["session_options"] = options
+            model = SentenceTransformer(str(model_path), device="cpu", backend="onnx", local_files_only=True,
+                                        model_kwargs=model_kwargs)
+            device = "cpu"
+        except Exception:
+            log(traceback.format_exc())
+            log(f"[Model] {backend} backend unavailable (pip install \"optimum[onnxruntime]\"), falling back to torch.")
+            backend = "torch"
+    if backend == "torch":
+        device = device or ("mps" if torch.backends.mps.is_available() else "cuda" if torch.cuda.is_available() else "cpu")
+        model = SentenceTransformer(str(model_path), device=device, local_files_only=True)
+    if MODEL_MAX_SEQ_LENGTH:
+        model.max_seq_length = min(MODEL_MAX_SEQ_LENGTH, model.max_seq_length)
+    return model, backend, device
+
+def load_model_and_taxonomy(backend: str | None = None):
+    log("[Model] Loading model and taxonomy library...")
+    model, backend, device = load_sentence_model(backend=backend)
+    log(f"[Model] Inference backend: {backend} on {device}.")
+    taxonomy_embeddings, taxonomy_paths = load_taxonomy_matrix()
+    log(f"[Model] Taxonomy loaded successfully with {len(taxonomy_paths)} entries.")
+    return model, taxonomy_embeddings, taxonomy_paths, device, backend
+
+def measure_backend_drift(reference, candidate, texts, taxonomy_matrix, batch_size: int = 64) -> dict:
+    """Compare `candidate` embeddings with the `reference` model's on `texts`.
+
+    Reports the cosine between the two embeddings of each text and how often
+    both pick the same top-1 taxonomy label.
+    """
+    a = reference.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+    b = candidate.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+    cosine = np.sum(a * b, axis=1)
+    top_a = np.argmax(a @ taxonomy_matrix.T, axis=1)
+    top_b = np.argmax(b @ taxonomy_matrix.T, axis=1)
+    return {
+        "texts": len(texts),
+        "cosine_mean": round(float(cosine.mean()), 6),
+        "cosine_min": round(float(cosine.min()), 6),
+        "top1_agreement": round(float(np.mean(top_a == top_b)), 4),
+    }
+
+
+# ======================================================
+#  Model Registry
+# ======================================================
+MODEL_IDLE_TIMEOUT_MINUTES = float(os.environ.get("LOCALAI_MODEL_IDLE_MINUTES", 30))
+
+def get_process_memory_mb() -> float | None:
+    """Resident memory of this process in MB (None if it cannot be read)."""
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / (1024 * 1024), 1)
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except Exception:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reports bytes, Linux reports KB
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except Exception:
+        return None
+
+
+class ModelRegistry:
+    """Process-wide holder for the SentenceTransformer and the taxonomy matrix.
+
+    Everything is loaded once (at startup or on first use) and shared by all
+    endpoints and the auto-update thread. The model is released again after
+    `idle_timeout` minutes without use.
+    """
+
+    def __init__(self, idle_timeout_minutes: float = MODEL_IDLE_TIMEOUT_MINUTES):
+        self.idle_timeout = idle_timeout_minutes * 60
+        self._lock = threading.RLock()
+        self._model = None
+        self._taxonomy_embeddings = None
+        self._taxonomy_paths = None
+        self._device = None
+        self._backend = None
+        self._active = 0
+        self._last_used = 0.0
+        self._loaded_at = None
+        self._load_seconds = None
+        self._load_count = 0
+        self._memory_before_mb = None
+        self._memory_after_mb = None
+        self._watcher = None
+        self._encode_pool = None
+        self._encode_pool_failed = False
+
+    def _ensure_loaded(self):
+        if self._model is not None:
+            return
+        self._memory_before_mb = get_process_memory_mb()
+        start = time.perf_counter()
+        model, taxonomy_embeddings, taxonomy_paths, device, backend = load_model_and_taxonomy()
+        self._load_seconds = round(time.perf_counter() - start, 3)
+        self._model = model
+        self._taxonomy_embeddings = taxonomy_embeddings
+        self._taxonomy_paths = taxonomy_paths
+        self._device = device
+        self._backend = backend
+        self._loaded_at = datetime.now().isoformat()
+        self._load_count += 1
+        self._memory_after_mb = get_process_memory_mb()
+        log(f"[Model] Registry loaded model in {self._load_seconds}s "
+            f"(memory: {self._memory_before_mb} MB → {self._memory_after_mb} MB)")
+        self._start_watcher()
+
+    def _start_watcher(self):
+        if self.idle_timeout <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+        self._watcher = threading.Thread(target=self._idle_watch, daemon=True)
+        self._watcher.start()
+
+    def _idle_watch(self):
+        interval = min(60, max(1, self.idle_timeout / 4))
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                if self._model is None:
+                    return
+                idle = time.time() - self._last_used
+                if self._active == 0 and idle >= self.idle_timeout:
+                    log(f"[Model] Idle for {int(idle)}s, unloading model to free memory.")
+                    self._release()
+                    return
+
+    def _release(self):
+        self.close_encode_pool()
+        self._encode_pool_failed = False
+        self._model = None
+        self._taxonomy_embeddings = None
+        self._taxonomy_paths = None
+        import gc
+        gc.collect()
         try:
-            ext = tldextract.extract(url)
-            hostname = f"{ext.domain}.{ext.suffix}" if ext.suffix else ext.domain
+            if self._device == "cuda":
+                torch.cuda.empty_cache()
+            elif self._device == "mps":
+                torch.mps.empty_cache()
         except Exception:
             pass
-        raw_text = f"{title} {desc} Source {hostname}"
-        embedding_text = clean_text(raw_text)
-        updated_items.append({**item, "description": desc, "embeddingText": embedding_text})
 
-    enriched_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(enriched_path, "w", encoding="utf-8") as f:
-        json.dump({"items": list(enriched_cache.values()), "updated_at": datetime.now().isoformat()}, f, ensure_ascii=False, indent=2)
+    def active_backend(self) -> str | None:
+        """Backend of the last loaded model, after any fallback to torch; None before the first load."""
+        return self._backend
+
+    def get(self):
+        """Return (model, taxonomy_embeddings, taxonomy_paths, device)."""
+        with self._lock:
+            self._ensure_loaded()
+            self._last_used = time.time()
+            return self._model, self._taxonomy_embeddings, self._taxonomy_paths, self._device
+
+    def get_model(self):
+        """Return (model, device)."""
+        model, _, _, device = self.get()
+        return model, device
+
+    @contextmanager
+    def use(self):
+        """Hold the model for the duration of a block so it is not unloaded mid-run."""
+        with self._lock:
+            self._active += 1
+        try:
+            yield self.get()
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._last_used = time.time()
+
+    def encode_pool(self, model, count: int):
+        """The shared EncodePool for `model`, started on first use.
+
+        None (encode in-process) unless LOCALAI_ENCODE_WORKERS is set, `model`
+        is the registry's CPU model and there are at least ENCODE_POOL_MIN_TEXTS
+        texts to encode.
+        """
+        if ENCODE_POOL_WORKERS <= 0 or count < ENCODE_POOL_MIN_TEXTS:
+            return None
+        with self._lock:
+            if model is None or model is not self._model or self._device != "cpu" or self._encode_pool_failed:
+                return None
+            if self._encode_pool is None:
+                self._encode_pool = EncodePool(resource_path(MODEL_DIR), self._backend)
+            return self._encode_pool
+
+    def close_encode_pool(self, failed: bool = False):
+        """Stop the encode pool workers; with failed=True it stays off until the model is reloaded."""
+        with self._lock:
+            pool, self._encode_pool = self._encode_pool, None
+            self._encode_pool_failed = self._encode_pool_failed or failed
+        if pool is not None:
+            pool.close()
+
+    def unload(self) -> bool:
+        with self._lock:
+            if self._model is None or self._active > 0:
+                return False
+            self._release()
+            log("[Model] Model unloaded.")
+            return True
+
+    def status(self) -> dict:
+        with self._lock:
+            loaded = self._model is not None
+            return {
+                "loaded": loaded,
+                "device": self._device,
+                "backend": self._backend or MODEL_BACKEND,
+                "in_use": self._active,
+                "load_count": self._load_count,
+                "load_seconds": self._load_seconds,
+                "loaded_at": self._loaded_at,
+                "idle_seconds": round(time.time() - self._last_used, 1) if loaded else None,
+                "idle_timeout_seconds": self.idle_timeout,
+                "taxonomy_entries": len(self._taxonomy_paths) if loaded else 0,
+                "memory_mb": get_process_memory_mb(),
+                "memory_before_load_mb": self._memory_before_mb,
+                "memory_after_load_mb": self._memory_after_mb,
+                "encode_pool": self._encode_pool.status() if self._encode_pool is not None else None,
+            }
 
-    return updated_items
 
+model_registry = ModelRegistry()
+atexit.register(model_registry.close_encode_pool)
 
 
 # ======================================================
-# RSS Embedding Cache
+#  Taxonomy Scoring
 # ======================================================
+SCORE_CHUNK_SIZE = 4096
+
+def score_taxonomy(text_embeddings, taxonomy_matrix, top_n: int, threshold: float, chunk_size: int = SCORE_CHUNK_SIZE):
+    """Top-N taxonomy matches for every row of `text_embeddings`.
+
+    Both inputs must be L2-normalized, so a chunked matrix product gives the
+    cosine similarities. Returns one (indices, scores) pair per row, best first,
+    with the threshold applied; a row with nothing above the threshold keeps
+    its single best label.
+    """
+    taxonomy_matrix = np.asarray(taxonomy_matrix, dtype=np.float32)
+    n_labels = taxonomy_matrix.shape[0]
+    k = max(1, min(int(top_n), n_labels))
+    chunk_size = max(1, int(chunk_size))
+    scored = []
+    for start in range(0, len(text_embeddings), chunk_size):
+        chunk = np.asarray(text_embeddings[start:start + chunk_size], dtype=np.float32)
+        sims = chunk @ taxonomy_matrix.T
+        if k < n_labels:
+            top_idx = np.argpartition(sims, n_labels - k, axis=1)[:, n_labels - k:]
+        else:
+            top_idx = np.broadcast_to(np.arange(n_labels), sims.shape)
+        top_scores = np.take_along_axis(sims, top_idx, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top_idx = np.take_along_axis(top_idx, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        keep = top_scores >= threshold
+        keep[:, 0] |= ~keep.any(axis=1)
+        for idx_row, score_row, keep_row in zip(top_idx, top_scores, keep):
+            scored.append((idx_row[keep_row], score_row[keep_row]))
+    return scored
 
-EMBED_CACHE_PATH = Path(__file__).resolve().parent.parent / "rss" / "rss_embedding_cache.json"
 
-def load_embedding_cache():
-    if EMBED_CACHE_PATH.exists():
+# ======================================================
+#  Encoding
+# ======================================================
+ENCODE_TOKEN_BUDGET = 16_384          # padded tokens per batch at most
+ENCODE_MIN_TOKEN_BUDGET = 1024
+ENCODE_MAX_BATCH = 256
+ENCODE_BYTES_PER_TOKEN = 48 * 1024    # rough activation footprint of one padded token (base-size model)
+ENCODE_MEMORY_SHARE = 0.25            # share of the free memory one batch may take
+
+def free_memory_bytes(device: str | None) -> int | None:
+    """Free memory on `device` (system RAM for cpu/mps), None if unknown."""
+    try:
+        if device == "cuda":
+            return int(torch.cuda.mem_get_info()[0])
+    except Exception:
+        return None
+    try:
+        import psutil
+        return int(psutil.virtual_memory().available)
+    except Exception:
+        pass
+    try:
+        return int(os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE"))
+    except Exception:
+        return None
+
+def encode_token_budget(device: str | None) -> int:
+    """Padded tokens per batch, shrunk when the device is short of free memory."""
+    free = free_memory_bytes(device)
+    if free is None:
+        return ENCODE_TOKEN_BUDGET
+    fits = int(free * ENCODE_MEMORY_SHARE / ENCODE_BYTES_PER_TOKEN)
+    return max(ENCODE_MIN_TOKEN_BUDGET, min(ENCODE_TOKEN_BUDGET, fits))
+
+
+def record_encode_metrics(texts: int, tokens: int, seconds: float):
+    metrics.inc("localai_encode_texts_total", texts)
+    metrics.inc("localai_encode_tokens_total", tokens)
+    metrics.inc("localai_encode_seconds_total", seconds)
+
+
+class EncodeStats:
+    """Token and padding counters of encode_texts(), summed over calls."""
+
+    def __init__(self):
+        self.texts = 0
+        self.batches = 0
+        self.tokens = 0
+        self.padded_tokens = 0
+        self.truncated = 0
+        self.seconds = 0.0
+
+    def add(self, other: "EncodeStats", seconds: float | None = None):
+        """Add the counters of `other`; `seconds` (wall clock of a parallel run) replaces its time."""
+        self.texts += other.texts
+        self.batches += other.batches
+        self.tokens += other.tokens
+        self.padded_tokens += other.padded_tokens
+        self.truncated += other.truncated
+        self.seconds += other.seconds if seconds is None else seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "texts": self.texts,
+            "batches": self.batches,
+            "tokens": self.tokens,
+            "truncated": self.truncated,
+            "seconds": round(self.seconds, 3),
+            "tokens_per_second": round(self.tokens / self.seconds, 1) if self.seconds else None,
+            "padding_ratio": round(1 - self.tokens / self.padded_tokens, 4) if self.padded_tokens else 0.0,
+        }
+
+
+def encode_texts(model, texts, device: str | None = None, stats: EncodeStats | None = None,
+                 token_budget: int | None = None) -> np.ndarray:
+    """Normalized embeddings for `texts`, in input order.
+
+    Texts are tokenized once, sorted by token length and cut into batches of
+    similar length, each sized to `token_budget` padded tokens, so short titles
+    are not padded up to the longest summary in a fixed-size batch. Texts
+    longer than model.max_seq_length are truncated. Large calls on the
+    registry model go to the encode pool when it is enabled.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.empty((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    pool = model_registry.encode_pool(model, len(texts))
+    if pool is not None:
         try:
-            return json.load(open(EMBED_CACHE_PATH, "r", encoding="utf-8"))
-        except:
-            return {}
-    return {}
+            return pool.encode(texts, stats)
+        except Exception:
+            log(traceback.format_exc())
+            log("[Encode] Encode pool failed, encoding in-process from now on.")
+            model_registry.close_encode_pool(failed=True)
+    start = time.perf_counter()
+    tokenizer = model.tokenizer
+    max_len = model.max_seq_length
+    input_ids = tokenizer(texts, truncation=True, max_length=max_len,
+                          return_attention_mask=False, return_token_type_ids=False)["input_ids"]
+    lengths = np.fromiter((len(ids) for ids in input_ids), dtype=np.int64, count=len(texts))
+    budget = token_budget or encode_token_budget(device)
+    order = np.argsort(-lengths, kind="stable")
+    pad_id = tokenizer.pad_token_id or 0
+    with_token_types = "token_type_ids" in tokenizer.model_input_names
+
+    out = None
+    padded = 0
+    batches = 0
+    i = 0
+    while i < len(order):
+        longest = int(lengths[order[i]])
+        size = max(1, min(ENCODE_MAX_BATCH, budget // max(longest, 1)))
+        batch = order[i:i + size]
+        ids = np.full((len(batch), longest), pad_id, dtype=np.int64)
+        mask = np.zeros((len(batch), longest), dtype=np.int64)
+        for row, j in enumerate(batch):
+            ids[row, :lengths[j]] = input_ids[j]
+            mask[row, :lengths[j]] = 1
+        features = {"input_ids": torch.from_numpy(ids), "attention_mask": torch.from_numpy(mask)}
+        if with_token_types:
+            features["token_type_ids"] = torch.zeros_like(features["input_ids"])
+        features = {k: v.to(model.device) for k, v in features.items()}
+        with torch.inference_mode():
+            embeddings = model(features)["sentence_embedding"]
+            embeddings = torch.nn.functional.normalize(embeddings.float(), p=2, dim=1).cpu().numpy()
+        if out is None:
+            out = np.empty((len(texts), embeddings.shape[1]), dtype=np.float32)
+        out[batch] = embeddings
+        padded += longest * len(batch)
+        batches += 1
+        i += size
+
+    elapsed = time.perf_counter() - start
+    run = stats or EncodeStats()
+    run.texts += len(texts)
+    run.batches += batches
+    run.tokens += int(lengths.sum())
+    run.padded_tokens += padded
+    run.truncated += int(np.count_nonzero(lengths >= max_len))
+    run.seconds += elapsed
+    record_encode_metrics(len(texts), int(lengths.sum()), elapsed)
+    if stats is None:
+        summary = run.as_dict()
+        log(f"[Encode] {len(texts)} texts in {batches} batches, {summary['tokens_per_second']} tokens/s, "
+            f"padding {summary['padding_ratio']:.1%}, {run.truncated} truncated.")
+    return out
 
-def save_embedding_cache(cache):
-    with open(EMBED_CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
 
-def clean_embedding_cache(valid_titles):
-    cache = load_embedding_cache()
-    before = len(cache)
+# ======================================================
+#  Encode Pool
+# ======================================================
+ENCODE_POOL_WORKERS = int(os.environ.get("LOCALAI_ENCODE_WORKERS", 0))   # worker processes; 0 = encode in-process
+ENCODE_POOL_THREADS = int(os.environ.get("LOCALAI_ENCODE_THREADS", 0))   # intra-op threads per worker; 0 = cores / workers
+ENCODE_POOL_MIN_TEXTS = 512   # smaller calls are not worth the round trip to the workers
+ENCODE_POOL_CHUNK = 256       # texts per task, cut from the length-sorted input
+
+_pool_model = None   # the model of an encode pool worker process
+
+def _encode_pool_init(model_path: str, backend: str, threads: int):
+    global _pool_model
+    torch.set_num_threads(threads)
+    _pool_model, _, _ = load_sentence_model(Path(model_path), backend, "cpu", threads=threads)
+
+def _encode_pool_task(texts) -> tuple:
+    stats = EncodeStats()
+    return encode_texts(_pool_model, texts, "cpu", stats), stats
+
+
+class EncodePool:
+    """Worker processes that each load a CPU copy of the model.
+
+    One encode_texts() call uses the cores of a CPU-only machine only partly
+    (tokenization runs on one thread, TOKENIZERS_PARALLELISM is off). The pool
+    cuts the texts, sorted by length, into chunks and encodes them in
+    `workers` processes with `threads` intra-op threads each. Every worker
+    holds its own copy of the model, so memory grows with the worker count.
+    """
+
+    def __init__(self, model_path: Path, backend: str, workers: int = ENCODE_POOL_WORKERS,
+                 threads: int = ENCODE_POOL_THREADS):
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.threads = threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self.calls = 0
+        self.texts = 0
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_encode_pool_init,
+                                             initargs=(str(model_path), backend, self.threads))
+        log(f"[Encode] Started encode pool: {self.workers} workers x {self.threads} threads ({backend}).")
+
+    def encode(self, texts, stats: EncodeStats | None = None) -> np.ndarray:
+        """Normalized embeddings for `texts`, in input order (same result as encode_texts)."""
+        texts = list(texts)
+        start = time.perf_counter()
+        # character length stands in for token length, tokenizing here would serialize the work again
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+        order = np.argsort(-lengths, kind="stable")
+        chunks = [order[i:i + ENCODE_POOL_CHUNK] for i in range(0, len(order), ENCODE_POOL_CHUNK)]
+        futures = [self._executor.submit(_encode_pool_task, [texts[j] for j in chunk]) for chunk in chunks]
+
+        out = None
+        run = EncodeStats()
+        for chunk, future in zip(chunks, futures):
+            embeddings, part = future.result()
+            if out is None:
+                out = np.empty((len(texts), embeddings.shape[1]), dtype=np.float32)
+            out[chunk] = embeddings
+            run.add(part, seconds=0.0)
+        run.seconds = time.perf_counter() - start
+        record_encode_metrics(run.texts, run.tokens, run.seconds)
+        self.calls += 1
+        self.texts += len(texts)
+        if stats is not None:
+            stats.add(run)
+        else:
+            summary = run.as_dict()
+            log(f"[Encode] {len(texts)} texts on {self.workers} workers, {summary['tokens_per_second']} tokens/s, "
+                f"padding {summary['padding_ratio']:.1%}, {run.truncated} truncated.")
+        return out
 
-    new_cache = {title: emb for title, emb in cache.items() if title in valid_titles}
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        log(f"[Encode] Encode pool stopped after {self.calls} calls ({self.texts} texts).")
 
-    if len(new_cache) != before:
-        save_embedding_cache(new_cache)
-        log(f"[RSS] Cleaned {before - len(new_cache)} outdated embeddings")
+    def status(self) -> dict:
+        return {"workers": self.workers, "threads": self.threads, "backend": self.backend,
+                "calls": self.calls, "texts": self.texts}
 
-    return new_cache
 
+# ======================================================
+#  History Embedding Cache
+# ======================================================
+HISTORY_EMBED_CACHE_BASE = Path(__file__).resolve().parent.parent / "history_compare" / "history_embeddings"
+HISTORY_EMBED_CACHE_MAX_ENTRIES = 200_000
+HISTORY_EMBED_CACHE_MAX_AGE_DAYS = 90
+
+_history_embedding_store = None
+_history_embedding_lock = threading.Lock()
+
+def get_history_embedding_store(fingerprint: str) -> VectorStore:
+    global _history_embedding_store
+    with _history_embedding_lock:
+        if _history_embedding_store is None or _history_embedding_store.fingerprint != fingerprint:
+            _history_embedding_store = VectorStore(HISTORY_EMBED_CACHE_BASE, fingerprint)
+        return _history_embedding_store
+
+def persist_history_embeddings(fingerprint: str) -> int:
+    store = get_history_embedding_store(fingerprint)
+    evicted = store.evict(HISTORY_EMBED_CACHE_MAX_ENTRIES, HISTORY_EMBED_CACHE_MAX_AGE_DAYS)
+    store.flush()
+    return evicted
+
+def encode_history_texts(model, texts, device, fingerprint: str, persist: bool = True,
+                         stats: EncodeStats | None = None) -> np.ndarray:
+    """Normalized embeddings for `texts`, encoding only texts not already in the cache.
+
+    With persist=False the index is left for persist_history_embeddings() to write.
+    """
+    store = get_history_embedding_store(fingerprint)
+    keys = [hashlib.sha1(f"{fingerprint}\0{t}".encode("utf-8")).hexdigest() for t in texts]
+    cached = store.get_many(keys)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in missing:
+            missing[key] = text
+    if missing:
+        encoded = encode_texts(model, missing.values(), device, stats)
+        store.put_many(list(missing.keys()), encoded)
+        cached.update(zip(missing.keys(), encoded))
+
+    evicted = persist_history_embeddings(fingerprint) if persist else 0
+    log(f"[Cache] History embeddings: {len(texts) - len(missing)} cached, {len(missing)} encoded"
+        f"{f', {evicted} evicted' if evicted else ''}.")
+
+    if not texts:
+        return np.empty((0, store.dim or 0), dtype=np.float32)
+    return np.stack([cached[k] for k in keys]).astype(np.float32, copy=False)
 
 
 # ======================================================
-#  Model
+#  History Result Store
 # ======================================================
-def load_model_and_taxonomy():
-    log("[Model] Loading model and taxonomy library...")
-    model_path = resource_path("data/sentence-transformers--all-mpnet-base-v2")
-    taxonomy_path = resource_path("data/taxonomy_embeddings.json")
-    device = "mps" if torch.backends.mps.is_available() else "cuda" if torch.cuda.is_available() else "cpu"
-    model = SentenceTransformer(str(model_path.resolve()), device=device, local_files_only=True)
-    with open(taxonomy_path, "r", encoding="utf-8") as f:
-        taxonomy_data = json.load(f)["data"]
-    taxonomy_embeddings = np.array([list(map(float, t["embedding"].split())) for t in taxonomy_data])
-    taxonomy_paths = [t["path"] for t in taxonomy_data]
-    log(f"[Model] Taxonomy loaded successfully with {len(taxonomy_paths)} entries.")
-    return model, taxonomy_embeddings, taxonomy_paths, device
+HISTORY_STORE_PATH = Path(__file__).resolve().parent.parent / "history_compare" / "history_results.db"
+HISTORY_INCREMENTAL = True   # reuse stored results for entries not visited since the last run
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history_results (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    embedding_text TEXT,
+    last_visit_ts REAL,
+    top_labels TEXT
+);
+CREATE TABLE IF NOT EXISTS history_labels (
+    url TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    tier1 TEXT NOT NULL,
+    tier2 TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (url, rank)
+);
+CREATE INDEX IF NOT EXISTS idx_history_labels_score ON history_labels(score);
+CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+def visit_timestamp(value) -> float:
+    """Epoch seconds of an export's lastVisitTime (ISO string or ms number), 0 if missing."""
+    if isinstance(value, (int, float)):
+        return float(value) / 1000
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class HistoryStore:
+    """history_results.db: the scored result of every history URL in the analysis window.
+
+    One row per URL with its title, embedding text, last visit time and its
+    top-N taxonomy labels before the threshold; the labels are repeated one
+    per row in history_labels, with their tier-1 / tier-2 prefixes, so the
+    interest summary is a single GROUP BY for any threshold or granularity.
+    Rows are only valid for the config (model, taxonomy, top-N, parsing mode)
+    they were scored under. `watermark` is the newest visit ingested.
+    """
+
+    def __init__(self, path: Path = HISTORY_STORE_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(HISTORY_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _meta(self, conn, key: str):
+        row = conn.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def use_config(self, config: str) -> bool:
+        """Switch to `config`; returns False if stored rows had to be dropped for it."""
+        with self._connect() as conn:
+            current = self._meta(conn, "config")
+        if current == config:
+            return True
+        self.clear(config)
+        return current is None
+
+    def watermark(self) -> float | None:
+        with self._connect() as conn:
+            value = self._meta(conn, "watermark")
+        return float(value) if value is not None else None
+
+    def known(self, urls) -> set:
+        urls = list(urls)
+        found = set()
+        with self._connect() as conn:
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                found.update(row["url"] for row in conn.execute(
+                    f"SELECT url FROM history_results WHERE url IN ({', '.join('?' * len(chunk))})", chunk))
+        return found
+
+    def upsert(self, rows):
+        """Store (url, title, embedding_text, last_visit_ts, [(path, score), ...]) rows, best label first."""
+        rows = list(rows)
+        if not rows:
+            return
+        labels = []
+        for url, _, _, _, top_labels in rows:
+            for rank, (path, score) in enumerate(top_labels):
+                parts = path.split(" > ")
+                labels.append((url, rank, path, parts[0], " > ".join(parts[:2]), score))
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO history_results (url, title, embedding_text, last_visit_ts, top_labels) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(url, title, text, ts, json.dumps(top_labels, ensure_ascii=False))
+                 for url, title, text, ts, top_labels in rows])
+            conn.executemany("DELETE FROM history_labels WHERE url = ?", [(row[0],) for row in rows])
+            conn.executemany("INSERT INTO history_labels (url, rank, path, tier1, tier2, score) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", labels)
+            newest = max(row[3] for row in rows)
+            watermark = self._meta(conn, "watermark")
+            if watermark is None or newest > float(watermark):
+                conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('watermark', ?)", (repr(newest),))
+
+    def retain(self, urls) -> int:
+        """Delete every URL not in `urls` (entries that left the export window); returns how many."""
+        with self._connect() as conn:
+            conn.execute("CREATE TEMP TABLE window (url TEXT PRIMARY KEY)")
+            conn.executemany("INSERT OR IGNORE INTO window (url) VALUES (?)", ((url,) for url in urls))
+            removed = conn.execute("DELETE FROM history_results WHERE url NOT IN (SELECT url FROM window)").rowcount
+            if removed:
+                conn.execute("DELETE FROM history_labels WHERE url NOT IN (SELECT url FROM window)")
+        return removed
+
+    def results(self, urls):
+        """Stored rows for `urls`, in that order (URLs without a row are skipped)."""
+        urls = list(urls)
+        with self._connect() as conn:
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                rows = {row["url"]: row for row in conn.execute(
+                    f"SELECT url, title, embedding_text, top_labels FROM history_results "
+                    f"WHERE url IN ({', '.join('?' * len(chunk))})", chunk)}
+                for url in chunk:
+                    row = rows.get(url)
+                    if row is not None:
+                        yield {"url": url, "title": row["title"], "embedding_text": row["embedding_text"],
+                               "top_labels": json.loads(row["top_labels"])}
+
+    def summary(self, threshold: float, granularity: int, limit: int) -> list:
+        """Interest labels at `granularity` (1, 2 or full path) ranked by total score above `threshold`."""
+        key = {1: "tier1", 2: "tier2"}.get(granularity, "path")
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                SELECT {key} AS path, COUNT(*) AS count, ROUND(SUM(score), 4) AS total_score
+                FROM history_labels WHERE score >= ?
+                GROUP BY {key} ORDER BY total_score DESC, count DESC, path LIMIT ?
+            """, (threshold, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM history_results").fetchone()[0]
+
+    def clear(self, config: str | None = None):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM history_results")
+            conn.execute("DELETE FROM history_labels")
+            conn.execute("DELETE FROM store_meta")
+            if config is not None:
+                conn.execute("INSERT INTO store_meta (key, value) VALUES ('config', ?)", (config,))
+
+
+_history_store = None
+_history_store_lock = threading.Lock()
+
+def get_history_store() -> HistoryStore:
+    global _history_store
+    with _history_store_lock:
+        if _history_store is None:
+            _history_store = HistoryStore()
+        return _history_store
+
+
+# ======================================================
+#  Label Embedding Cache
+# ======================================================
+LABEL_EMBED_STORE_BASE = Path(__file__).resolve().parent.parent / "rss" / "label_embeddings"
+LABEL_EMBED_MAX_ENTRIES = 5000
+LABEL_EMBED_MAX_AGE_DAYS = 180
+
+_label_embedding_store = None
+_label_embedding_lock = threading.Lock()
+
+def get_label_embedding_store() -> VectorStore:
+    global _label_embedding_store
+    fingerprint = model_fingerprint()
+    with _label_embedding_lock:
+        if _label_embedding_store is None or _label_embedding_store.fingerprint != fingerprint:
+            _label_embedding_store = VectorStore(LABEL_EMBED_STORE_BASE, fingerprint)
+        return _label_embedding_store
+
+def reset_label_embedding_store():
+    global _label_embedding_store
+    with _label_embedding_lock:
+        if _label_embedding_store is not None:
+            _label_embedding_store.clear()
+        _label_embedding_store = None
+
+def label_embeddings(labels) -> np.ndarray:
+    """Normalized vectors for interest labels, one row per label.
+
+    Taxonomy paths are read from the taxonomy matrix; custom labels come from
+    the label cache or are encoded together in a single batch.
+    """
+    model, taxonomy_matrix, taxonomy_paths, device = model_registry.get()
+    taxonomy_rows = {path: i for i, path in enumerate(taxonomy_paths)}
+    vectors = {label: taxonomy_matrix[taxonomy_rows[label]] for label in labels if label in taxonomy_rows}
+
+    custom = [label for label in dict.fromkeys(labels) if label not in vectors]
+    if custom:
+        store = get_label_embedding_store()
+        cached = store.get_many(custom)
+        missing = [label for label in custom if label not in cached]
+        if missing:
+            encoded = encode_texts(model, missing, device)
+            store.put_many(missing, encoded)
+            cached.update(zip(missing, encoded))
+        store.evict(LABEL_EMBED_MAX_ENTRIES, LABEL_EMBED_MAX_AGE_DAYS)
+        store.flush()
+        vectors.update(cached)
+        log(f"[RSS] Label vectors: {len(labels) - len(custom)} from taxonomy, "
+            f"{len(custom) - len(missing)} cached, {len(missing)} encoded")
+
+    if not labels:
+        return np.empty((0, taxonomy_matrix.shape[1]), dtype=np.float32)
+    return np.stack([vectors[label] for label in labels]).astype(np.float32, copy=False)
+
+
+# ======================================================
+# RSS workers and locks
+# ======================================================
+RSS_WORKERS = 2   # threads for the blocking half of the RSS endpoints
+
+rss_executor = ThreadPoolExecutor(max_workers=RSS_WORKERS, thread_name_prefix="rss")
+rss_settings_lock = threading.Lock()    # rss_setting/rss_settings.json read-modify-write
+rss_recommend_lock = threading.Lock()   # one recommendation pass at a time
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run fn on the RSS pool so the event loop keeps answering other requests."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(rss_executor, partial(fn, *args, **kwargs))
+
+def write_json_atomic(path: Path, data):
+    """Write through a temp file so readers never see a half-written file."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ======================================================
+# RSS Vector Index
+# ======================================================
+try:
+    import hnswlib  # optional: pip install hnswlib
+except ImportError:
+    hnswlib = None
+
+RSS_INDEX_BACKEND = os.environ.get("LOCALAI_RSS_INDEX", "auto").lower()   # exact | hnsw | auto
+RSS_INDEX_BASE = Path(__file__).resolve().parent.parent / "rss" / "rss_index"
+RSS_INDEX_HNSW_MIN_ITEMS = 20_000   # auto: below this the exact scan is already fast enough
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 128
+HNSW_REBUILD_RATIO = 0.3            # rebuild the graph once this share of it is deleted
+
+
+class ExactIndex:
+    """Brute-force inner product over the live rows of a VectorStore.
+
+    Vectors are normalized, so the inner product is the cosine similarity.
+    Nothing is copied or persisted: rows are scored in chunks straight from
+    the store's memory map, which already lives on disk.
+    """
+
+    name = "exact"
+
+    def __init__(self, store: VectorStore):
+        self.store = store
+        self.ids = np.empty(0, dtype=object)
+        self.rows = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def sync(self, ids) -> dict:
+        """Restrict the index to `ids` (all must be in the store)."""
+        ids = [i for i in ids if i in self.store]
+        before = set(self.ids.tolist())
+        self.ids, self.rows = self.store.live_rows(ids)
+        after = set(ids)
+        return {"added": len(after - before), "removed": len(before - after), "size": len(self.ids)}
+
+    def search(self, queries: np.ndarray, k: int, chunk_size: int = SCORE_CHUNK_SIZE * 4):
+        """Top-k (id, score) lists, one per query row, best first."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(self.ids))
+        if not k:
+            return [[] for _ in queries]
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_pos = np.empty((len(queries), 0), dtype=np.int64)
+        with self.store.matrix() as matrix:
+            for start in range(0, len(self.rows), chunk_size):
+                rows = self.rows[start:start + chunk_size]
+                chunk = queries @ np.asarray(matrix[rows]).T
+                scores = np.concatenate([best_scores, chunk], axis=1)
+                positions = np.concatenate([best_pos, np.broadcast_to(np.arange(start, start + len(rows)), chunk.shape)], axis=1)
+                if scores.shape[1] > k:
+                    keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                    scores = np.take_along_axis(scores, keep, axis=1)
+                    positions = np.take_along_axis(positions, keep, axis=1)
+                best_scores, best_pos = scores, positions
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_pos = np.take_along_axis(best_pos, order, axis=1)
+        return [[(self.ids[p], float(s)) for p, s in zip(pos, sc)] for pos, sc in zip(best_pos, best_scores)]
+
+    def save(self):
+        pass
+
+    def clear(self):
+        self.ids = np.empty(0, dtype=object)
+        self.rows = np.empty(0, dtype=np.int64)
+
+
+class HnswIndex:
+    """hnswlib graph over the same vectors, persisted as `<name>.hnsw` plus `<name>.hnsw.json`.
+
+    The JSON maps article ids to integer graph labels and records the model
+    fingerprint. sync() adds new ids and marks expired ones deleted; the graph
+    is rebuilt when more than HNSW_REBUILD_RATIO of it is deleted.
+    """
+
+    name = "hnsw"
+
+    def __init__(self, store: VectorStore, base_path: Path = RSS_INDEX_BASE):
+        self.store = store
+        self.bin_path = base_path.parent / f"{base_path.name}.hnsw"
+        self.meta_path = base_path.parent / f"{base_path.name}.hnsw.json"
+        self.labels = {}
+        self.next_label = 0
+        self.deleted = 0
+        self.index = None
+        self._dirty = False
+        self._load()
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _new_index(self, capacity: int):
+        self.index = hnswlib.Index(space="ip", dim=self.store.dim)
+        self.index.init_index(max_elements=max(capacity, 1024), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        self.labels, self.next_label, self.deleted = {}, 0, 0
+        self._dirty = True
+
+    def _load(self):
+        if not (self.bin_path.exists() and self.meta_path.exists()):
+            return
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("fingerprint") != self.store.fingerprint or meta.get("dim") != self.store.dim:
+                log("[RSS] Vector index was built for another model, rebuilding.")
+                return
+            self.index = hnswlib.Index(space="ip", dim=meta["dim"])
+            self.index.load_index(str(self.bin_path), max_elements=meta["capacity"], allow_replace_deleted=False)
+            self.labels = meta["labels"]
+            self.next_label = meta["next_label"]
+            self.deleted = meta["deleted"]
+        except Exception as e:
+            log(f"[RSS] Failed to load vector index, rebuilding. Error: {e}")
+            self.index = None
+            self.labels = {}
+
+    def sync(self, ids) -> dict:
+        ids = [i for i in ids if i in self.store]
+        wanted = set(ids)
+        removed = [i for i in self.labels if i not in wanted]
+        if self.index is None or (self.deleted + len(removed)) > HNSW_REBUILD_RATIO * max(self.next_label, 1):
+            self._new_index(len(ids) * 2)
+            removed = []
+        for key in removed:
+            self.index.mark_deleted(self.labels.pop(key))
+        self.deleted += len(removed)
+
+        added = [i for i in ids if i not in self.labels]
+        if added:
+            vectors = self.store.get_many(added)
+            needed = self.next_label + len(added)
+            if needed > self.index.get_max_elements():
+                self.index.resize_index(max(needed, self.index.get_max_elements() * 2))
+            labels = np.arange(self.next_label, needed)
+            self.index.add_items(np.stack([vectors[i] for i in added]), labels)
+            self.labels.update(zip(added, labels.tolist()))
+            self.next_label = needed
+        self._dirty = self._dirty or bool(added or removed)
+        return {"added": len(added), "removed": len(removed), "size": len(self.labels)}
+
+    def search(self, queries: np.ndarray, k: int):
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(self.labels))
+        if not k:
+            return [[] for _ in queries]
+        self.index.set_ef(max(HNSW_EF_SEARCH, k))
+        labels, distances = self.index.knn_query(queries, k=k)
+        by_label = {label: key for key, label in self.labels.items()}
+        # "ip" space returns 1 - inner product
+        return [[(by_label[int(l)], float(1 - d)) for l, d in zip(row_l, row_d)]
+                for row_l, row_d in zip(labels, distances)]
+
+    def save(self):
+        if not self._dirty or self.index is None:
+            return
+        self.bin_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.bin_path.parent / f"{self.bin_path.name}.tmp"
+        self.index.save_index(str(tmp))
+        os.replace(tmp, self.bin_path)
+        write_json_atomic(self.meta_path, {
+            "fingerprint": self.store.fingerprint,
+            "dim": self.store.dim,
+            "capacity": self.index.get_max_elements(),
+            "next_label": self.next_label,
+            "deleted": self.deleted,
+            "labels": self.labels,
+        })
+        self._dirty = False
+
+    def clear(self):
+        for path in (self.bin_path, self.meta_path):
+            path.unlink(missing_ok=True)
+        self.index = None
+        self.labels = {}
+
+
+_rss_index = None
+_rss_index_lock = threading.Lock()
+
+def rss_index_backend(size: int) -> str:
+    backend = RSS_INDEX_BACKEND
+    if backend == "auto":
+        backend = "hnsw" if hnswlib is not None and size >= RSS_INDEX_HNSW_MIN_ITEMS else "exact"
+    if backend == "hnsw" and hnswlib is None:
+        log("[RSS] LOCALAI_RSS_INDEX=hnsw but hnswlib is not installed, using exact search.")
+        backend = "exact"
+    return backend
+
+def get_rss_index(store: VectorStore, ids):
+    """The RSS vector index for `store`, synced to `ids`; returns (index, sync stats)."""
+    global _rss_index
+    backend = rss_index_backend(len(ids))
+    with _rss_index_lock:
+        if _rss_index is None or _rss_index.name != backend or _rss_index.store is not store:
+            _rss_index = HnswIndex(store) if backend == "hnsw" else ExactIndex(store)
+        stats = _rss_index.sync(ids)
+        _rss_index.save()
+        return _rss_index, stats
+
+def reset_rss_index():
+    global _rss_index
+    with _rss_index_lock:
+        if _rss_index is not None:
+            _rss_index.clear()
+        for suffix in (".hnsw", ".hnsw.json"):
+            RSS_INDEX_BASE.parent.joinpath(f"{RSS_INDEX_BASE.name}{suffix}").unlink(missing_ok=True)
+        _rss_index = None
+
+
+# ======================================================
+# RSS Recommendation Engine
+# ======================================================
+RECOMMEND_DEPTH_SLACK = 2   # candidates kept per label, as a multiple of what a pass needs
+
+class RecommendationEngine:
+    """Per-label top candidate lists, kept current by delta.
+
+    For every label it holds the best `depth` (article id, score) pairs over
+    the article set it was last synced to. New articles are scored against
+    the existing labels only, a new or edited label is searched in the index,
+    and expired articles are dropped from the lists. A list is searched again
+    only when too few candidates are left in it. Lives in memory: the first
+    pass after a start fills it.
+    """
+
+    def __init__(self, fingerprint: str = ""):
+        self.fingerprint = fingerprint
+        self.article_version = None   # ArticleStore.updated_at() of the synced article set
+        self.article_ids = set()
+        self.index = None
+        self.lists = {}               # label -> (ids, scores), best first
+        self.depths = {}
+        self.label_vectors = {}
+
+    def sync_articles(self, ids, embedding_store: VectorStore, index, version: str | None) -> dict:
+        """Move to the article set `ids` (already synced into `index`), scoring only the new articles."""
+        current = set(ids)
+        added = [i for i in dict.fromkeys(ids) if i not in self.article_ids]
+        removed = self.article_ids - current
+        if removed:
+            for label, (list_ids, scores) in self.lists.items():
+                keep = np.fromiter((i not in removed for i in list_ids), dtype=bool, count=len(list_ids))
+                if not keep.all():
+                    self.lists[label] = (list_ids[keep], scores[keep])
+        if added and self.lists:
+            vectors = embedding_store.get_many(added)
+            new_ids = np.array([i for i in added if i in vectors], dtype=object)
+            if len(new_ids):
+                labels = list(self.lists)
+                matrix = np.stack([self.label_vectors[label] for label in labels]) @ \
+                    np.stack([vectors[i] for i in new_ids]).T
+                for row, label in enumerate(labels):
+                    self.lists[label] = self._merge(self.lists[label], new_ids, matrix[row], self.depths[label])
+        self.article_ids = current
+        self.article_version = version
+        self.index = index
+        return {"added": len(added), "removed": len(removed)}
+
+    @staticmethod
+    def _merge(entry, new_ids: np.ndarray, new_scores: np.ndarray, depth: int):
+        ids = np.concatenate([entry[0], new_ids])
+        scores = np.concatenate([entry[1], new_scores.astype(np.float32)])
+        if len(ids) > depth:
+            keep = np.argpartition(-scores, depth - 1)[:depth]
+            ids, scores = ids[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        return ids[order], scores[order]
+
+    def candidates(self, labels, label_vectors: np.ndarray, k: int):
+        """Top-k (id, score) lists for `labels`, searching the index only where needed.
+
+        Returns (hits, stats); hits has one list per label, best first.
+        """
+        n = len(self.article_ids)
+        k = min(k, n)
+        depth = min(n, k * RECOMMEND_DEPTH_SLACK)
+        wanted = set(labels)
+        for label in [l for l in self.lists if l not in wanted]:
+            del self.lists[label], self.depths[label], self.label_vectors[label]
+
+        stale = [row for row, label in enumerate(labels)
+                 if label not in self.lists or self.depths[label] < depth or len(self.lists[label][0]) < k]
+        if stale:
+            found = self.index.search(label_vectors[stale], depth)
+            for row, label_hits in zip(stale, found):
+                label = labels[row]
+                ids, scores = zip(*label_hits) if label_hits else ((), ())
+                self.lists[label] = (np.array(ids, dtype=object), np.array(scores, dtype=np.float32))
+                self.depths[label] = depth
+                self.label_vectors[label] = np.asarray(label_vectors[row], dtype=np.float32)
+
+        hits = [list(zip(self.lists[label][0][:k].tolist(), self.lists[label][1][:k].tolist())) for label in labels]
+        return hits, {"searched": len(stale), "reused": len(labels) - len(stale), "depth": depth}
+
+
+_recommend_engine = None
+_recommend_engine_lock = threading.Lock()
+
+def get_recommend_engine() -> RecommendationEngine:
+    global _recommend_engine
+    fingerprint = model_fingerprint()
+    with _recommend_engine_lock:
+        if _recommend_engine is None or _recommend_engine.fingerprint != fingerprint:
+            _recommend_engine = RecommendationEngine(fingerprint)
+        return _recommend_engine
+
+def reset_recommend_engine():
+    global _recommend_engine
+    with _recommend_engine_lock:
+        _recommend_engine = None
+
+
+# ======================================================
+# RSS feed polling state
+# ======================================================
+LEGACY_FEED_STATE_PATH = Path(__file__).resolve().parent.parent / "rss" / "rss_setting" / "feed_state.json"
+FEED_TIMEOUT = 15
+FEED_MAX_WORKERS = 12
+FEED_SEEN_IDS_MAX = 500   # entry ids remembered per feed (a feed document rarely holds more)
+
+feed_session = requests.Session()
+_feed_adapter = requests.adapters.HTTPAdapter(pool_connections=FEED_MAX_WORKERS, pool_maxsize=FEED_MAX_WORKERS, max_retries=0)
+feed_session.mount("http://", _feed_adapter)
+feed_session.mount("https://", _feed_adapter)
+feed_session.headers.update({"User-Agent": FETCH_USER_AGENT})
+
+def feed_id(url: str) -> str:
+    return hashlib.sha1(url.strip().encode("utf-8")).hexdigest()[:16]
+
+def feed_entry_id(entry) -> str:
+    return (entry.get("id") or entry.get("link") or entry.get("title") or "").strip()
+
+
+class FeedState:
+    """Per-feed poll state: ETag / Last-Modified, last-seen entry ids and fetch stats.
+
+    A working copy of the feed registry (the `feeds` table of the article
+    store): loaded on construction, written back by save(). `history_days` is
+    the window the seen ids were collected under; widening it forces a full
+    re-read so older entries can be picked up.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or get_article_store()
+        self.history_days, self.feeds = self.store.feed_state()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> dict:
+        with self._lock:
+            return dict(self.feeds.get(url, {}))
+
+    def update(self, url: str, **fields):
+        with self._lock:
+            self.feeds.setdefault(url, {}).update(fields)
+
+    def reset_validators(self):
+        with self._lock:
+            for entry in self.feeds.values():
+                for key in ("etag", "last_modified", "seen_ids"):
+                    entry.pop(key, None)
+
+    def save(self, feed_urls=None):
+        """Write the state of `feed_urls` (default: all known feeds) to the registry."""
+        with self._lock:
+            urls = self.feeds if feed_urls is None else [url for url in feed_urls if url in self.feeds]
+            feeds = {url: dict(self.feeds[url]) for url in urls}
+        self.store.save_feed_state(feeds, self.history_days)
+
+    def stats(self) -> dict:
+        with self._lock:
+            feeds = [{"url": url, **{k: v for k, v in entry.items() if k != "seen_ids"}}
+                     for url, entry in self.feeds.items()]
+        polled = [f for f in feeds if f.get("status") is not None]
+        return {
+            "feeds": feeds,
+            "total": {
+                "feeds": len(feeds),
+                "not_modified": sum(1 for f in polled if f["status"] == 304),
+                "errors": sum(1 for f in polled if f["status"] == 0 or f["status"] >= 400),
+                "bytes": sum(f.get("bytes") or 0 for f in polled),
+                "new_entries": sum(f.get("new_entries") or 0 for f in polled),
+                "duration_ms": round(sum(f.get("duration_ms") or 0 for f in polled), 1),
+            },
+        }
+
+
+def poll_feed(url: str, state: FeedState, full: bool = False):
+    """Conditionally GET one feed. Returns (parsed feed or None, stats dict).
+
+    None means there is nothing to parse: the server answered 304 or failed.
+    """
+    known = {} if full else state.get(url)
+    headers = {}
+    if known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+
+    # "error" is reset on every poll so a recovered feed does not keep its last failure
+    stats = {"status": 0, "bytes": 0, "new_entries": 0, "error": None,
+             "fetched_at": datetime.now(timezone.utc).isoformat()}
+    start = time.perf_counter()
+    try:
+        response = feed_session.get(url, headers=headers, timeout=FEED_TIMEOUT)
+        stats["status"] = response.status_code
+        stats["bytes"] = len(response.content)
+        if response.status_code != 200:
+            return None, stats
+        feed = feedparser.parse(response.content, response_headers={k.lower(): v for k, v in response.headers.items()})
+        stats.update(etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+        return feed, stats
+    except Exception as e:
+        stats["error"] = str(e)
+        return None, stats
+    finally:
+        stats["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+
+# ======================================================
+# RSS article identity
+# ======================================================
+SIMHASH_MAX_DISTANCE = 9   # of 64 bits; unrelated texts sit around 32
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|cmpid|ocid|spm)$", re.I)
+
+def normalize_article_url(url: str) -> str:
+    """Lower-case scheme/host, drop www., fragments, tracking parameters and trailing slashes."""
+    parts = urlparse(url.strip())
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = "&".join(sorted(
+        p for p in parts.query.split("&") if p and not TRACKING_PARAMS.match(p.split("=", 1)[0])
+    ))
+    path = parts.path.rstrip("/") or "/"
+    return f"{host}{path}" + (f"?{query}" if query else "")
+
+def article_id(guid: str, link: str, title: str, feed_url: str = "") -> str:
+    """Canonical article id: the entry GUID, else the normalized link, else the title.
+
+    GUIDs that are not URLs are only unique within their feed, so they are
+    scoped by the feed URL; URL GUIDs and links are shared across feeds.
+    """
+    guid, link = (guid or "").strip(), (link or "").strip()
+    if guid.startswith(("http://", "https://")):
+        key = "url:" + normalize_article_url(guid)
+    elif guid:
+        key = f"guid:{feed_url}\0{guid}"
+    elif link:
+        key = "url:" + normalize_article_url(link)
+    else:
+        key = "title:" + title.strip().lower()
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over the words of `text` (unsigned)."""
+    features = re.findall(r"\w+", text.lower())
+    if not features:
+        return 0
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little") for f in features],
+        dtype=np.uint64,
+    )
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(features)
+    return int.from_bytes(np.packbits(votes > 0, bitorder="little").tobytes(), "little")
+
+def to_sqlite_int(value: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << 64) if value >= 1 << 63 else value
 
 
-def fetch_rss_articles():
+# ======================================================
+# RSS article store
+# ======================================================
+ARTICLE_DB_PATH = Path(__file__).resolve().parent.parent / "rss" / "rss_articles.db"
+LEGACY_SUMMARY_PATH = Path(__file__).resolve().parent.parent / "rss" / "rss_summary.json"
+ARTICLE_COLUMNS = ("id", "title", "link", "summary", "published", "source")
+ARTICLE_SCHEMA_VERSION = 3
+FEED_FIELDS = ("source", "etag", "last_modified", "seen_ids", "status", "bytes", "new_entries",
+               "duration_ms", "fetched_at", "error")
+
+ARTICLE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    guid TEXT,
+    link TEXT,
+    summary TEXT,
+    published TEXT,
+    published_ts REAL,
+    source TEXT,
+    fetched_at REAL,
+    simhash INTEGER,
+    cluster_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_articles_link ON articles(link);
+CREATE INDEX IF NOT EXISTS idx_articles_guid ON articles(guid);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published_ts);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source);
+CREATE INDEX IF NOT EXISTS idx_articles_cluster ON articles(cluster_id);
+CREATE VIEW IF NOT EXISTS source_counts AS
+    SELECT source, COUNT(*) AS count FROM articles GROUP BY source;
+CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    feed_id TEXT NOT NULL UNIQUE,
+    source TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    seen_ids TEXT,
+    status INTEGER,
+    bytes INTEGER,
+    new_entries INTEGER,
+    duration_ms REAL,
+    fetched_at TEXT,
+    error TEXT,
+    added_at REAL
+);
+CREATE TABLE IF NOT EXISTS article_feeds (
+    feed_id TEXT NOT NULL,
+    article_id TEXT NOT NULL,
+    PRIMARY KEY (feed_id, article_id)
+);
+CREATE INDEX IF NOT EXISTS idx_article_feeds_article ON article_feeds(article_id);
+"""
+
+
+class ArticleStore:
+    """rss_articles.db: fetched RSS articles in SQLite (WAL).
+
+    Rows are keyed by article_id() (GUID, else normalized link), so the same
+    story from two feeds is stored once and a retitled entry keeps its row and
+    embedding. At insert each article gets a SimHash of title + summary; an
+    article within SIMHASH_MAX_DISTANCE of an earlier one joins that one's
+    cluster, and recommendations only consider one article per cluster.
+    Articles whose date cannot be parsed have a NULL published_ts and are
+    never purged by age.
+    """
+
+    def __init__(self, path: Path = ARTICLE_DB_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        legacy_rows = []
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 2 and conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'articles'").fetchone():
+                # title-keyed store from before article ids: re-insert through add_articles
+                legacy_rows = [dict(row) for row in conn.execute(
+                    "SELECT title, link, summary, published, source FROM articles ORDER BY id")]
+                conn.execute("DROP VIEW IF EXISTS source_counts")
+                conn.execute("DROP TABLE articles")
+            conn.executescript(ARTICLE_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {ARTICLE_SCHEMA_VERSION}")
+        if legacy_rows:
+            self.add_articles(legacy_rows)
+            log(f"[RSS] Article store upgraded: {len(legacy_rows)} articles re-keyed by article id")
+        self._migrate_legacy_summary()
+        self._migrate_legacy_feed_state()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _migrate_legacy_summary(self):
+        """Import the old rss_summary.json once, then delete it."""
+        if not LEGACY_SUMMARY_PATH.exists():
+            return
+        try:
+            with open(LEGACY_SUMMARY_PATH, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+            added = self.add_articles(legacy.get("data", []))
+            if legacy.get("updated"):
+                self.touch(legacy["updated"])
+            log(f"[RSS] Migrated {added} articles from {LEGACY_SUMMARY_PATH.name}")
+        except Exception as e:
+            log(f"[RSS] Legacy rss_summary.json unreadable, dropping it: {e}")
+        LEGACY_SUMMARY_PATH.unlink(missing_ok=True)
+
+    def _migrate_legacy_feed_state(self):
+        """Import the old feed_state.json into the feed registry once, then delete it."""
+        if not LEGACY_FEED_STATE_PATH.exists():
+            return
+        try:
+            with open(LEGACY_FEED_STATE_PATH, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+            feeds = legacy.get("feeds", {})
+            self.save_feed_state(feeds, legacy.get("history_days"))
+            log(f"[RSS] Migrated {len(feeds)} feeds from {LEGACY_FEED_STATE_PATH.name}")
+        except Exception as e:
+            log(f"[RSS] Legacy feed_state.json unreadable, dropping it: {e}")
+        LEGACY_FEED_STATE_PATH.unlink(missing_ok=True)
+
+    @staticmethod
+    def _published_ts(published: str):
+        dt = parse_rss_datetime(published or "")
+        return dt.timestamp() if dt else None
+
+    def add_articles(self, articles) -> int:
+        """Insert articles whose id is not stored yet, clustering near duplicates; returns the number added.
+
+        An article's "feed" URL is recorded as an owner, also when the article
+        itself is already stored (the same story from a second feed).
+        """
+        now = time.time()
+        added = 0
+        duplicates = 0
+        with self._connect() as conn:
+            known = conn.execute("SELECT simhash, cluster_id FROM articles").fetchall()
+            # fingerprints of stored + newly inserted articles, compared in one vectorized pass each
+            fingerprints = np.empty(len(known) + len(articles), dtype=np.int64)
+            fingerprints[:len(known)] = [row["simhash"] or 0 for row in known]
+            clusters = [row["cluster_id"] for row in known]
+
+            for a in articles:
+                aid = a.get("id") or article_id(a.get("guid", ""), a.get("link", ""), a["title"])
+                if a.get("feed"):
+                    conn.execute("INSERT OR IGNORE INTO article_feeds (feed_id, article_id) VALUES (?, ?)",
+                                 (feed_id(a["feed"]), aid))
+                if conn.execute("SELECT 1 FROM articles WHERE id = ?", (aid,)).fetchone():
+                    continue
+                fingerprint = to_sqlite_int(simhash(f"{a['title']} {a.get('summary', '')}"))
+                cluster_id = aid
+                if clusters:
+                    distances = np.bitwise_count((fingerprints[:len(clusters)] ^ fingerprint).view(np.uint64))
+                    nearest = int(np.argmin(distances))
+                    if distances[nearest] <= SIMHASH_MAX_DISTANCE:
+                        cluster_id = clusters[nearest]
+                        duplicates += 1
+
+                conn.execute(
+                    "INSERT INTO articles (id, title, guid, link, summary, published, published_ts, source, "
+                    "fetched_at, simhash, cluster_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (aid, a["title"], a.get("guid"), a.get("link", ""), a.get("summary", ""), a.get("published", ""),
+                     self._published_ts(a.get("published", "")), a.get("source", ""), now, fingerprint, cluster_id),
+                )
+                fingerprints[len(clusters)] = fingerprint
+                clusters.append(cluster_id)
+                added += 1
+        if added:
+            self.touch()
+        if duplicates:
+            log(f"[RSS] {duplicates} of {added} new articles clustered as near duplicates")
+        return added
+
+    def articles(self, representatives_only: bool = False) -> list:
+        """All articles, or with representatives_only the first article of each near-duplicate cluster."""
+        where = "WHERE id = cluster_id" if representatives_only else ""
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT {', '.join(ARTICLE_COLUMNS)} FROM articles {where} ORDER BY rowid").fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, ids) -> dict:
+        """{id: article} for the stored ones among `ids`."""
+        ids = list(ids)
+        found = {}
+        with self._connect() as conn:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = conn.execute(f"SELECT {', '.join(ARTICLE_COLUMNS)} FROM articles WHERE id IN "
+                                    f"({', '.join('?' * len(chunk))})", chunk)
+                found.update((row["id"], dict(row)) for row in rows)
+        return found
+
+    def purge_older_than(self, cutoff: datetime) -> int:
+        with self._connect() as conn:
+            removed = conn.execute("DELETE FROM articles WHERE published_ts < ?", (cutoff.timestamp(),)).rowcount
+            if removed:
+                conn.execute("DELETE FROM article_feeds WHERE article_id NOT IN (SELECT id FROM articles)")
+            self._repair_clusters(conn)
+        if removed:
+            self.touch()
+        return removed
+
+    def remove_feeds_except(self, feed_urls) -> dict:
+        """Drop registered feeds not in `feed_urls` and the articles only they own.
+
+        Purely local: the registry knows each feed's articles, so no feed is
+        fetched. Returns {source: removed article count}.
+        """
+        keep = [feed_id(url) for url in feed_urls]
+        placeholders = ", ".join("?" * len(keep))
+        where = f"feed_id NOT IN ({placeholders})" if keep else "1"
+        with self._connect() as conn:
+            dropped = [row["feed_id"] for row in conn.execute(f"SELECT feed_id FROM feeds WHERE {where}", keep)]
+            if not dropped:
+                return {}
+            marks = ", ".join("?" * len(dropped))
+            owned_elsewhere = f"""EXISTS (SELECT 1 FROM article_feeds o WHERE o.article_id = articles.id
+                                          AND o.feed_id NOT IN ({marks}))"""
+            orphaned = f"""id IN (SELECT article_id FROM article_feeds WHERE feed_id IN ({marks}))
+                           AND NOT {owned_elsewhere}"""
+            removed = {row["source"]: row["count"] for row in conn.execute(
+                f"SELECT source, COUNT(*) AS count FROM articles WHERE {orphaned} GROUP BY source", dropped * 2)}
+            conn.execute(f"DELETE FROM articles WHERE {orphaned}", dropped * 2)
+            conn.execute(f"DELETE FROM article_feeds WHERE feed_id IN ({marks})", dropped)
+            conn.execute(f"DELETE FROM feeds WHERE feed_id IN ({marks})", dropped)
+            self._repair_clusters(conn)
+        if removed:
+            self.touch()
+        return removed
+
+    def feed_state(self):
+        """(history_days, {url: poll state}) from the feed registry."""
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT url, {', '.join(FEED_FIELDS)} FROM feeds ORDER BY added_at").fetchall()
+            meta = conn.execute("SELECT value FROM store_meta WHERE key = 'history_days'").fetchone()
+        feeds = {}
+        for row in rows:
+            entry = {k: row[k] for k in FEED_FIELDS if row[k] is not None}
+            if "seen_ids" in entry:
+                entry["seen_ids"] = json.loads(entry["seen_ids"])
+            feeds[row["url"]] = entry
+        return (int(meta["value"]) if meta else None), feeds
+
+    def save_feed_state(self, feeds: dict, history_days: int | None = None):
+        """Upsert registry rows from {url: poll state}.
+
+        A feed registered for the first time adopts the stored articles of its
+        source that have no owner yet (articles fetched before the registry).
+        """
+        now = time.time()
+        with self._connect() as conn:
+            for url, entry in feeds.items():
+                fid = feed_id(url)
+                values = [entry.get(k) for k in FEED_FIELDS]
+                values[FEED_FIELDS.index("seen_ids")] = json.dumps(entry["seen_ids"]) if entry.get("seen_ids") else None
+                new = not conn.execute("SELECT 1 FROM feeds WHERE url = ?", (url,)).fetchone()
+                conn.execute(
+                    f"INSERT INTO feeds (url, feed_id, added_at, {', '.join(FEED_FIELDS)}) "
+                    f"VALUES (?, ?, ?, {', '.join('?' * len(FEED_FIELDS))}) ON CONFLICT(url) DO UPDATE SET "
+                    + ", ".join(f"{k} = excluded.{k}" for k in FEED_FIELDS),
+                    [url, fid, now] + values,
+                )
+                if new and entry.get("source"):
+                    conn.execute("""
+                        INSERT OR IGNORE INTO article_feeds (feed_id, article_id)
+                        SELECT ?, id FROM articles WHERE source = ?
+                          AND NOT EXISTS (SELECT 1 FROM article_feeds o WHERE o.article_id = articles.id)
+                    """, (fid, entry["source"]))
+            if history_days is not None:
+                conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('history_days', ?)",
+                             (str(history_days),))
+
+    @staticmethod
+    def _repair_clusters(conn):
+        """Promote the oldest remaining member of clusters whose representative was deleted."""
+        # bare columns next to MIN() come from the row holding the minimum (SQLite)
+        orphaned = conn.execute("""
+            SELECT cluster_id, id, MIN(rowid) FROM articles
+            WHERE cluster_id NOT IN (SELECT id FROM articles) GROUP BY cluster_id
+        """).fetchall()
+        conn.executemany("UPDATE articles SET cluster_id = ? WHERE cluster_id = ?",
+                         [(row["id"], row["cluster_id"]) for row in orphaned])
+
+    def source_counts(self) -> list:
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute("SELECT source, count FROM source_counts ORDER BY count DESC")]
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def touch(self, updated: str | None = None):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('updated', ?)",
+                         (updated or datetime.now(timezone.utc).isoformat(),))
+
+    def updated_at(self) -> str | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM store_meta WHERE key = 'updated'").fetchone()
+        return row["value"] if row else None
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM articles")
+            conn.execute("DELETE FROM article_feeds")
+            conn.execute("DELETE FROM feeds")
+            conn.execute("DELETE FROM store_meta")
+        with self._connect() as conn:
+            conn.execute("VACUUM")
+
+
+_article_store = None
+_article_store_lock = threading.Lock()
+
+def get_article_store() -> ArticleStore:
+    global _article_store
+    with _article_store_lock:
+        if _article_store is None:
+            _article_store = ArticleStore()
+        return _article_store
+
+
+def fetch_rss_articles(profile=None):
     os.environ["RSS_MODE"] = "1"
+    job = Job("fetch", profile=profile)
+    job.start()
 
     try:
         log("[RSS] Starting FAST multi-threaded RSS fetching...")
@@ -292,7 +3094,7 @@ def fetch_rss_articles():
         rss_dir = project_dir / "rss"
         rss_setting_path = rss_dir / "rss_setting" / "rss_settings.json"
         rss_dir.mkdir(parents=True, exist_ok=True)
-        summary_path = rss_dir / "rss_summary.json"
+        store = get_article_store()
 
         # Load settings
         settings = {}
@@ -331,18 +3133,40 @@ def fetch_rss_articles():
             except:
                 return str(raw_html)[:2000]
 
+        feed_state = FeedState()
+        # with an empty store (or a wider window) the seen ids are meaningless: read feeds in full
+        full = store.count() == 0 or (feed_state.history_days or 0) < max_days
+        if full:
+            feed_state.reset_validators()
+        feed_state.history_days = max_days
+
         def fetch_one_feed(url):
             try:
-                feed = feedparser.parse(url)
+                feed, stats = poll_feed(url, feed_state, full=full)
+                if feed is None:
+                    feed_state.update(url, **stats)
+                    if stats["status"] == 304:
+                        log(f"[RSS][304] {feed_state.get(url).get('source', url)}: not modified")
+                    else:
+                        log(f"[RSS][ERR] {url}: {stats.get('error') or stats['status']}")
+                    return []
+
                 source_name = getattr(feed.feed, "title", None) or url
                 source_name = source_name.strip()
+                seen_ids = set() if full else set(feed_state.get(url).get("seen_ids", []))
 
                 items = []
                 seen_local = set()
 
                 for entry in feed.entries:
+                    # feeds list newest first: everything from here on was handled by an earlier poll
+                    if feed_entry_id(entry) in seen_ids:
+                        break
+
                     title = entry.get("title", "").strip()
-                    if not title or title in seen_local:
+                    guid = entry.get("id", "").strip()
+                    aid = article_id(guid, entry.get("link", ""), title, feed_url=url)
+                    if not title or aid in seen_local:
                         continue
 
                     pub_dt = parse_rss_datetime(entry.get("published", ""))
@@ -356,16 +3180,22 @@ def fetch_rss_articles():
                     )
 
                     items.append({
+                        "id": aid,
+                        "guid": guid,
                         "title": title,
                         "link": entry.get("link", ""),
                         "summary": clean_html(summary_raw),
                         "published": entry.get("published", ""),
-                        "source": source_name
+                        "source": source_name,
+                        "feed": url
                     })
 
-                    seen_local.add(title)
+                    seen_local.add(aid)
 
-                log(f"[RSS][OK] {source_name}: {len(items)} items")
+                current_ids = [i for i in (feed_entry_id(e) for e in feed.entries) if i]
+                stats["new_entries"] = len(items)
+                feed_state.update(url, source=source_name, seen_ids=current_ids[:FEED_SEEN_IDS_MAX], **stats)
+                log(f"[RSS][OK] {source_name}: {len(items)} new items ({stats['bytes'] // 1024} KB, {stats['duration_ms']:.0f} ms)")
                 return items
 
             except Exception as e:
@@ -373,102 +3203,144 @@ def fetch_rss_articles():
                 return []
 
         all_articles = []
-        with ThreadPoolExecutor(max_workers=12) as executor:
-            results = executor.map(fetch_one_feed, rss_feeds)
-
-            for items in results:
-                all_articles.extend(items)
-
-        log(f"[RSS] Total fetched: {len(all_articles)} articles")
-
-        if summary_path.exists():
-            with open(summary_path, "r", encoding="utf-8") as f:
-                old = json.load(f).get("data", [])
-
-            old_titles = {a["title"] for a in old}
-            new_articles = [a for a in all_articles if a["title"] not in old_titles]
-            merged = old + new_articles
-        else:
-            merged = all_articles
-
-        # Save summary
-        feed_counter = Counter(a["source"] for a in merged)
-        json.dump({
-            "updated": datetime.now().isoformat(),
-            "total": len(merged),
-            "feeds": [{"source": k, "count": v} for k, v in feed_counter.items()],
-            "data": merged,
-        }, open(summary_path, "w", encoding="utf-8"), ensure_ascii=False, indent=2)
-
-        log(f"[RSS] Summary saved, total: {len(merged)} items")
-        return merged
+        with job.track("fetch"):
+            with ThreadPoolExecutor(max_workers=FEED_MAX_WORKERS) as executor:
+                results = executor.map(fetch_one_feed, rss_feeds)
+
+                for items in results:
+                    all_articles.extend(items)
+
+        with job.track("store"):
+            feed_state.save(rss_feeds)
+            totals = feed_state.stats()["total"]
+            log(f"[RSS] Polled {totals['feeds']} feeds: {totals['not_modified']} not modified, "
+                f"{totals['errors']} failed, {totals['bytes'] // 1024} KB in {totals['duration_ms']:.0f} ms total")
+            log(f"[RSS] Total fetched: {len(all_articles)} articles")
+
+            added = store.add_articles(all_articles)
+        log(f"[RSS] Stored {added} new articles, total: {store.count()} items")
+        job.count(feeds=totals["feeds"], not_modified=totals["not_modified"], feed_errors=totals["errors"],
+                  bytes=totals["bytes"], fetched=len(all_articles), stored=added)
+        return all_articles
 
     except Exception as e:
+        job.set_status("failed", error=str(e))
         log(f"[RSS] ERROR: {e}")
         log(traceback.format_exc())
         return []
-
-
-def analyze_rss_embeddings():
+    finally:
+        job.finish()
+
+
+RECOMMEND_DIVERSITY = 0.0   # MMR weight on novelty, 0 = rank by relevance only
+RECOMMEND_MMR_POOL = 4      # with diversity on, candidates per slot considered for reranking
+
+def assign_recommendations(scores: np.ndarray, quotas, candidate_vectors: np.ndarray | None = None,
+                           diversity: float = 0.0):
+    """Greedy global assignment of candidates to labels.
+
+    `scores` is (labels, candidates) relevance with -inf where a candidate was
+    not retrieved for a label. Each step picks the best remaining
+    (label, candidate) pair over the whole matrix, so every article goes to
+    at most one label (the one it fits best) and each label gets up to its
+    quota. With `diversity` > 0 the pick uses MMR: (1 - diversity) * relevance
+    minus diversity * the similarity to what that label already holds.
+    Returns one [(candidate, score)] list per label, in pick order.
+    """
+    n_labels, n_candidates = scores.shape
+    remaining = np.asarray(quotas, dtype=np.int64).copy()
+    redundancy = np.zeros_like(scores)
+    similarity = candidate_vectors @ candidate_vectors.T if diversity > 0 and candidate_vectors is not None else None
+    picked = [[] for _ in range(n_labels)]
+    available = np.isfinite(scores)
+
+    while True:
+        available &= (remaining > 0)[:, None]
+        if not available.any():
+            break
+        objective = scores if similarity is None else (1 - diversity) * scores - diversity * redundancy
+        flat = int(np.argmax(np.where(available, objective, -np.inf)))
+        label, cand = divmod(flat, n_candidates)
+        picked[label].append((cand, float(scores[label, cand])))
+        remaining[label] -= 1
+        available[:, cand] = False
+        if similarity is not None:
+            redundancy[label] = np.maximum(redundancy[label], similarity[cand])
+    return picked
+
+
+def analyze_rss_embeddings(profile=None):
+    with rss_recommend_lock:
+        return _analyze_rss_embeddings(profile)
+
+def _analyze_rss_embeddings(profile=None):
+    job = Job("recommend", profile=profile)
+    job.start()
     try:
         log("[RSS] Starting RSS embedding recommendation analysis...")
-        device = "mps" if torch.backends.mps.is_available() else (
-            "cuda" if torch.cuda.is_available() else "cpu"
-        )
-        model_path = resource_path("data/sentence-transformers--all-mpnet-base-v2")
 
         backend_dir = Path(__file__).resolve().parent
         project_dir = backend_dir.parent
         rss_dir = project_dir / "rss"
-        summary_path = rss_dir / "rss_summary.json"
-
-        if not summary_path.exists():
-            log("[RSS] rss_summary.json not found, skipping.")
-            return
-
-        summary_data = json.load(open(summary_path, "r", encoding="utf-8"))
-        all_articles = summary_data.get("data", [])
-        if not all_articles:
-            log("[RSS] Summary empty, skip.")
-            return
 
-        all_titles = {a["title"] for a in all_articles}
-        embedding_cache = clean_embedding_cache(all_titles)
-        log(f"[RSS] Embedding cache after cleanup: {len(embedding_cache)} items")
-
-        to_compute = []
-        for art in all_articles:
-            title = art["title"]
-            if title not in embedding_cache:
-                text = f"{art['title']} {art['summary']}".strip()
-                to_compute.append((title, text))
-
-        if to_compute:
-            log(f"[RSS] {len(to_compute)} missing embeddings, computing...")
-
-            titles, texts = zip(*to_compute)
-            
-            model = SentenceTransformer(str(model_path), device=device)
-            encoded = model.encode(list(texts), convert_to_numpy=True)
-
-            for i, title in enumerate(titles):
-                embedding_cache[title] = encoded[i].tolist()
-
-            save_embedding_cache(embedding_cache)
-            log("[RSS] Missing embeddings saved.")
-
-        rss_embeddings = [embedding_cache[a["title"]] for a in all_articles]
-
-        rss_emb_tensor = torch.tensor(rss_embeddings, device=device)
+        # the label vectors need the model anyway; loaded first, the cache fingerprints
+        # below name the backend that actually loaded
+        with job.track("load_model"):
+            model_registry.get()
+        article_store = get_article_store()
+        engine = get_recommend_engine()
+        version = article_store.updated_at()
+        if engine.index is not None and engine.article_version == version:
+            # a label or settings change: the articles, embeddings and index are as the last pass left them
+            log(f"[RSS] Articles unchanged since the last pass ({len(engine.article_ids)} articles), reusing candidates.")
+            embedding_store = get_rss_embedding_store()
+        else:
+            with job.track("articles"):
+                all_articles = article_store.articles(representatives_only=True)
+            if not all_articles:
+                log("[RSS] Summary empty, skip.")
+                return
+
+            all_ids = {a["id"] for a in all_articles}
+            with job.track("embed"):
+                embedding_store = clean_embedding_cache(all_ids)
+                log(f"[RSS] Embedding cache after cleanup: {len(embedding_store)} items")
+
+                to_compute = {}
+                for art in all_articles:
+                    aid = art["id"]
+                    if aid not in embedding_store and aid not in to_compute:
+                        to_compute[aid] = f"{art['title']} {art['summary']}".strip()
+
+                if to_compute:
+                    log(f"[RSS] {len(to_compute)} missing embeddings, computing...")
+
+                    model, device = model_registry.get_model()
+                    encoded = encode_texts(model, to_compute.values(), device)
+                    job.count(encoded=len(to_compute))
+
+                    embedding_store.put_many(list(to_compute.keys()), encoded)
+                    embedding_store.flush()
+                    log("[RSS] Missing embeddings saved.")
+
+            with job.track("index"):
+                article_ids = [a["id"] for a in all_articles]
+                index, synced = get_rss_index(embedding_store, article_ids)
+            log(f"[RSS] {index.name} index ready ({synced['size']} articles, +{synced['added']} / -{synced['removed']})")
+            with job.track("delta"):
+                delta = engine.sync_articles(article_ids, embedding_store, index, version)
+            log(f"[RSS] Candidate lists updated: +{delta['added']} / -{delta['removed']} articles")
 
         log("[RSS] Embedding ready, continue recommendation...")
 
         rss_setting_path = rss_dir / "rss_setting" / "rss_settings.json"
         recommend_count = 10
+        diversity = RECOMMEND_DIVERSITY
         if rss_setting_path.exists():
             with open(rss_setting_path, "r", encoding="utf-8") as f:
                 rss_settings = json.load(f)
                 recommend_count = int(rss_settings.get("recommendCount", 10))
+                diversity = min(max(float(rss_settings.get("recommendDiversity", diversity)), 0.0), 1.0)
 
         history_dir = project_dir / "history_compare"
         custom = history_dir / "custom_analysis_result.json"
@@ -490,56 +3362,470 @@ def analyze_rss_embeddings():
             ratio = item["count"] / total_weight
             allocated = max(1, int(round(ratio * recommend_count)))
             allocations.append({"label": item["path"], "allocated": allocated})
-
-        model = SentenceTransformer(str(model_path), device=device)
+        quotas = [alloc["allocated"] for alloc in allocations]
+
+        with job.track("labels"):
+            label_vecs = label_embeddings([alloc["label"] for alloc in allocations])
+
+        # adaptive k: enough candidates that a label still fills its quota after every other label
+        # has taken its share (and an MMR pool per slot when diversity is on); never more than exist
+        k = min(len(engine.article_ids), max(sum(quotas), max(quotas) * (RECOMMEND_MMR_POOL if diversity > 0 else 1)))
+        with job.track("search"):
+            hits, searched = engine.candidates([alloc["label"] for alloc in allocations], label_vecs, k)
+        log(f"[RSS] Candidates: {searched['searched']} labels searched, {searched['reused']} reused (depth {searched['depth']})")
+
+        with job.track("assign"):
+            candidate_ids = list(dict.fromkeys(aid for label_hits in hits for aid, _ in label_hits))
+            column = {aid: i for i, aid in enumerate(candidate_ids)}
+            scores = np.full((len(allocations), len(candidate_ids)), -np.inf, dtype=np.float32)
+            for row, label_hits in enumerate(hits):
+                if label_hits:
+                    ids, values = zip(*label_hits)
+                    scores[row, [column[aid] for aid in ids]] = values
+            candidate_vectors = None
+            if diversity > 0:
+                vectors = embedding_store.get_many(candidate_ids)
+                candidate_vectors = np.stack([vectors[aid] for aid in candidate_ids])
+            picked = assign_recommendations(scores, quotas, candidate_vectors, diversity)
+            articles_by_id = article_store.get(candidate_ids[cand] for label_picks in picked for cand, _ in label_picks)
 
         results = []
-
-        for alloc in allocations:
-            label = alloc["label"]
-            count = alloc["allocated"]
-            label_vec = model.encode(label, convert_to_tensor=True, device=device)
-
-            cosine = util.cos_sim(label_vec, rss_emb_tensor)[0]
-
-            top_idx = torch.topk(cosine, k=20).indices.tolist()
-
-            used_titles = set()
+        for alloc, label_picks in zip(allocations, picked):
             top_articles = []
-            for i in top_idx:
-                a = all_articles[i]
-                if a["title"] in used_titles:
-                    continue
-                used_titles.add(a["title"])
+            for cand, score in label_picks:
+                aid = candidate_ids[cand]
+                a = articles_by_id[aid]
                 top_articles.append({
+                    "id": aid,
                     "title": a["title"],
                     "link": a["link"],
-                    "score": float(cosine[i].item()),
+                    "score": score,
                     "source": a.get("source", "")
                 })
-                if len(top_articles) >= count:
-                    break
 
-            results.append({"label": label, "top_articles": top_articles})
-
-        recommend_path = rss_dir / "rss_recommend.json"
-        json.dump({
-            "updated": datetime.now().isoformat(),
-            "recommendations": results
-        }, open(recommend_path, "w", encoding="utf-8"), ensure_ascii=False, indent=2)
+            results.append({"label": alloc["label"], "top_articles": top_articles})
+
+        with job.track("write"):
+            recommend_path = rss_dir / "rss_recommend.json"
+            timings = {name: round(stage["seconds"] * 1000, 2) for name, stage in job.stages.items()}
+            write_json_atomic(recommend_path, {
+                "updated": datetime.now().isoformat(),
+                "diversity": diversity,
+                "candidates_per_label": k,
+                "timings_ms": timings,
+                "recommendations": results
+            })
 
+        job.count(articles=len(engine.article_ids), labels=len(allocations),
+                  recommended=sum(len(label_picks) for label_picks in picked))
+        log(f"[RSS] Recommendation phases (ms): "
+            f"{ {name: round(stage['seconds'] * 1000, 2) for name, stage in job.stages.items()} }")
         log("[RSS] Final recommendation saved.")
 
     except Exception as e:
+        job.set_status("failed", error=str(e))
         log(f"[RSS] ERROR: {e}")
         log(traceback.format_exc())
+    finally:
+        job.finish()
 
 
 
+# ======================================================
+# Analysis jobs
+# ======================================================
+JOB_WORKERS = 1          # analyses share the history_compare files, so run them one at a time
+JOB_HISTORY_LIMIT = 50   # finished jobs kept for GET /jobs/{id}
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """State of one background run: status, per-stage timings, progress and result.
+
+    Stages are timed with `with job.track("enrich"): ...`; repeated stages
+    (one per batch) accumulate. Long loops call `job.check_cancelled()` so a
+    cancel request stops the run at the next checkpoint. Stage times and
+    `job.count()` items also go to the metrics registry; a run opened with
+    start() writes a JSON trace (and its profile, if requested) on finish().
+    """
+
+    def __init__(self, kind: str, key: str = "", profile=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.key = key
+        self.status = "queued"
+        self.stage = None
+        self.stages = {}
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self.version = 0
+        self.counters = {}
+        self.spans = []
+        self.profile = profile_mode(profile)
+        self.trace_path = None
+        self._profiler = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def _touch(self):
+        self.version += 1
+
+    @contextmanager
+    def track(self, name: str):
+        with self._lock:
+            self.stage = name
+            self._touch()
+        offset = time.time() - (self.started_at or self.created_at)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                entry = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+                entry["seconds"] = round(entry["seconds"] + elapsed, 4)
+                entry["calls"] += 1
+                if len(self.spans) < TRACE_MAX_SPANS:
+                    self.spans.append({"stage": name, "start_ms": round(offset * 1000, 2), "ms": round(elapsed * 1000, 3)})
+                self._touch()
+            metrics.observe("localai_stage_seconds", elapsed, pipeline=self.kind, stage=name)
+
+    def count(self, **items):
+        """Add to the run's item counters (and localai_items_total)."""
+        with self._lock:
+            for name, value in items.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            self._touch()
+        for name, value in items.items():
+            metrics.inc("localai_items_total", value, pipeline=self.kind, item=name)
+
+    def start(self):
+        if self.profile:
+            try:
+                self._profiler = start_profiler(self.profile)
+            except Exception as e:
+                log(f"[Metrics] Profiler not started for {self.kind} job {self.id}: {e}")
+        with self._lock:
+            self.started_at = time.time()
+            self.status = "running"
+            self._touch()
+
+    def set_status(self, status: str, error: str | None = None):
+        with self._lock:
+            self.status = status
+            if error is not None:
+                self.error = error
+            self._touch()
+
+    def finish(self):
+        """Close the run: stop the profiler, record the run metrics and write the trace."""
+        with self._lock:
+            if self.status == "running":
+                self.status = "done"
+            self.finished_at = time.time()
+            self.stage = None
+            self._touch()
+        try:
+            TRACE_DIR.mkdir(parents=True, exist_ok=True)
+            started = datetime.fromtimestamp(self.started_at or self.created_at)
+            base = TRACE_DIR / f"{started.strftime('%Y%m%d-%H%M%S')}_{self.kind}_{self.id}"
+            profile = save_profile(self._profiler, base) if self._profiler is not None else None
+            self._profiler = None
+            seconds = self.finished_at - (self.started_at or self.finished_at)
+            metrics.inc("localai_runs_total", pipeline=self.kind, status=self.status)
+            metrics.observe("localai_run_seconds", seconds, pipeline=self.kind)
+            metrics.set("localai_last_run_timestamp_seconds", self.finished_at, pipeline=self.kind)
+            write_json_atomic(base.with_suffix(".json"), {**self.trace(), "profile": profile})
+            self.trace_path = base.with_suffix(".json")
+            prune_traces()
+        except Exception:
+            log(traceback.format_exc())
+
+    def trace(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "error": self.error,
+                "started_at": datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+                "finished_at": datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+                "seconds": round((self.finished_at or time.time()) - (self.started_at or self.created_at), 3),
+                "stages": dict(self.stages),
+                "counters": dict(self.counters),
+                "progress": dict(self.progress),
+                "spans": list(self.spans),
+            }
+
+    def update_progress(self, **progress):
+        with self._lock:
+            self.progress.update(progress)
+            self._touch()
+
+    def cancel(self):
+        self._cancel.set()
+        with self._lock:
+            self._touch()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.id} cancelled")
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def snapshot(self, include_result: bool = True) -> dict:
+        with self._lock:
+            end = self.finished_at or time.time()
+            data = {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "stage": self.stage,
+                "stages": dict(self.stages),
+                "counters": dict(self.counters),
+                "progress": dict(self.progress),
+                "cancel_requested": self._cancel.is_set(),
+                "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
+                "elapsed_seconds": round(end - (self.started_at or end), 3),
+                "error": self.error,
+                "profile": self.profile,
+                "trace": self.trace_path.name if self.trace_path else None,
+            }
+            if include_result and self.status == "done":
+                data["result"] = self.result
+            return data
+
+
+class JobManager:
+    """Runs jobs on a small worker pool; a submission whose key matches an active job joins it."""
+
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, key: str, fn, *args, profile=None, executor: ThreadPoolExecutor | None = None):
+        """Queue fn(*args, job=job); returns (job, merged).
+
+        `executor` runs the job elsewhere than the analysis worker, e.g. on
+        rss_executor so RSS work is not queued behind a long analysis.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and job.key == key and job.active and not job.cancelled:
+                    log(f"[Jobs] Merged duplicate {kind} request into job {job.id}")
+                    return job, True
+            job = Job(kind, key, profile=profile)
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = (executor or self._executor).submit(self._run, job, fn, args)
+        log(f"[Jobs] Queued {kind} job {job.id}")
+        return job, False
+
+    def _run(self, job: Job, fn, args):
+        job.start()
+        try:
+            job.check_cancelled()
+            job.result = fn(*args, job=job)
+            job.set_status("done")
+        except JobCancelled:
+            job.set_status("cancelled")
+            log(f"[Jobs] {job.kind} job {job.id} cancelled")
+        except Exception as e:
+            job.set_status("failed", error=str(e))
+            log(f"[Jobs] {job.kind} job {job.id} failed: {e}")
+            log(traceback.format_exc())
+        finally:
+            job.finish()
+        return job.result
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if not j.active]
+        for job in finished[:max(0, len(finished) - JOB_HISTORY_LIMIT)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def list(self) -> list:
+        return [j.snapshot(include_result=False) for j in list(self._jobs.values())]
+
+    def active_count(self) -> int:
+        return sum(1 for j in list(self._jobs.values()) if j.active)
+
+    def cancel(self, job_id: str) -> Job | None:
+        job = self._jobs.get(job_id)
+        if job and job.active:
+            job.cancel()
+            if job.future and job.future.cancel():
+                # never started, so _run will not close it
+                job.set_status("cancelled")
+                job.finish()
+                log(f"[Jobs] {job.kind} job {job.id} cancelled before it started")
+        return job
+
+
+job_manager = JobManager()
+
+
 # ======================================================
 # Main analyse
 # ======================================================
-def run_analysis(latest_path, settings=None):
+def analyze_history(history_items, settings: dict, history_dir: Path, store: "HistoryStore | None" = None,
+                    job: Job | None = None, total_expected: int | None = None):
+    """Score history entries and summarize the user's interests; returns (summary, counts).
+
+    Entries flow through filter → enrich → encode → score in batches and their
+    results go to the HistoryStore. In incremental mode (the default, settings
+    "incremental": false forces a full run) entries already stored and not
+    visited since the last run's watermark are skipped; entries that dropped
+    out of the export are removed. The summary is one SQL aggregate over the
+    store either way, so both modes give the same result.
+    """
+    job = job or Job("analyze")
+    store = store or get_history_store()
+    use_deep_parsing = settings.get("useDeepParsing", True)
+    TOP_N = int(settings.get("topN", 5))
+    THRESHOLD = float(settings.get("threshold", 0.39))
+    granularityLevel = int(settings.get("granularityLevel", 3))
+    samplingCount = int(settings.get("samplingCount", 20))
+    siteBlacklist = settings.get("siteBlacklist", [])
+    chunk_size = int(settings.get("scoreChunkSize", SCORE_CHUNK_SIZE))
+    batch_size = int(settings.get("batchSize", HISTORY_BATCH_SIZE))
+    incremental = bool(settings.get("incremental", HISTORY_INCREMENTAL))
+    log(f"[Setting] Setting: deepParsing={use_deep_parsing}, TOP_N={TOP_N}, "
+        f"THRESHOLD={THRESHOLD}, granularityLevel={granularityLevel}, "
+        f"samplingCount={samplingCount}, blacklistCount={len(siteBlacklist)}, incremental={incremental}")
+
+    blacklist = compile_blacklist(siteBlacklist)
+    enriched_cache = EnrichmentCache(ENRICHED_CACHE_PATH, float(settings.get("enrichTtlDays", ENRICH_TTL_DAYS))) if use_deep_parsing else None
+
+    read_count = 0
+    filtered_count = 0
+    scored_count = 0
+    reused_count = 0
+    window = {}   # URLs of this export after the blacklist, in export order
+    encode_stats = EncodeStats()
+    embedding_analysis_path = history_dir / "embedding_analysis.json"
+    tmp_analysis_path = history_dir / "embedding_analysis.json.tmp"
+
+    job.update_progress(items_total=total_expected, items_read=0, items_analyzed=0)
+
+    with job.track("load_model"):
+        model_registry.get()
+    fingerprint = model_fingerprint()   # after loading: the backend that actually loaded
+    with model_registry.use() as (model, taxonomy_embeddings, taxonomy_paths, device):
+        config = hashlib.sha1(json.dumps([fingerprint, list(taxonomy_paths), TOP_N, bool(use_deep_parsing)])
+                              .encode("utf-8")).hexdigest()
+        if not store.use_config(config):
+            log("[History] Model, taxonomy or scoring settings changed, stored results discarded.")
+        if not incremental:
+            store.clear(config)
+        watermark = store.watermark() if incremental else None
+
+        for batch in iter_batches(history_items, batch_size):
+            job.check_cancelled()
+            read_count += len(batch)
+            with job.track("blacklist"):
+                kept = [i for i in batch if not blacklist.matches(i.get("url", ""))] if blacklist else batch
+            kept = [i for i in kept if i.get("url")]
+            filtered_count += len(kept)
+            window.update((i["url"], None) for i in kept)
+            if watermark is not None:
+                known = store.known(i["url"] for i in kept)
+                kept = [i for i in kept if i["url"] not in known or visit_timestamp(i.get("lastVisitTime")) > watermark]
+                reused_count += len(known) - sum(1 for i in kept if i["url"] in known)
+            if not kept:
+                continue
+
+            enriched_items = enrich_history_items(kept, use_deep_parsing, enriched_cache=enriched_cache, job=job)
+            scored_items = [i for i in enriched_items if i.get("embeddingText")]
+            with job.track("encode"):
+                text_embeddings = encode_history_texts(
+                    model, [i["embeddingText"] for i in scored_items], device, fingerprint, persist=False,
+                    stats=encode_stats)
+            with job.track("score"):
+                # keep the whole top-N: the threshold is applied when reading the store
+                scores = score_taxonomy(text_embeddings, taxonomy_embeddings, TOP_N, -np.inf, chunk_size)
+            with job.track("store"):
+                store.upsert([
+                    (item["url"], item["title"], item["embeddingText"], visit_timestamp(item.get("lastVisitTime")),
+                     [(taxonomy_paths[j], float(score)) for j, score in zip(top_idx, top_scores)])
+                    for item, (top_idx, top_scores) in zip(scored_items, scores)
+                ])
+            scored_count += len(scored_items)
+
+            job.update_progress(items_read=read_count, items_analyzed=scored_count, items_reused=reused_count,
+                                encode=encode_stats.as_dict())
+            log(f"[Analysis] Processed {read_count} entries ({filtered_count} after blacklist, "
+                f"{scored_count} analyzed, {reused_count} reused).")
+
+    job.check_cancelled()
+    with job.track("store"):
+        expired = store.retain(window)
+    if incremental:
+        log(f"[History] {reused_count} entries reused from the last run, {scored_count} analyzed, {expired} aged out.")
+
+    with job.track("write"):
+        analyzed_count = 0
+        with open(tmp_analysis_path, "w", encoding="utf-8") as out:
+            out.write('{\n  "results": [')
+            for row in store.results(window):
+                labels = [{"path": path, "score": score} for path, score in row["top_labels"] if score >= THRESHOLD]
+                result = {
+                    "title": row["title"],
+                    "url": row["url"],
+                    "embeddingText": row["embedding_text"],
+                    "top_labels": labels or [{"path": row["top_labels"][0][0], "score": row["top_labels"][0][1]}],
+                }
+                out.write(("," if analyzed_count else "") + "\n    " + json.dumps(result, ensure_ascii=False))
+                analyzed_count += 1
+            out.write("\n  ],\n")
+            out.write(f'  "analyzed_count": {analyzed_count},\n')
+            out.write(f'  "settings": {json.dumps(settings, ensure_ascii=False)},\n')
+            out.write(f'  "timestamp": "{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}"\n}}\n')
+        os.replace(tmp_analysis_path, embedding_analysis_path)
+        if enriched_cache is not None:
+            enriched_cache.save()
+        persist_history_embeddings(fingerprint)
+
+    log(f"[Setting] Blacklist filtering completed: {filtered_count} / {read_count} records retained.")
+    encode_summary = encode_stats.as_dict()
+    if encode_summary["texts"]:
+        log(f"[Encode] History: {encode_summary['texts']} texts in {encode_summary['batches']} batches, "
+            f"{encode_summary['tokens_per_second']} tokens/s, padding {encode_summary['padding_ratio']:.1%}, "
+            f"{encode_summary['truncated']} truncated.")
+    log(f"[File] Embedding comparison analysis file exported: {embedding_analysis_path.name}")
+
+    with job.track("aggregate"):
+        summary_sorted = store.summary(THRESHOLD, granularityLevel, samplingCount)
+    counts = {"read": read_count, "filtered": filtered_count, "analyzed": analyzed_count,
+              "scored": scored_count, "reused": reused_count, "expired": expired}
+    job.count(**counts, encoded=encode_summary["texts"])
+    return summary_sorted, counts
+
+
+def run_analysis(latest_path, settings=None, job: Job | None = None):
+    """Run the history pipeline and the RSS phase.
+
+    Inside a job a failure propagates, so JobManager marks the job "failed";
+    called without one it returns the error in the result as before.
+    """
+    standalone = job is None
+    job = job or Job("analyze")
     try:
         log("=" * 66)
         log("[Analysis] Starting full analysis pipeline...")
@@ -550,111 +3836,46 @@ def run_analysis(latest_path, settings=None):
         history_dir = project_dir / "history_compare"
         history_dir.mkdir(parents=True, exist_ok=True)
 
-        with open(latest_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        history_items = data.get("items", [])
-        total_count = data.get("totalCount", len(history_items))
+        with job.track("read"):
+            header, history_items = open_history_export(Path(latest_path))
 
         if not settings or not isinstance(settings, dict) or not settings:
-            settings = data.get("settings", {}) or {}
+            settings = header.get("settings", {}) or {}
             log("[Config] Frontend configuration missing. Loading default settings from JSON file.")
 
-        use_deep_parsing = settings.get("useDeepParsing", True)
-        TOP_N = int(settings.get("topN", 5))
-        THRESHOLD = float(settings.get("threshold", 0.39))
-        granularityLevel = int(settings.get("granularityLevel", 3))
-        samplingCount = int(settings.get("samplingCount", 20))
-        siteBlacklist = settings.get("siteBlacklist", [])
-        log(f"[Setting] Setting: deepParsing={use_deep_parsing}, TOP_N={TOP_N}, "
-            f"THRESHOLD={THRESHOLD}, granularityLevel={granularityLevel}, "
-            f"samplingCount={samplingCount}, blacklistCount={len(siteBlacklist)}")
-
-        filtered_items = [i for i in history_items if not any(b.lower() in i.get("url", "").lower() for b in siteBlacklist)]
-        log(f"[Setting] Blacklist filtering completed: {len(filtered_items)} / {len(history_items)} records retained.")
-
-        enriched_items = enrich_history_items(filtered_items, use_deep_parsing)
-
-        model, taxonomy_embeddings, taxonomy_paths, device = load_model_and_taxonomy()
-
-        embedding_texts = [i["embeddingText"] for i in enriched_items if i.get("embeddingText")]
-        text_embeddings = model.encode(embedding_texts, convert_to_tensor=True, normalize_embeddings=True, device=device)
-        taxonomy_tensors = torch.tensor(taxonomy_embeddings, dtype=torch.float32, device=device)
-
-        results = []
-        for i, item in enumerate(enriched_items):
-            sims = util.cos_sim(text_embeddings[i], taxonomy_tensors)[0].cpu().numpy()
-            top_idx = np.argsort(sims)[::-1][:TOP_N]
-            top_labels = [
-                {"path": taxonomy_paths[j], "score": float(sims[j])}
-                for j in top_idx if sims[j] >= THRESHOLD
-            ] or [{"path": taxonomy_paths[int(np.argmax(sims))], "score": float(np.max(sims))}]
-            results.append({
-                "title": item["title"],
-                "url": item["url"],
-                "embeddingText": item["embeddingText"],
-                "top_labels": top_labels
-            })
-        embedding_analysis_path = history_dir / "embedding_analysis.json"
-        detailed_results = {
-            "results": results,
-            "analyzed_count": len(results),
-            "settings": settings,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-
-        with open(embedding_analysis_path, "w", encoding="utf-8") as f:
-            json.dump(detailed_results, f, ensure_ascii=False, indent=2)
-
-        log(f"[File] Embedding comparison analysis file exported: {embedding_analysis_path.name}")
-
-        tier_scores = {}
-        for r in results:
-            for label in r["top_labels"]:
-                path, score = label["path"], label["score"]
-                if score < THRESHOLD:
-                    continue
-                parts = path.split(" > ")
-                if granularityLevel == 1:
-                    key = parts[0]
-                elif granularityLevel == 2 and len(parts) >= 2:
-                    key = " > ".join(parts[:2])
-                else:
-                    key = path
-                tier_scores.setdefault(key, {"count": 0, "total_score": 0})
-                tier_scores[key]["count"] += 1
-                tier_scores[key]["total_score"] += score
-
-        summary_sorted = sorted(
-            [{"path": k, "count": v["count"], "total_score": round(v["total_score"], 4)} for k, v in tier_scores.items()],
-            key=lambda x: (-x["total_score"], -x["count"])
-        )[:samplingCount]
-
-        result_path = history_dir / "last_analysis_result.json"
-        json.dump({
-            "totalCount": total_count,
-            "settings": settings,
-            "totalAnalyzed": len(summary_sorted),
-            "summary": summary_sorted
-        }, open(result_path, "w", encoding="utf-8"), ensure_ascii=False, indent=2)
-
-        custom_path = history_dir / "custom_analysis_result.json"
-        shutil.copy(result_path, custom_path)
+        summary_sorted, counts = analyze_history(history_items, settings, history_dir, job=job,
+                                                 total_expected=header.get("totalCount"))
+        read_count, filtered_count = counts["read"], counts["filtered"]
+        total_count = header.get("totalCount", read_count)
+
+        with job.track("write"):
+            result_path = history_dir / "last_analysis_result.json"
+            json.dump({
+                "totalCount": total_count,
+                "settings": settings,
+                "totalAnalyzed": len(summary_sorted),
+                "summary": summary_sorted
+            }, open(result_path, "w", encoding="utf-8"), ensure_ascii=False, indent=2)
+
+            custom_path = history_dir / "custom_analysis_result.json"
+            shutil.copy(result_path, custom_path)
         log("[File] custom_analysis_result.json updated.")
+        job.check_cancelled()
 
         log(f"[Analysis] Historical data analysis completed. Generated {len(summary_sorted)} user interest tags.")
         log("=" * 33)
 
         rss_dir = project_dir / "rss"
         rss_dir.mkdir(parents=True, exist_ok=True)
-        rss_summary_path = rss_dir / "rss_summary.json"
 
-        if rss_summary_path.exists():
-            log("[RSS] Existing rss_summary.json detected — skipping fetch phase.")
-        else:
-            log("[RSS] rss_summary.json not found — starting RSS fetch process.")
-            fetch_rss_articles()
+        with job.track("rss"):
+            if get_article_store().count():
+                log("[RSS] Existing RSS articles detected — skipping fetch phase.")
+            else:
+                log("[RSS] No RSS articles stored — starting RSS fetch process.")
+                fetch_rss_articles()
 
-        analyze_rss_embeddings()
+            analyze_rss_embeddings()
         log("[RSS] RSS recommendation analysis has been successfully completed.")
         log("=" * 33)
 
@@ -663,13 +3884,19 @@ def run_analysis(latest_path, settings=None):
 
         return {
             "summary": summary_sorted,
-            "totalAnalyzed": len(filtered_items),
+            "totalAnalyzed": filtered_count,
+            "stages": job.snapshot(include_result=False)["stages"],
            "status": "Full analysis pipeline successfully completed."
         }
 
+    except JobCancelled:
+        log("[Analysis] Analysis cancelled.")
+        raise
     except Exception as e:
         log(f"[Error] Exception occurred in run_analysis: {e}")
         log(traceback.format_exc())
+        if not standalone:
+            raise
         return {
             "summary": [],
             "totalAnalyzed": 0,
@@ -679,40 +3906,168 @@ def run_analysis(latest_path, settings=None):
 # ======================================================
 # HTTP
 # ======================================================
+def analysis_job(settings, job: Job):
+    """Job body for /analyze: wait for the exported file, then run the pipeline."""
+    with job.track("copy"):
+        latest_path = copy_latest_history()
+    if not latest_path:
+        raise FileNotFoundError("No matching file found in the history_exports directory.")
+    return run_analysis(latest_path, settings, job=job)
+
 @app.post("/analyze")
 async def analyze(req: Request):
+    """Queue an analysis job.
+
+    With {"async": true} the job id is returned immediately (poll or stream
+    GET /jobs/{id}); otherwise the request waits for the job without
+    blocking the event loop and returns the result as before.
+    {"profile": "cprofile"} (or "pyinstrument", or ?profile=...) adds a
+    profile of the run to its trace.
+    """
     try:
-        latest_path = copy_latest_history()
-        if not latest_path:
-            return JSONResponse({"error": "No matching file found in the history_exports directory."}, status_code=404)
         data = await req.json()
         settings = data.get("settings", {})
+        profile = profile_mode(data.get("profile") or req.query_params.get("profile"))
         log(f"[Setting] Analysis parameters received: {settings}")
-        result = run_analysis(latest_path, settings)
-        return JSONResponse(result)
+        key = hashlib.sha1(json.dumps([latest_download_name, settings, profile], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        job, merged = job_manager.submit("analyze", key, analysis_job, settings, profile=profile)
+        if data.get("async"):
+            return JSONResponse({"job_id": job.id, "status": job.status, "merged": merged}, status_code=202)
+
+        try:
+            await asyncio.wrap_future(job.future)
+        except asyncio.CancelledError:
+            # a queued job cancelled through /jobs/{id}/cancel; anything else is this request being cancelled
+            if not job.future.cancelled():
+                raise
+            return JSONResponse({"error": "Analysis cancelled", "job_id": job.id}, status_code=409)
+        if job.status == "failed":
+            status_code = 404 if job.error and "No matching file" in job.error else 500
+            return JSONResponse({"summary": [], "totalAnalyzed": 0, "error": job.error, "job_id": job.id},
+                                status_code=status_code)
+        if job.status == "cancelled":
+            return JSONResponse({"error": "Analysis cancelled", "job_id": job.id}, status_code=409)
+        return JSONResponse({**job.result, "job_id": job.id})
     except Exception as e:
         log(f"[Error] Exception occurred during analysis: {e}")
         log(traceback.format_exc())
         return JSONResponse({"error": str(e)}, status_code=500)
 
+# ======================================================
+# jobs
+# ======================================================
+@app.get("/jobs")
+async def list_jobs():
+    return {"jobs": job_manager.list()}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, req: Request, stream: bool = False):
+    """Job status; with ?stream=true or Accept: text/event-stream, Server-Sent Events until it finishes."""
+    job = job_manager.get(job_id)
+    if not job:
+        return JSONResponse({"error": f"Job {job_id} not found"}, status_code=404)
+    if not (stream or "text/event-stream" in req.headers.get("accept", "")):
+        return job.snapshot()
+
+    async def events():
+        seen = -1
+        while True:
+            if await req.is_disconnected():
+                return
+            if job.version != seen:
+                seen = job.version
+                yield f"data: {json.dumps(job.snapshot(), ensure_ascii=False, default=str)}\n\n"
+                if not job.active:
+                    return
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if not job:
+        return JSONResponse({"error": f"Job {job_id} not found"}, status_code=404)
+    return job.snapshot(include_result=False)
+
+# ======================================================
+# metrics
+# ======================================================
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Stage timers, run and item counters in the Prometheus text format."""
+    metrics.set("localai_model_loaded", int(model_registry._model is not None))
+    metrics.set("localai_jobs_active", job_manager.active_count())
+    memory = get_process_memory_mb()
+    if memory is not None:
+        metrics.set("localai_process_memory_bytes", memory * 1024 * 1024)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/traces")
+async def list_traces(limit: int = 20):
+    """Newest run traces (analyze, fetch, recommend, rss_settings), one JSON file per run."""
+    traces = sorted(TRACE_DIR.glob("*.json"), reverse=True)[:limit] if TRACE_DIR.exists() else []
+    return {"traces": [t.name for t in traces]}
+
+@app.get("/traces/{job_id}")
+async def get_trace(job_id: str):
+    path = find_trace(job_id) if TRACE_DIR.exists() else None
+    if path is None:
+        return JSONResponse({"error": f"No trace for job {job_id}"}, status_code=404)
+    def load():
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return JSONResponse(await run_blocking(load))
+
 @app.get("/rss_results")
 async def get_rss_results():
     rss_file = Path(__file__).resolve().parent.parent / "rss" / "rss_recommend.json"
     if not rss_file.exists():
         return JSONResponse({"error": "rss_recommend.json not found"}, status_code=404)
-    data = json.load(open(rss_file, "r", encoding="utf-8"))
-    return JSONResponse(data)
+    def load():
+        with open(rss_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return JSONResponse(await run_blocking(load))
+
+# ======================================================
+# model status
+# ======================================================
+@app.get("/model_status")
+async def model_status():
+    return await run_blocking(model_registry.status)
+
+@app.get("/cache_status")
+async def cache_status():
+    def read_cache_status():
+        store = _history_embedding_store or get_history_embedding_store(model_fingerprint())
+        index = _rss_index
+        return {
+            "history_embeddings": store.stats(),
+            "history_results": {"urls": get_history_store().count(), "watermark": get_history_store().watermark()},
+            "rss_embeddings": get_rss_embedding_store().stats(),
+            "label_embeddings": get_label_embedding_store().stats(),
+            "rss_index": {"backend": index.name, "size": len(index)} if index is not None else None,
+        }
+    return await run_blocking(read_cache_status)
+
+@app.post("/model_unload")
+async def model_unload():
+    def unload():
+        unloaded = model_registry.unload()
+        return {"status": "ok", "unloaded": unloaded, "model": model_registry.status()}
+    return await run_blocking(unload)
 
 
 # ======================================================
 # AUTO update
 # ======================================================
 auto_update_thread = None
-auto_update_flag = False
+auto_update_stop = threading.Event()
+auto_update_lock = threading.Lock()
 
-def auto_update_worker(default_interval=0):
+def auto_update_worker(default_interval=0, stop: threading.Event | None = None):
     """Background auto-update loop (skips first immediate run, starts after countdown)."""
-    global auto_update_flag
+    stop = stop or auto_update_stop
     log("[AutoUpdate] Background update process has been initiated (first run will start after interval).")
 
     backend_dir = Path(__file__).resolve().parent
@@ -721,7 +4076,7 @@ def auto_update_worker(default_interval=0):
 
     first_run = True
 
-    while auto_update_flag:
+    while not stop.is_set():
         try:
             interval_hours = default_interval
             if rss_setting_path.exists():
@@ -733,18 +4088,15 @@ def auto_update_worker(default_interval=0):
 
             if interval_hours <= 0:
                 log("[AutoUpdate] Interval = 0h detected, background task stopped.")
-                auto_update_flag = False
+                stop.set()
                 break
 
             if first_run:
                 log(f"[AutoUpdate] Waiting {interval_hours} hours before first automatic update...")
-                total_seconds = int(interval_hours * 3600)
-                for _ in range(total_seconds):
-                    if not auto_update_flag:
-                        break
-                    time.sleep(1)
-                first_run = False 
-                continue  
+                first_run = False
+                if stop.wait(interval_hours * 3600):
+                    break
+                continue
             log(f"[AutoUpdate] Running scheduled RSS fetch and embedding analysis (update interval: {interval_hours} hours).")
 
             fetch_rss_articles()
@@ -756,30 +4108,60 @@ def auto_update_worker(default_interval=0):
             log(f"[AutoUpdate] Exception occurred during automatic update: {e}")
             log(traceback.format_exc())
 
-        total_seconds = int(interval_hours * 3600)
-        for _ in range(total_seconds):
-            if not auto_update_flag:
-                break
-            time.sleep(1)
+        if stop.wait(interval_hours * 3600):
+            break
 
     log("[AutoUpdate] Background update task has been stopped.")
 
+def restart_auto_update(interval_hours: float) -> bool:
+    """Stop the running auto-update thread (waiting for it to exit) and start a new one if interval > 0."""
+    global auto_update_thread, auto_update_stop
+    with auto_update_lock:
+        running = auto_update_thread is not None and auto_update_thread.is_alive()
+        auto_update_stop.set()
+        if running:
+            # a scheduled fetch in progress finishes first; the thread exits right after
+            auto_update_thread.join()
+
+        if interval_hours <= 0:
+            if running:
+                log("[AutoUpdate] Interval set to 0 → background task stopped.")
+            else:
+                log("[AutoUpdate] Auto update disabled (interval = 0).")
+            auto_update_thread = None
+            return False
+
+        if running:
+            log("[AutoUpdate] Previous background thread stopped, restarting...")
+        auto_update_stop = threading.Event()
+        auto_update_thread = threading.Thread(
+            target=auto_update_worker,
+            args=(interval_hours, auto_update_stop),
+            daemon=True
+        )
+        auto_update_thread.start()
+        log(f"[AutoUpdate] New background task started (interval = {interval_hours}h)")
+        return True
+
 # ======================================================
 # Save setting
 # ======================================================
+def save_custom_labels(data) -> Path:
+    compare_dir = Path(__file__).resolve().parent.parent / "history_compare"
+    compare_dir.mkdir(parents=True, exist_ok=True)
+
+    file_path = compare_dir / "custom_analysis_result.json"
+    write_json_atomic(file_path, data)
+    log(f"[File] Custom tag file saved: {file_path.name}")
+
+    analyze_rss_embeddings()
+    return file_path
+
 @app.post("/save_custom_analysis")
 async def save_custom_analysis(req: Request):
     try:
         data = await req.json()
-        compare_dir = Path(__file__).resolve().parent.parent / "history_compare"
-        compare_dir.mkdir(parents=True, exist_ok=True)
-
-        file_path = compare_dir / "custom_analysis_result.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        log(f"[File] Custom tag file saved: {file_path.name}")
-
-        analyze_rss_embeddings()
+        file_path = await run_blocking(save_custom_labels, data)
         return {"status": "ok", "file": file_path.name, "rss": "updated"}
 
     except Exception as e:
@@ -790,166 +4172,89 @@ async def save_custom_analysis(req: Request):
 # ======================================================
 # save RSS setting
 # ======================================================
-@app.post("/save_rss_settings")
-async def save_rss_settings(req: Request):
-    try:
-        data = await req.json()
-
-        backend_dir = Path(__file__).resolve().parent
-        project_dir = backend_dir.parent
-        rss_dir = project_dir / "rss"
-        rss_setting_dir = rss_dir / "rss_setting"
-        rss_setting_dir.mkdir(parents=True, exist_ok=True)
-
-        file_path = rss_setting_dir / "rss_settings.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        log(f"[RSS] Settings saved: {file_path}")
-
-        rss_summary_path = rss_dir / "rss_summary.json"
-        history_days = int(data.get("historyDays", 14))
-        cutoff_dt = datetime.now(timezone.utc) - timedelta(days=history_days)
+def apply_rss_settings(data) -> Path:
+    """Save rss_settings.json and bring the article store in line with it.
 
-        if rss_summary_path.exists():
-            try:
-                with open(rss_summary_path, "r", encoding="utf-8") as f:
-                    summary_data = json.load(f)
-
-                articles = summary_data.get("data", [])
-                log(f"[RSS] rss_summary.json contains {len(articles)} articles.")
-
-                kept = []
-                removed = 0
+    Only local work: expired articles are purged and feeds no longer listed are
+    dropped from the feed registry together with their articles. Recomputing
+    the recommendations is left to rss_settings_job().
+    """
+    backend_dir = Path(__file__).resolve().parent
+    project_dir = backend_dir.parent
+    rss_dir = project_dir / "rss"
+    rss_setting_dir = rss_dir / "rss_setting"
+    rss_setting_dir.mkdir(parents=True, exist_ok=True)
 
-                for art in articles:
-                    pub_dt = parse_rss_datetime(art.get("published", ""))
-                    if pub_dt and pub_dt.astimezone(timezone.utc) < cutoff_dt:
-                        removed += 1
-                    else:
-                        kept.append(art)
-
-                if removed > 0:
-                    
-                    feed_counter = Counter([a.get("source", "") for a in kept])
-                    merged_feeds = [{"source": k, "count": v} for k, v in feed_counter.items()]
-
-                    summary_data.update({
-                        "updated": datetime.now(timezone.utc).isoformat(),
-                        "total": len(kept),
-                        "feeds": merged_feeds,
-                        "data": kept
-                    })
-                    with open(rss_summary_path, "w", encoding="utf-8") as f:
-                        json.dump(summary_data, f, ensure_ascii=False, indent=2)
+    file_path = rss_setting_dir / "rss_settings.json"
+    with rss_settings_lock:
+        write_json_atomic(file_path, data)
+    log(f"[RSS] Settings saved: {file_path}")
 
-                    log(f"[RSS] Cleaned {removed} old articles (>{history_days} days), kept {len(kept)}.")
-                else:
-                    log("[RSS] No outdated articles found, skipping cleanup.")
+    store = get_article_store()
+    history_days = int(data.get("historyDays", 14))
+    cutoff_dt = datetime.now(timezone.utc) - timedelta(days=history_days)
 
-            except Exception as e:
-                log(f"[RSS] Error while cleaning rss_summary: {e}")
+    try:
+        removed = store.purge_older_than(cutoff_dt)
+        if removed > 0:
+            log(f"[RSS] Cleaned {removed} old articles (>{history_days} days), kept {store.count()}.")
         else:
-            log("[RSS] rss_summary.json not found, skipping cleanup.")
-
-        try:
-            if rss_summary_path.exists():
-                with open(rss_summary_path, "r", encoding="utf-8") as f:
-                    summary_data = json.load(f)
-
-                articles = summary_data.get("data", [])
-                if not articles:
-                    log("[RSS] No articles to check for source removal.")
-                else:
-                    current_feed_urls = set(data.get("feeds", []))
-                    active_sources = []
-                    for url in current_feed_urls:
-                        try:
-                            feed = feedparser.parse(url)
-                            if hasattr(feed, "feed"):
-                                if hasattr(feed.feed, "title") and feed.feed.title.strip():
-                                    active_sources.append(feed.feed.title.strip())
-                                else:
-                                    from urllib.parse import urlparse
-                                    domain = urlparse(url).netloc.replace("www.", "")
-                                    active_sources.append(domain)
-                        except Exception:
-                            pass
-
-                    removed_articles = [a for a in articles if a.get("source", "").strip() not in active_sources]
-                    kept_articles = [a for a in articles if a.get("source", "").strip() in active_sources]
-                    
-                    feed_counter = Counter([a.get("source", "") for a in kept_articles])
-                    merged_feeds = [{"source": k, "count": v} for k, v in feed_counter.items()]
-
-                    summary_data.update({
-                        "data": kept_articles,
-                        "feeds": merged_feeds,
-                        "total": len(kept_articles),
-                        "updated": datetime.now(timezone.utc).isoformat()
-                    })
-
-                    with open(rss_summary_path, "w", encoding="utf-8") as f:
-                        json.dump(summary_data, f, ensure_ascii=False, indent=2)
-
-                    if removed_articles:
-                        removed_sources = sorted(set(a.get("source", "") for a in removed_articles))
-                        log(f"[RSS] Removed {len(removed_articles)} articles from deleted sources: {removed_sources}")
-                    else:
-                        log(f"[RSS] No removed sources detected.")
-
-        except Exception as e:
-            log(f"[RSS] Source cleanup failed: {e}")
-            log(traceback.format_exc())
+            log("[RSS] No outdated articles found, skipping cleanup.")
+    except Exception as e:
+        log(f"[RSS] Error while cleaning old articles: {e}")
 
-        try:
-            if rss_summary_path.exists():
-                with open(rss_summary_path, "r", encoding="utf-8") as f:
-                    summary_data = json.load(f)
+    try:
+        removed_sources = store.remove_feeds_except(data.get("feeds", []))
+        if removed_sources:
+            log(f"[RSS] Removed {sum(removed_sources.values())} articles from deleted sources: {sorted(removed_sources)}")
+        else:
+            log(f"[RSS] No removed sources detected.")
 
-                total_articles = summary_data.get("total", len(summary_data.get("data", [])))
-                log(f"[RSS] Total article: {total_articles}")
-            else:
-                log("[RSS] rss_summary.json not found.")
-        except Exception as e:
-            log(f"[RSS] Error while counting total articles: {e}")
-            log(traceback.format_exc())
+        log(f"[RSS] Total article: {store.count()}")
+    except Exception as e:
+        log(f"[RSS] Source cleanup failed: {e}")
+        log(traceback.format_exc())
 
-       
-        # embedding
+    return file_path
+
+def rss_settings_job(job: Job):
+    """Background half of a settings save: the auto-update thread, then recommendations.
+
+    Runs on rss_executor, not behind a running analysis. The result reports
+    the auto-update state once it has actually been applied.
+    """
+    # the newest saved settings win if several saves queued up
+    rss_setting_path = Path(__file__).resolve().parent.parent / "rss" / "rss_setting" / "rss_settings.json"
+    with rss_settings_lock:
+        with open(rss_setting_path, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+    interval_hours = float(settings.get("updateIntervalHours", 0))
+    with job.track("auto_update"):
+        started = restart_auto_update(interval_hours)
+    job.update_progress(auto_update="started" if started else "stopped", interval_hours=interval_hours)
+
+    with job.track("recommend"):
         analyze_rss_embeddings()
-        log("[RSS] Recommendation analysis completed.")
-
-        # auto update
-        global auto_update_thread, auto_update_flag
+    log("[RSS] Recommendation analysis completed.")
+    return {"recommend": "updated", "auto_update": "started" if started else "stopped", "interval_hours": interval_hours}
 
+@app.post("/save_rss_settings")
+async def save_rss_settings(req: Request):
+    try:
+        data = await req.json()
+        file_path = await run_blocking(apply_rss_settings, data)
         interval_hours = float(data.get("updateIntervalHours", 0))
-        if interval_hours > 0:
-            if auto_update_flag:
-                auto_update_flag = False
-                time.sleep(0.5)
-                log("[AutoUpdate] Previous background thread stopped, restarting...")
-
-            auto_update_flag = True
-            auto_update_thread = threading.Thread(
-                target=auto_update_worker,
-                args=(interval_hours,),
-                daemon=True
-            )
-            auto_update_thread.start()
-            log(f"[AutoUpdate] New background task started (interval = {interval_hours}h)")
-
-        else:
-            if auto_update_flag:
-                auto_update_flag = False
-                log("[AutoUpdate] Interval set to 0 → background task stopped.")
-            else:
-                log("[AutoUpdate] Auto update disabled (interval = 0).")
+        key = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        job, merged = job_manager.submit("rss_settings", key, rss_settings_job, executor=rss_executor)
 
         return {
             "status": "ok",
             "file": str(file_path),
-            "rss": "analyzed_after_cleanup",
-            "auto_update": "started" if interval_hours > 0 else "stopped",
+            "rss": "cleaned_analysis_queued",
+            "job_id": job.id,
+            "merged": merged,
+            # applied by the job: GET /jobs/{job_id} reports "started"/"stopped" once it has changed
+            "auto_update": "pending",
             "interval_hours": interval_hours
         }
 
@@ -962,27 +4267,25 @@ async def save_rss_settings(req: Request):
 # ======================================================
 # RSS update
 # ======================================================
-@app.post("/update_rss")
-async def update_rss(req: Request):
-    try:
-        log("[RSS] Update request received — starting fetch and analysis...")
-
-        backend_dir = Path(__file__).resolve().parent
-        project_dir = backend_dir.parent
-        rss_dir = project_dir / "rss"
-        rss_setting_dir = rss_dir / "rss_setting"
-        rss_setting_dir.mkdir(parents=True, exist_ok=True)
-        rss_setting_path = rss_setting_dir / "rss_settings.json"
-
-        default_feeds = [
-            "https://feeds.bbci.co.uk/news/world/rss.xml",
-            "https://feeds.bbci.co.uk/news/technology/rss.xml",
-            "https://techcrunch.com/feed/",
-            "https://www.theverge.com/rss/index.xml",
-            "https://github.blog/feed/",
-            "https://hnrss.org/frontpage"
-        ]
-
+def refresh_rss(profile=None) -> tuple:
+    """Fetch the feeds and recompute recommendations; returns (newly fetched articles, articles stored)."""
+    backend_dir = Path(__file__).resolve().parent
+    project_dir = backend_dir.parent
+    rss_dir = project_dir / "rss"
+    rss_setting_dir = rss_dir / "rss_setting"
+    rss_setting_dir.mkdir(parents=True, exist_ok=True)
+    rss_setting_path = rss_setting_dir / "rss_settings.json"
+
+    default_feeds = [
+        "https://feeds.bbci.co.uk/news/world/rss.xml",
+        "https://feeds.bbci.co.uk/news/technology/rss.xml",
+        "https://techcrunch.com/feed/",
+        "https://www.theverge.com/rss/index.xml",
+        "https://github.blog/feed/",
+        "https://hnrss.org/frontpage"
+    ]
+
+    with rss_settings_lock:
         if rss_setting_path.exists():
             with open(rss_setting_path, "r", encoding="utf-8") as f:
                 settings = json.load(f)
@@ -993,19 +4296,28 @@ async def update_rss(req: Request):
         if not settings.get("feeds"):
             settings["feeds"] = default_feeds  
 
-        with open(rss_setting_path, "w", encoding="utf-8") as f:
-            json.dump(settings, f, ensure_ascii=False, indent=2)
+        write_json_atomic(rss_setting_path, settings)
 
-        log(f"[RSS] Updated settings (only enabled + feeds patched): {settings}")
+    log(f"[RSS] Updated settings (only enabled + feeds patched): {settings}")
 
-        articles = fetch_rss_articles()
-        analyze_rss_embeddings()
+    articles = fetch_rss_articles(profile)
+    analyze_rss_embeddings(profile)
+    return articles, get_article_store().count()
 
-        log(f"[RSS] Update completed — fetched {len(articles)} articles.")
+@app.post("/update_rss")
+async def update_rss(req: Request, profile: str | None = None):
+    """Fetch the feeds and recompute recommendations; ?profile=cprofile|pyinstrument profiles both runs."""
+    try:
+        log("[RSS] Update request received — starting fetch and analysis...")
+
+        articles, total = await run_blocking(refresh_rss, profile)
+
+        log(f"[RSS] Update completed — fetched {len(articles)} new articles, {total} stored.")
         return {
             "status": "ok",
             "rss": "updated",
-            "count": len(articles),
+            "count": total,            # articles in the store, as before the incremental fetch
+            "new": len(articles),      # articles this poll added (0 when every feed answered 304)
             "message": "RSS updated successfully"
         }
     except Exception as e:
@@ -1016,16 +4328,14 @@ async def update_rss(req: Request):
 # ======================================================
 # clear RSS 
 # ======================================================
-@app.post("/clear_rss_cache")
-async def clear_rss_cache(req: Request):
-    try:
-        log("[RSS] Clear cache request received — starting cleanup")
-
-        backend_dir = Path(__file__).resolve().parent
-        project_dir = backend_dir.parent
-        rss_dir = project_dir / "rss"
+def clear_rss_files() -> list:
+    backend_dir = Path(__file__).resolve().parent
+    project_dir = backend_dir.parent
+    rss_dir = project_dir / "rss"
 
-        deleted_files = []
+    deleted_files = []
+    # waits for a running recommendation instead of deleting under it
+    with rss_recommend_lock:
         for file_path in rss_dir.glob("*.json"):
             try:
                 file_path.unlink()
@@ -1039,6 +4349,26 @@ async def clear_rss_cache(req: Request):
                 f.unlink()
                 deleted_files.append(f"rss_setting/{f.name}")
 
+        if ARTICLE_DB_PATH.exists():
+            get_article_store().clear()
+            deleted_files.append(ARTICLE_DB_PATH.name)
+
+        if EMBED_STORE_BASE.parent.joinpath(f"{EMBED_STORE_BASE.name}.f32").exists():
+            deleted_files.append(f"{EMBED_STORE_BASE.name}.f32")
+        reset_rss_index()
+        reset_recommend_engine()
+        reset_rss_embedding_store()
+        reset_label_embedding_store()
+
+    return deleted_files
+
+@app.post("/clear_rss_cache")
+async def clear_rss_cache(req: Request):
+    try:
+        log("[RSS] Clear cache request received — starting cleanup")
+
+        deleted_files = await run_blocking(clear_rss_files)
+
         log(f"[RSS] Deleted {len(deleted_files)} cached files: {deleted_files}")
         return {"status": "ok", "deleted": deleted_files, "message": "Clear RSS"}
 
@@ -1051,47 +4381,58 @@ async def clear_rss_cache(req: Request):
 # ======================================================
 # RSS summary
 # ======================================================
+def read_rss_status() -> dict:
+    backend_dir = Path(__file__).resolve().parent
+    project_dir = backend_dir.parent
+    rss_dir = project_dir / "rss"
+    def get_dir_size_mb(folder: Path) -> float:
+        total_bytes = 0
+        for f in folder.rglob("*"):
+            if f.is_file():
+                total_bytes += f.stat().st_size
+        return round(total_bytes / (1024 * 1024), 2)
+
+    file_size_mb = get_dir_size_mb(rss_dir)
+    store = get_article_store()
+    total_articles = store.count()
+    if not total_articles:
+        return {
+            "exists": False,
+            "total_articles": 0,
+            "file_size_mb": file_size_mb,
+            "updated_at": None
+        }
+
+    return {
+        "exists": True,
+        "total_articles": total_articles,
+        "file_size_mb": file_size_mb,
+        "updated_at": store.updated_at() or datetime.now().isoformat(),
+        "sources": store.source_counts()
+    }
+
 @app.get("/rss_status")
 async def rss_status():
     try:
-        backend_dir = Path(__file__).resolve().parent
-        project_dir = backend_dir.parent
-        rss_dir = project_dir / "rss"
-        summary_path = rss_dir / "rss_summary.json"
-        def get_dir_size_mb(folder: Path) -> float:
-            total_bytes = 0
-            for f in folder.rglob("*"):
-                if f.is_file():
-                    total_bytes += f.stat().st_size
-            return round(total_bytes / (1024 * 1024), 2)
-
-        file_size_mb = get_dir_size_mb(rss_dir)
-        if not summary_path.exists():
-            return {
-                "exists": False,
-                "total_articles": 0,
-                "file_size_mb": file_size_mb,
-                "updated_at": None
-            }
+        return await run_blocking(read_rss_status)
 
-        with open(summary_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    except Exception as e:
+        log(f"[RSS] Failed to retrieve RSS status: {e}")
+        log(traceback.format_exc())
+        return JSONResponse({"error": str(e)}, status_code=500)
+    
 
-        total_articles = data.get("total", len(data.get("data", [])))
-        updated_at = data.get("updated", datetime.now().isoformat())
 
-        return {
-            "exists": True,
-            "total_articles": total_articles,
-            "file_size_mb": file_size_mb,
-            "updated_at": updated_at
-        }
+@app.get("/rss_feed_stats")
+async def rss_feed_stats():
+    """Per-feed status, bytes, duration and new entries from the last poll."""
+    try:
+        return await run_blocking(lambda: FeedState().stats())
 
     except Exception as e:
-        log(f"[RSS] Failed to retrieve RSS status: {e}")
+        log(f"[RSS] Failed to retrieve feed stats: {e}")
         log(traceback.format_exc())
         return JSONResponse({"error": str(e)}, status_code=500)
-    
 
 
 # ======================================================
@@ -1134,8 +4475,11 @@ def system_check():
     if model_path.exists():
         print(f"   Model folder: {model_path}")
         try:
-            model = SentenceTransformer(str(model_path), device="cpu", local_files_only=True)
-            print("   Model status: OK (loaded successfully)")
+            model_registry.get()
+            status = model_registry.status()
+            print(f"   Model status: OK (loaded in {status['load_seconds']}s, backend {status['backend']})")
+            if ENCODE_POOL_WORKERS > 0:
+                print(f"   Encode pool: {ENCODE_POOL_WORKERS} workers (started on the first large encode)")
         except Exception as e:
             print(f"   Model status: FAILED ({e})")
     else:
@@ -1146,13 +4490,11 @@ def system_check():
     # ------------------------------------------------------
     print("Taxonomy Embeddings:")
     taxonomy_path = data_dir / "taxonomy_embeddings.json"
-    if taxonomy_path.exists():
+    if taxonomy_path.exists() or taxonomy_path.with_suffix(".npy").exists():
         try:
-            with open(taxonomy_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                count = len(data.get("data", []))
-            print(f"   Taxonomy file: {taxonomy_path}")
-            print(f"   Loaded entries: {count}")
+            matrix, paths = load_taxonomy_matrix(taxonomy_path)
+            print(f"   Taxonomy file: {taxonomy_path.with_suffix('.npy')}")
+            print(f"   Loaded entries: {len(paths)} (dim {matrix.shape[1] if len(paths) else 0})")
         except Exception as e:
             print(f"   Taxonomy status: FAILED ({e})")
     else:
@@ -1162,8 +4504,8 @@ def system_check():
     # 4. History exports
     # ------------------------------------------------------
     print("History Data:")
-    history_latest = project_dir / "history_exports" / "history_latest.json"
-    if history_latest.exists():
+    history_latest = next((project_dir / "history_exports").glob("history_latest.*"), None)
+    if history_latest:
         print(f"   History file: {history_latest}")
     else:
         print("   History file: NONE")
@@ -1205,18 +4547,15 @@ def system_check():
     # 8. RSS Summary
     # ------------------------------------------------------
     print("RSS Summary:")
-    rss_summary = rss_dir / "rss_summary.json"
-    if rss_summary.exists():
+    if ARTICLE_DB_PATH.exists() or LEGACY_SUMMARY_PATH.exists():
         try:
-            with open(rss_summary, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            total = data.get("total", len(data.get("data", [])))
-            print(f"   RSS summary file: {rss_summary}")
-            print(f"   Total articles: {total}")
+            store = get_article_store()
+            print(f"   RSS article store: {ARTICLE_DB_PATH}")
+            print(f"   Total articles: {store.count()} from {len(store.source_counts())} sources")
         except Exception as e:
-            print(f"   RSS summary: FAILED ({e})")
+            print(f"   RSS article store: FAILED ({e})")
     else:
-        print("   RSS summary file: NONE")
+        print("   RSS article store: NONE")
 
     # ------------------------------------------------------
     # 9. RSS Recommendations
@@ -1240,6 +4579,11 @@ def system_check():
 # START
 # ======================================================
 if __name__ == "__main__":
+    multiprocessing.freeze_support()   # encode pool workers in a frozen (PyInstaller) build
+    if "--convert-taxonomy" in sys.argv:
+        json_path = resource_path("data/taxonomy_embeddings.json")
+        convert_taxonomy_embeddings(json_path, json_path.with_suffix(".npy"), json_path.with_suffix(".meta.json"))
+        sys.exit(0)
     log("LocalAI_analyse backend started: http://127.0.0.1:11668")
     system_check() 
     uvicorn.run(app, host="127.0.0.1", port=11668)
@@ -0,0 +1,99 @@
+# ======================================================
+# 🔹 Incremental history analysis
+# ======================================================
+# An incremental run over an overlapping export must give the same interest
+# summary and per-entry results as a full run over that export. The model is
+# replaced by deterministic hash vectors, so no model files are needed.
+#
+#   python -m pytest test_history_incremental.py
+#
+import hashlib, json
+from contextlib import contextmanager
+import numpy as np
+import pytest
+
+import server
+
+DIM = 16
+TAXONOMY = [f"{a} > {b} > {c}" for a in ("Tech", "Science", "Travel", "Food")
+            for b in ("News", "Guides") for c in ("Basics", "Advanced")]
+SETTINGS = {"useDeepParsing": False, "granularityLevel": 2, "samplingCount": 20, "threshold": 0.1, "topN": 3}
+
+
+def stub_vectors(texts) -> np.ndarray:
+    rows = []
+    for text in texts:
+        seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+        rows.append(np.random.default_rng(seed).standard_normal(DIM))
+    vectors = np.asarray(rows, dtype=np.float32).reshape(-1, DIM)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class StubRegistry:
+    def __init__(self):
+        self.taxonomy = stub_vectors(TAXONOMY)
+
+    def get(self):
+        return None, self.taxonomy, TAXONOMY, "cpu"
+
+    @contextmanager
+    def use(self):
+        yield self.get()
+
+
+@pytest.fixture(autouse=True)
+def stub_model(monkeypatch):
+    monkeypatch.setattr(server, "model_registry", StubRegistry())
+    monkeypatch.setattr(server, "model_fingerprint", lambda *args, **kwargs: "stub")
+    monkeypatch.setattr(server, "encode_history_texts", lambda model, texts, *args, **kwargs: stub_vectors(texts))
+    monkeypatch.setattr(server, "persist_history_embeddings", lambda fingerprint: 0)
+
+
+def export(days: int, start_day: int, per_day: int = 20, revisits: int = 0) -> list:
+    """Export entries (newest first) for `days` days from `start_day`; `revisits` older URLs get visited again."""
+    base = 1_700_000_000_000
+    entries = {}
+    for day in range(start_day, start_day + days):
+        for k in range(per_day):
+            i = day * per_day + k
+            url = f"https://site{i % 7}.example/p{i}"
+            entries[url] = {"url": url, "title": f"page {i} topic {i % 11}", "lastVisitTime": base + day * 86_400_000 + k}
+    newest = base + (start_day + days) * 86_400_000
+    for n, url in enumerate(list(entries)[:revisits]):
+        entries[url] = {**entries[url], "title": f"revisited {url}", "lastVisitTime": newest + n}
+    return sorted(entries.values(), key=lambda e: -e["lastVisitTime"])
+
+
+def analyze(items, settings, history_dir, store):
+    history_dir.mkdir(exist_ok=True)
+    summary, counts = server.analyze_history(iter(items), settings, history_dir, store)
+    results = json.loads((history_dir / "embedding_analysis.json").read_text(encoding="utf-8"))["results"]
+    return summary, counts, results
+
+
+def test_incremental_run_matches_full_run(tmp_path):
+    first = export(days=10, start_day=0)
+    second = export(days=10, start_day=2, revisits=5)
+
+    store = server.HistoryStore(tmp_path / "incremental.db")
+    analyze(first, SETTINGS, tmp_path / "first", store)
+    inc_summary, inc_counts, inc_results = analyze(second, SETTINGS, tmp_path / "incremental", store)
+
+    full_store = server.HistoryStore(tmp_path / "full.db")
+    full_summary, full_counts, full_results = analyze(second, {**SETTINGS, "incremental": False},
+                                                      tmp_path / "full", full_store)
+
+    assert inc_summary and inc_summary == full_summary
+    assert inc_results == full_results
+    # only the two new days and the revisited entries were scored again; two old days aged out
+    assert inc_counts["scored"] == 2 * 20 + 5
+    assert inc_counts["expired"] == 2 * 20
+    assert full_counts["scored"] == len(second)
+
+
+def test_settings_change_discards_stored_results(tmp_path):
+    store = server.HistoryStore(tmp_path / "history.db")
+    items = export(days=3, start_day=0)
+    analyze(items, SETTINGS, tmp_path / "a", store)
+    _, counts, _ = analyze(items, {**SETTINGS, "topN": 2}, tmp_path / "b", store)
+    assert counts["reused"] == 0 and counts["scored"] == len(items)
@@ -9,12 +9,14 @@ chrome.runtime.onInstalled.addListener(() => {
       samplingCount: 50,        
       siteBlacklist: [],        
       useDeepParsing: true,     
+      exportFormat: "json",     // "json" | "ndjson"
       // Personalized Page
       newtabEnabled: false,     
       // RSS Settings
       rssSources: [],           
       rssDays: 14,             
       rssCount: 20,             
+      rssDiversity: 0,          // %, sent as recommendDiversity 0–1
       rssAutoUpdateHours: 1,   
       rssAutoUpdateEnabled: true
     },
@@ -168,16 +170,17 @@ async function exportHistoryToJSON() {
     const {
       installedAt,
       granularityLevel,
-      samplingCount
+      samplingCount,
+      exportFormat = "json"
     } = await new Promise((resolve) =>
       chrome.storage.local.get(
-        ["installedAt", "granularityLevel", "samplingCount"],
+        ["installedAt", "granularityLevel", "samplingCount", "exportFormat"],
         resolve
       )
     );
 
     // useDeepParsing
-    const jsonData = {
+    const header = {
       generatedAt: new Date().toISOString(),
       installedAt: installedAt || "(unknown)",
       totalCount: filtered.length,
@@ -187,18 +190,23 @@ async function exportHistoryToJSON() {
         samplingCount,
         siteBlacklist,
         useDeepParsing 
-      },
-      items: filtered
+      }
     };
 
     // 导出 JSON 文件
+    // NDJSON: header object on the first line, then one history entry per line
+    const ndjson = exportFormat === "ndjson";
+    const content = ndjson
+      ? [header, ...filtered].map((row) => JSON.stringify(row)).join("\n") + "\n"
+      : JSON.stringify({ ...header, items: filtered }, null, 2);
+
     const folderName = "browser_history";
     await ensureDownloadFolderExists(folderName);
-    const filename = `${folderName}/history_${Date.now()}.json`;
+    const filename = `${folderName}/history_${Date.now()}.${ndjson ? "ndjson" : "json"}`;
     const base64 = btoa(
-      unescape(encodeURIComponent(JSON.stringify(jsonData, null, 2)))
+      unescape(encodeURIComponent(content))
     );
-    const dataUrl = "data:application/json;base64," + base64;
+    const dataUrl = `data:${ndjson ? "application/x-ndjson" : "application/json"};base64,` + base64;
 
     await chrome.downloads.download({
       url: dataUrl,
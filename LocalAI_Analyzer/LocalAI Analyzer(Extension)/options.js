@@ -173,6 +173,23 @@ document.addEventListener("DOMContentLoaded", () => {
   });
 });
 
+// Export format
+document.addEventListener("DOMContentLoaded", () => {
+  const ndjsonCheckbox = document.getElementById("useNdjsonExport");
+  if (!ndjsonCheckbox) return;
+
+  chrome.storage.local.get({ exportFormat: "json" }, (data) => {
+    ndjsonCheckbox.checked = data.exportFormat === "ndjson";
+  });
+
+  ndjsonCheckbox.addEventListener("change", () => {
+    const exportFormat = ndjsonCheckbox.checked ? "ndjson" : "json";
+    chrome.storage.local.set({ exportFormat }, () => {
+      console.log("Export format:", exportFormat);
+    });
+  });
+});
+
 // Save All Settings
 els.saveBtn.addEventListener("click", () => {
   withButtonLock(els.saveBtn, async () => {
@@ -209,6 +226,7 @@ els.saveBtn.addEventListener("click", () => {
 
       const rssDays = +document.getElementById("rssDaysRange").value;
       const rssCount = +document.getElementById("rssCountRange").value;
+      const rssDiversity = +document.getElementById("rssDiversityRange").value;
       const rssAutoUpdateHours = parseFloat(
         document.getElementById("rssAutoUpdateRange").value
       );
@@ -222,6 +240,7 @@ els.saveBtn.addEventListener("click", () => {
         feeds: rssSources,
         historyDays: rssDays,
         recommendCount: rssCount,
+        recommendDiversity: rssDiversity / 100,
         autoUpdate: rssAutoUpdateHours > 0,
         updateIntervalHours: rssAutoUpdateHours
       };
@@ -262,7 +281,7 @@ document.addEventListener("DOMContentLoaded", () => {
   const newtabToggle = document.getElementById("toggleNewtab");
   if (!newtabToggle) return;
   const rssSectionBlocks = document.querySelectorAll(
-    ".block-rss-source, .block-rss-days, .block-rss-count, .block-rss-auto-update, .block-rss-actions"
+    ".block-rss-source, .block-rss-days, .block-rss-count, .block-rss-diversity, .block-rss-auto-update, .block-rss-actions"
   );
 
   chrome.storage.local.get({ newtabEnabled: false }, (data) => {
@@ -368,6 +387,7 @@ async function silentSaveRSSSettings() {
 
     const rssDays = +document.getElementById("rssDaysRange").value;
     const rssCount = +document.getElementById("rssCountRange").value;
+    const rssDiversity = +document.getElementById("rssDiversityRange").value;
     const rssAutoUpdateHours = parseFloat(
       document.getElementById("rssAutoUpdateRange").value
     );
@@ -381,6 +401,7 @@ async function silentSaveRSSSettings() {
       feeds: rssSources,
       historyDays: rssDays,
       recommendCount: rssCount,
+      recommendDiversity: rssDiversity / 100,
       autoUpdate: rssAutoUpdateHours > 0,
       updateIntervalHours: rssAutoUpdateHours,
     };
@@ -503,6 +524,21 @@ rssCountRange.addEventListener("input", () => {
   chrome.storage.local.set({ rssCount: val });
 });
 
+// RSS Diversity Range
+const rssDiversityRange = document.getElementById("rssDiversityRange");
+const rssDiversityValue = document.getElementById("rssDiversityValue");
+
+chrome.storage.local.get({ rssDiversity: 0 }, (data) => {
+  rssDiversityRange.value = data.rssDiversity;
+  rssDiversityValue.textContent = data.rssDiversity;
+});
+
+rssDiversityRange.addEventListener("input", () => {
+  const val = Number(rssDiversityRange.value);
+  rssDiversityValue.textContent = val;
+  chrome.storage.local.set({ rssDiversity: val });
+});
+
 // RSS Auto Update Interval (0–24 hours)
 const rssAutoUpdateRange = document.getElementById("rssAutoUpdateRange");
 const rssAutoUpdateValue = document.getElementById("rssAutoUpdateValue");